@@ -0,0 +1,350 @@
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import yaml
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.stand_in_server import StandInBCBServer
+from modules.data_acquirer_focus import fetch_bcb_focus, reset_focus_client
+from modules.data_collector import collect_focus_job, collect_series
+from modules.data_config import ConfigManager
+from modules.data_exporter import export_chunks
+from persistence.adapter_registry import close_all_adapters, get_adapter
+from utils.get_base_path import BASE_DIR_ENV
+
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "resultados")
+SCENARIOS = ("coleta_series", "coleta_focus", "endpoints_focus", "leitura_completa", "exportacao", "leitura_ui")
+FIRST_SERIES_CODE = 10001
+EXPORT_CHUNK_SIZE = 50000
+RESULTS_FORMAT_VERSION = 1
+
+def _quiet_log(*args, **kwargs):
+    pass
+
+@contextlib.contextmanager
+def _silenced(enabled: bool):
+    """
+    Descarta as mensagens impressas pelos módulos durante a medição (a impressão no terminal distorce os tempos).
+    """
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def _focus_filters(endpoint_config: dict, start: str) -> dict:
+    """
+    Filtros mínimos aceitos por um endpoint: Data e o primeiro parâmetro filtrável com opções (ex: Indicador).
+    """
+    filters = {"Data": start}
+    for name, config in endpoint_config.get("parametros", {}).items():
+        config = config or {}
+        if config.get("operador") == "eq" and config.get("opcoes"):
+            filters[name] = config["opcoes"][0]
+            break
+    return filters
+
+class BenchmarkWorkspace:
+    """
+    Diretório temporário com series_config.yaml, focus_config.yaml e banco próprios, ativado via
+    COLETOR_BCB_DIR para que a aplicação não leia nem grave os arquivos reais do projeto.
+    """
+
+    def __init__(self, args, series_count: int, focus_endpoints: dict, focus_jobs: list):
+        self.args = args
+        self._temp_dir = tempfile.TemporaryDirectory(prefix="coletor_bcb_bench_")
+        self.path = self._temp_dir.name
+        extension = "duckdb" if args.banco == "duckdb" else "db"
+        self.database = {"type": args.banco, "db_name": os.path.join(self.path, f"benchmark.{extension}")}
+        if args.banco == "sqlite":
+            self.database["layout"] = args.layout
+        self.series_codes = {
+            str(code): f"serie_{code}_{args.periodicidade}" for code in range(FIRST_SERIES_CODE, FIRST_SERIES_CODE + series_count)
+        }
+        self.collection = {"max_workers": args.max_workers, "rate_limit_per_host": args.limite_por_host, "sgs_backend": "nativo"}
+        self.focus_endpoints = focus_endpoints
+        self.focus_collection = {"max_workers": args.max_workers, "max_jobs": 1, "tamanho_pagina": args.tamanho_pagina,
+                                 "janela_dias": args.janela_dias, "rate_limit_per_host": args.limite_por_host}
+        self.focus_jobs = focus_jobs
+        self._write_configs()
+        self._previous_dir = os.environ.get(BASE_DIR_ENV)
+        os.environ[BASE_DIR_ENV] = self.path
+        ConfigManager.invalidate()
+
+    def _write_configs(self):
+        series_config = {"database": self.database, "collection": self.collection, "cache": {"enabled": False},
+                         "series_codes": self.series_codes}
+        focus_config = {"database": self.database, "collection": self.focus_collection, "focus_jobs": self.focus_jobs,
+                        "focus_endpoints": self.focus_endpoints}
+        for file_name, config in (("series_config.yaml", series_config), ("focus_config.yaml", focus_config)):
+            with open(os.path.join(self.path, file_name), "w", encoding="utf-8") as f:
+                yaml.safe_dump(config, f, sort_keys=False, allow_unicode=True)
+
+    def adapter(self):
+        return get_adapter(self.database)
+
+    def stored_tables(self) -> list[str]:
+        """
+        Tabelas de séries efetivamente gravadas (séries cuja coleta falhou ficam de fora das leituras).
+        """
+        stored = set(self.adapter().get_table_names())
+        return [table for table in self.series_codes.values() if table in stored]
+
+    def close(self):
+        close_all_adapters()
+        ConfigManager.invalidate()
+        if self._previous_dir is None:
+            os.environ.pop(BASE_DIR_ENV, None)
+        else:
+            os.environ[BASE_DIR_ENV] = self._previous_dir
+        self._temp_dir.cleanup()
+
+def _scenario_coleta_series(workspace: BenchmarkWorkspace) -> dict:
+    results = collect_series(workspace.series_codes, workspace.adapter(), max_workers=workspace.args.max_workers,
+                             backend="nativo", log=_quiet_log)
+    return {"registros": sum(result["registros"] for result in results),
+            "erros": sum(1 for result in results if result["status"] == "erro")}
+
+def _scenario_coleta_focus(workspace: BenchmarkWorkspace) -> dict:
+    registros, erros = 0, 0
+    for job in workspace.focus_jobs:
+        result = collect_focus_job(job, workspace.adapter(), workspace.focus_endpoints, workspace.focus_collection,
+                                   incremental=False, log=_quiet_log)
+        registros += result["registros"]
+        erros += result["status"] == "erro"
+    return {"registros": registros, "erros": erros}
+
+def _scenario_endpoints_focus(workspace: BenchmarkWorkspace) -> dict:
+    """
+    Consulta cada endpoint configurado com filtros mínimos (verificação de todos os endpoints do Focus).
+    """
+    start = (date.today() - timedelta(days=workspace.args.focus_dias)).isoformat()
+    registros, reprovados = 0, []
+    for endpoint, config in workspace.focus_endpoints.items():
+        df = fetch_bcb_focus(config.get("nome_amigavel", endpoint), page_size=workspace.args.tamanho_pagina,
+                             window_days=workspace.args.janela_dias, use_cache=False, **_focus_filters(config, start))
+        if df is None or df.empty:
+            reprovados.append(endpoint)
+        else:
+            registros += len(df)
+    return {"registros": registros, "erros": len(reprovados), "reprovados": reprovados}
+
+def _scenario_leitura_completa(workspace: BenchmarkWorkspace) -> dict:
+    adapter = workspace.adapter()
+    return {"registros": sum(len(adapter.fetch_full_table_data(table)) for table in workspace.stored_tables())}
+
+def _scenario_exportacao(workspace: BenchmarkWorkspace) -> dict:
+    adapter = workspace.adapter()
+    totals = {entry["nome_tabela"]: entry.get("total_registros") or 0 for entry in adapter.get_catalog()}
+    registros, tamanho = 0, 0
+    for table in workspace.stored_tables():
+        file_path = export_chunks(adapter.iter_table_chunks(table, chunk_size=EXPORT_CHUNK_SIZE), "csv", table, workspace.args.compactar)
+        tamanho += os.path.getsize(file_path)
+        os.remove(file_path)
+        registros += totals.get(table, 0)
+    return {"registros": registros, "bytes_arquivos": tamanho}
+
+def _scenario_leitura_ui(workspace: BenchmarkWorkspace) -> dict:
+    """
+    Chamadas de leitura feitas pela interface: catálogo, perfis e todas as páginas de cada série.
+    """
+    import main as app
+    registros, paginas = 0, 0
+    app.get_series_catalog()
+    app.get_series_profiles()
+    for table in workspace.stored_tables():
+        cursor = None
+        while True:
+            page = app.get_series_page(table, page_size=workspace.args.tamanho_pagina_ui, cursor=cursor,
+                                       payload_format=workspace.args.formato_ui)
+            if not page.get("success"):
+                raise RuntimeError(page.get("error"))
+            paginas += 1
+            registros += page["payload"]["length"] if "payload" in page else len(page["rows"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+    return {"registros": registros, "paginas": paginas}
+
+SCENARIO_FUNCTIONS = {
+    "coleta_series": _scenario_coleta_series,
+    "coleta_focus": _scenario_coleta_focus,
+    "endpoints_focus": _scenario_endpoints_focus,
+    "leitura_completa": _scenario_leitura_completa,
+    "exportacao": _scenario_exportacao,
+    "leitura_ui": _scenario_leitura_ui,
+}
+
+def _run_scenario(name: str, workspace: BenchmarkWorkspace, server: StandInBCBServer) -> dict:
+    server.reset_stats()
+    started_at = time.perf_counter()
+    try:
+        with _silenced(not workspace.args.verboso):
+            measures = SCENARIO_FUNCTIONS[name](workspace)
+        status = "sucesso"
+    except Exception as e:
+        measures, status = {"erro": str(e)}, "erro"
+    duration = time.perf_counter() - started_at
+    measures.update(server.snapshot_stats())
+    registros = measures.get("registros") or 0
+    return {"cenario": name, "status": status, "duracao_s": round(duration, 4),
+            "registros_por_s": round(registros / duration, 1) if duration > 0 else None, **measures}
+
+def run_benchmarks(args) -> dict:
+    """
+    Executa os cenários para cada combinação de quantidade de séries e anos de histórico, com um banco novo a cada repetição.
+    Retorna:
+        dict: Documento de resultados (parâmetros, ambiente e uma medição por cenário e repetição).
+    """
+    with open(os.path.join(REPO_ROOT, "focus_config.yaml"), "r", encoding="utf-8") as f:
+        project_focus = yaml.safe_load(f)
+    focus_endpoints = project_focus.get("focus_endpoints", {})
+    focus_start = (date.today() - timedelta(days=args.focus_dias)).isoformat()
+    focus_jobs = []
+    for job in (project_focus.get("focus_jobs") or [])[:args.focus_jobs]:
+        job = copy.deepcopy(job)
+        job.setdefault("filtros", {})["Data"] = focus_start
+        focus_jobs.append(job)
+
+    scenarios = [name for name in SCENARIOS if name in args.cenarios]
+    needs_series = any(name in scenarios for name in ("leitura_completa", "exportacao", "leitura_ui"))
+    # main.py inicializa o Eel com caminhos relativos ao diretório do projeto
+    os.chdir(REPO_ROOT)
+
+    document = {
+        "versao": RESULTS_FORMAT_VERSION,
+        "rotulo": args.rotulo,
+        "iniciado_em": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "ambiente": {"python": platform.python_version(), "plataforma": platform.platform(), "processadores": os.cpu_count()},
+        "parametros": {key: value for key, value in vars(args).items() if key not in ("comparar",)},
+        "resultados": [],
+    }
+    server = StandInBCBServer(focus_endpoints, latency_ms=args.latencia_ms, jitter_ms=args.variacao_ms,
+                              failure_rate=args.taxa_falhas, recordings_dir=args.gravacoes, seed=args.semente).start()
+    os.environ["COLETOR_BCB_SGS_URL"] = server.sgs_url
+    os.environ["COLETOR_BCB_FOCUS_URL"] = server.focus_url
+    reset_focus_client()
+    try:
+        for series_count in args.series:
+            for years in args.anos:
+                server.history_start = date.today() - timedelta(days=int(365.25 * years))
+                server.periodicities = {str(code): args.periodicidade for code in range(FIRST_SERIES_CODE, FIRST_SERIES_CODE + series_count)}
+                for repetition in range(1, args.repeticoes + 1):
+                    workspace = BenchmarkWorkspace(args, series_count, focus_endpoints, focus_jobs)
+                    try:
+                        if needs_series and "coleta_series" not in scenarios:
+                            # Dados para os cenários de leitura, sem medição
+                            with _silenced(not args.verboso):
+                                _scenario_coleta_series(workspace)
+                        for name in scenarios:
+                            result = _run_scenario(name, workspace, server)
+                            result.update({"series": series_count, "anos": years, "repeticao": repetition})
+                            document["resultados"].append(result)
+                            print(f"{name:<17} séries={series_count:<4} anos={years:<3} rep={repetition}  "
+                                  f"{result['duracao_s']:>9.3f} s  {result.get('registros') or 0:>9} registros  "
+                                  f"{result['requisicoes']:>6} requisições  {result['status']}")
+                    finally:
+                        workspace.close()
+    finally:
+        server.stop()
+        for variable in ("COLETOR_BCB_SGS_URL", "COLETOR_BCB_FOCUS_URL"):
+            os.environ.pop(variable, None)
+        reset_focus_client()
+    document["concluido_em"] = datetime.now().isoformat(timespec="seconds")
+    return document
+
+def _median_durations(document: dict) -> dict:
+    grouped = {}
+    for result in document.get("resultados", []):
+        if result.get("status") == "sucesso":
+            grouped.setdefault((result["cenario"], result["series"], result["anos"]), []).append(result["duracao_s"])
+    return {key: statistics.median(values) for key, values in grouped.items()}
+
+def compare_results(base_path: str, new_path: str):
+    """
+    Imprime, para cada cenário e combinação de séries e anos presente nos dois arquivos, a mediana
+    das durações e a variação do novo resultado em relação à base.
+    """
+    with open(base_path, "r", encoding="utf-8") as f:
+        base = _median_durations(json.load(f))
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = _median_durations(json.load(f))
+    print(f"{'cenário':<17} {'séries':>6} {'anos':>5} {'base (s)':>10} {'novo (s)':>10} {'variação':>9}")
+    for key in sorted(set(base) & set(new)):
+        change = (new[key] / base[key] - 1) * 100 if base[key] else float("nan")
+        print(f"{key[0]:<17} {key[1]:>6} {key[2]:>5} {base[key]:>10.3f} {new[key]:>10.3f} {change:>+8.1f}%")
+
+def main() -> int:
+    """
+    Benchmarks sem acesso à rede: as APIs do BCB são substituídas por um servidor local (ver StandInBCBServer).
+
+    Exemplos:
+        python -m benchmarks.run_benchmarks --series 5 20 --anos 5 20
+        python -m benchmarks.run_benchmarks --latencia-ms 80 --taxa-falhas 0.02 --cenarios coleta_series coleta_focus
+        python -m benchmarks.run_benchmarks --comparar benchmarks/resultados/antes.json benchmarks/resultados/depois.json
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks do coletor com um servidor local no lugar das APIs do BCB.")
+    parser.add_argument("--cenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS), help="Cenários a medir (padrão: todos).")
+    parser.add_argument("--series", nargs="+", type=int, default=[5, 20], help="Quantidades de séries SGS.")
+    parser.add_argument("--anos", nargs="+", type=int, default=[5, 20], help="Anos de histórico das séries.")
+    parser.add_argument("--periodicidade", choices=("diaria", "mensal", "anual"), default="diaria", help="Periodicidade das séries sintéticas.")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Repetições de cada combinação (banco novo a cada uma).")
+    parser.add_argument("--banco", choices=("sqlite", "duckdb"), default="sqlite", help="Banco de dados usado.")
+    parser.add_argument("--layout", choices=("tabelas", "observacoes"), default="tabelas",
+                        help="Layout de armazenamento das séries SGS no SQLite (ver database.layout).")
+    parser.add_argument("--latencia-ms", type=float, default=20.0, help="Latência acrescentada a cada resposta do servidor.")
+    parser.add_argument("--variacao-ms", type=float, default=0.0, help="Variação aleatória somada à latência.")
+    parser.add_argument("--taxa-falhas", type=float, default=0.0, help="Fração das requisições de dados respondidas com erro.")
+    parser.add_argument("--gravacoes", help="Diretório com respostas gravadas (sgs/<código>.json, focus/<endpoint>.json).")
+    parser.add_argument("--semente", type=int, default=0, help="Semente da latência variável e das falhas.")
+    parser.add_argument("--max-workers", type=int, default=4, help="collection.max_workers da coleta.")
+    parser.add_argument("--limite-por-host", type=float, default=0, help="collection.rate_limit_per_host (0 desativa).")
+    parser.add_argument("--tamanho-pagina", type=int, default=5000, help="Registros por página nas consultas ao Focus.")
+    parser.add_argument("--janela-dias", type=int, default=365, help="Janela de datas das consultas ao Focus, em dias.")
+    parser.add_argument("--focus-dias", type=int, default=730, help="Dias de histórico consultados no Focus.")
+    parser.add_argument("--focus-jobs", type=int, default=3, help="Quantidade de coletas de focus_jobs medidas.")
+    parser.add_argument("--tamanho-pagina-ui", type=int, default=1000, help="Linhas por página em get_series_page.")
+    parser.add_argument("--formato-ui", choices=("registros", "colunar"), default="colunar", help="Formato de get_series_page.")
+    parser.add_argument("--compactar", action="store_true", help="Exporta CSV compactado (gzip).")
+    parser.add_argument("--rotulo", default="", help="Rótulo gravado no arquivo de resultados (ex: nome da alteração).")
+    parser.add_argument("--saida", help="Arquivo de resultados (padrão: benchmarks/resultados/benchmark_<data>.json).")
+    parser.add_argument("--verboso", action="store_true", help="Mantém as mensagens dos módulos no terminal.")
+    parser.add_argument("--comparar", nargs=2, metavar=("BASE", "NOVO"), help="Compara dois arquivos de resultados e encerra.")
+    args = parser.parse_args()
+
+    if args.comparar:
+        compare_results(*args.comparar)
+        return 0
+
+    document = run_benchmarks(args)
+    output = args.saida or os.path.join(RESULTS_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {output}")
+    return 1 if any(result["status"] == "erro" for result in document["resultados"]) else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,361 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+import pandas as pd
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+SGS_PATH = re.compile(r"^/dados/serie/bcdata\.sgs\.(\d+)/dados$")
+FOCUS_PREFIX = "/olinda/servico/Expectativas/versao/v1/odata"
+FOCUS_NAMESPACE = "Expectativas"
+FILTER_CLAUSE = re.compile(r"(\w+) (eq|ge|le|gt|lt) ('(?:[^']|'')*'|\S+)")
+# A API do SGS recusa consultas de séries diárias com mais de 10 anos
+SGS_DAILY_LIMIT_DAYS = 3653
+# Quantidade de valores gerados para as dimensões sem filtro (ex: DataReferencia, Reuniao)
+REFERENCE_COUNT = 4
+ODATA_TYPES = {"string": "Edm.String", "number": "Edm.Decimal", "integer": "Edm.Int32"}
+FREQUENCIES = {"diaria": "B", "semanal": "W-FRI", "mensal": "MS", "trimestral": "QS", "anual": "YS"}
+
+class StandInBCBServer:
+    """
+    Servidor HTTP local que substitui as APIs do BCB nos benchmarks, sem acesso à rede.
+
+    Atende às mesmas rotas usadas pela aplicação:
+        - SGS: /dados/serie/bcdata.sgs.<código>/dados?formato=json&dataInicial=...&dataFinal=...
+        - Expectativas (OData): documento de serviço, $metadata (gerado a partir de `focus_endpoints`)
+          e consultas com $filter, $orderby, $select, $top e $skip.
+
+    Os dados são sintéticos e determinísticos (mesmos parâmetros, mesmas respostas) ou lidos de
+    gravações em `recordings_dir`: sgs/<código>.json (lista do SGS) e focus/<endpoint>.json
+    (lista de registros ou {"value": [...]}), filtradas pelo servidor a cada requisição.
+
+    Atributos ajustáveis entre cenários:
+        latency_ms (float): Latência fixa acrescentada a cada resposta.
+        jitter_ms (float): Variação aleatória (uniforme) somada à latência.
+        failure_rate (float): Fração das requisições de dados respondidas com erro (503 no SGS, 500 no OData).
+        history_start (date): Início do histórico sintético das séries e do Focus.
+        periodicities (dict): Periodicidade sintética por código SGS (padrão: "diaria", em dias úteis).
+
+    Exemplo de uso:
+    with StandInBCBServer(focus_endpoints, latency_ms=50) as server:
+        os.environ["COLETOR_BCB_SGS_URL"] = server.sgs_url
+        os.environ["COLETOR_BCB_FOCUS_URL"] = server.focus_url
+    """
+
+    def __init__(self, focus_endpoints: dict | None = None, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 failure_rate: float = 0.0, history_start: date = date(2000, 1, 1), periodicities: dict | None = None,
+                 recordings_dir: str | None = None, seed: int = 0, host: str = "127.0.0.1", port: int = 0):
+        self.focus_endpoints = focus_endpoints or {}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.history_start = history_start
+        self.periodicities = dict(periodicities or {})
+        self.recordings_dir = recordings_dir
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._recordings = {}
+        self.reset_stats()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def sgs_url(self) -> str:
+        return self.base_url
+
+    @property
+    def focus_url(self) -> str:
+        return f"{self.base_url}{FOCUS_PREFIX}/"
+
+    def start(self) -> "StandInBCBServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stand-in-bcb", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.stats = {"requisicoes": 0, "falhas_injetadas": 0, "bytes_enviados": 0, "registros_enviados": 0}
+
+    def snapshot_stats(self) -> dict:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def _should_fail(self) -> bool:
+        if self.failure_rate <= 0:
+            return False
+        with self._random_lock:
+            return self._random.random() < self.failure_rate
+
+    def _delay(self):
+        delay = self.latency_ms
+        if self.jitter_ms:
+            with self._random_lock:
+                delay += self._random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _load_recording(self, kind: str, name: str) -> list | None:
+        if not self.recordings_dir:
+            return None
+        path = os.path.join(self.recordings_dir, kind, f"{name}.json")
+        if path not in self._recordings:
+            records = None
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    records = json.load(f)
+                if isinstance(records, dict):
+                    records = records.get("value", [])
+            self._recordings[path] = records
+        return self._recordings[path]
+
+    # ------------------------------------------------------------------
+    # SGS
+    # ------------------------------------------------------------------
+    def sgs_records(self, code: str, start: date, end: date) -> list[dict]:
+        """
+        Observações da série no intervalo, no formato da API do SGS ({"data": "dd/mm/aaaa", "valor": "..."}).
+        """
+        recorded = self._load_recording("sgs", code)
+        if recorded is not None:
+            selected = []
+            for item in recorded:
+                day = datetime.strptime(item["data"], "%d/%m/%Y").date()
+                if start <= day <= end:
+                    selected.append(item)
+            return selected
+
+        start = max(start, self.history_start)
+        end = min(end, date.today())
+        if start > end:
+            return []
+        frequency = FREQUENCIES.get(self.periodicities.get(code, "diaria"), "B")
+        dates = pd.date_range(self.history_start, end, freq=frequency)
+        offset = int(dates.searchsorted(pd.Timestamp(start)))
+        base = zlib.crc32(code.encode()) % 1000 / 100
+        return [
+            {"data": day.strftime("%d/%m/%Y"), "valor": f"{base + ((offset + index) % 250) / 1000:.4f}"}
+            for index, day in enumerate(dates[offset:])
+        ]
+
+    # ------------------------------------------------------------------
+    # Expectativas (OData)
+    # ------------------------------------------------------------------
+    def _fields(self, endpoint: str) -> dict:
+        """
+        Campos do endpoint (parâmetros sem `campo`), com o tipo OData de cada um.
+        """
+        fields = {}
+        for name, config in self.focus_endpoints[endpoint].get("parametros", {}).items():
+            config = config or {}
+            if "campo" in config:
+                continue
+            fields[name] = "Edm.Date" if name == "Data" else ODATA_TYPES.get(config.get("tipo"), "Edm.String")
+        return fields
+
+    def service_document(self) -> dict:
+        return {
+            "@odata.context": f"{self.focus_url}$metadata",
+            "value": [{"name": name, "kind": "EntitySet", "url": name} for name in self.focus_endpoints],
+        }
+
+    def metadata_document(self) -> str:
+        entity_types = []
+        entity_sets = []
+        for endpoint in self.focus_endpoints:
+            properties = "".join(
+                f'<Property Name="{escape(name)}" Type="{odata_type}"/>' for name, odata_type in self._fields(endpoint).items()
+            )
+            entity_types.append(f'<EntityType Name="{endpoint}Type">{properties}</EntityType>')
+            entity_sets.append(f'<EntitySet Name="{endpoint}" EntityType="{FOCUS_NAMESPACE}.{endpoint}Type"/>')
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<edmx:Edmx Version="4.0" xmlns:edmx="http://docs.oasis-open.org/odata/ns/edmx">'
+            '<edmx:DataServices>'
+            f'<Schema Namespace="{FOCUS_NAMESPACE}" xmlns="http://docs.oasis-open.org/odata/ns/edm">'
+            f'{"".join(entity_types)}<EntityContainer Name="Container">{"".join(entity_sets)}</EntityContainer>'
+            '</Schema></edmx:DataServices></edmx:Edmx>'
+        )
+
+    def _dimension_values(self, endpoint: str, name: str, odata_type: str, eq_filters: dict, year: int) -> list:
+        if name in eq_filters:
+            return [eq_filters[name]]
+        if name.lower() == "datareferencia":
+            return [str(year + k) for k in range(REFERENCE_COUNT)]
+        if name.lower() == "reuniao":
+            return [f"R{k + 1}/{year}" for k in range(REFERENCE_COUNT)]
+        options = (self.focus_endpoints[endpoint]["parametros"].get(name) or {}).get("opcoes")
+        if options:
+            return [options[0]]
+        return [0] if odata_type == "Edm.Int32" else ["S"]
+
+    def _synthetic_focus_records(self, endpoint: str, clauses: list[tuple]) -> list[dict]:
+        """
+        Gera, para cada dia útil do intervalo de Data dos filtros, um registro por combinação
+        das dimensões da chave natural (os demais campos recebem valores determinísticos).
+        """
+        fields = self._fields(endpoint)
+        eq_filters = {field: value for field, op, value in clauses if op == "eq" and field != "Data"}
+        starts = [value for field, op, value in clauses if field == "Data" and op in ("ge", "gt", "eq")]
+        ends = [value for field, op, value in clauses if field == "Data" and op in ("le", "lt", "eq")]
+        start = max([self.history_start] + [date.fromisoformat(value) for value in starts])
+        end = min([date.today()] + [date.fromisoformat(value) for value in ends])
+        if start > end:
+            return []
+
+        key_fields = [name for name in self.focus_endpoints[endpoint].get("chave_natural", []) if name in fields and name != "Data"]
+        value_fields = [name for name in fields if name not in key_fields and name != "Data"]
+        records = []
+        for day in pd.bdate_range(start, end):
+            combinations = [{}]
+            for name in key_fields:
+                values = self._dimension_values(endpoint, name, fields[name], eq_filters, day.year)
+                combinations = [dict(combination, **{name: value}) for combination in combinations for value in values]
+            for position, combination in enumerate(combinations):
+                record = {"Data": day.strftime("%Y-%m-%d"), **combination}
+                seed = (day.toordinal() + position) % 997
+                for name in value_fields:
+                    record[name] = seed if fields[name] == "Edm.Int32" else round(3 + seed / 1000, 4)
+                records.append(record)
+        return records
+
+    @staticmethod
+    def _parse_filter(expression: str) -> list[tuple]:
+        clauses = []
+        for field, op, raw in FILTER_CLAUSE.findall(expression or ""):
+            if raw.startswith("'"):
+                value = raw[1:-1].replace("''", "'")
+            else:
+                try:
+                    value = int(raw)
+                except ValueError:
+                    try:
+                        value = float(raw)
+                    except ValueError:
+                        value = raw
+            clauses.append((field, op, value))
+        return clauses
+
+    def focus_page(self, endpoint: str, params: dict) -> list[dict]:
+        """
+        Aplica $filter, $orderby, $skip, $top e $select aos registros (gravados ou sintéticos) do endpoint.
+        """
+        clauses = self._parse_filter(params.get("$filter"))
+        records = self._load_recording("focus", endpoint)
+        if records is None:
+            records = self._synthetic_focus_records(endpoint, clauses)
+        comparisons = {
+            "eq": lambda a, b: a == b, "ge": lambda a, b: a >= b, "le": lambda a, b: a <= b,
+            "gt": lambda a, b: a > b, "lt": lambda a, b: a < b,
+        }
+        selected = [
+            record for record in records
+            if all(field in record and comparisons[op](record[field], value) for field, op, value in clauses)
+        ]
+        order = [part.split()[0] for part in (params.get("$orderby") or "").split(",") if part.strip()]
+        if order:
+            selected.sort(key=lambda record: tuple(str(record.get(field)) for field in order))
+        skip = int(params.get("$skip") or 0)
+        top = params.get("$top")
+        selected = selected[skip:skip + int(top)] if top else selected[skip:]
+        if params.get("$select"):
+            columns = params["$select"].split(",")
+            selected = [{column: record.get(column) for column in columns} for record in selected]
+        return selected
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body, content_type: str = "application/json; charset=utf-8", records: int = 0):
+                payload = body if isinstance(body, bytes) else (body if isinstance(body, str) else json.dumps(body, ensure_ascii=False)).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                server._count(bytes_enviados=len(payload), registros_enviados=records)
+
+            def do_GET(self):
+                server._count(requisicoes=1)
+                server._delay()
+                parts = urlsplit(self.path)
+                params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+                try:
+                    sgs_match = SGS_PATH.match(parts.path)
+                    if sgs_match:
+                        self._handle_sgs(sgs_match.group(1), params)
+                    elif parts.path.startswith(FOCUS_PREFIX):
+                        self._handle_focus(parts.path[len(FOCUS_PREFIX):].strip("/"), params)
+                    else:
+                        self._send(404, {"error": "Rota não encontrada"})
+                except Exception as e:
+                    self._send(500, {"error": str(e)})
+
+            def _handle_sgs(self, code: str, params: dict):
+                if server._should_fail():
+                    server._count(falhas_injetadas=1)
+                    self._send(503, {"error": "Falha simulada"})
+                    return
+                start = datetime.strptime(params.get("dataInicial", "01/01/1900"), "%d/%m/%Y").date()
+                end = datetime.strptime(params["dataFinal"], "%d/%m/%Y").date() if "dataFinal" in params else date.today()
+                if server.periodicities.get(code, "diaria") == "diaria" and (end - start).days > SGS_DAILY_LIMIT_DAYS:
+                    self._send(406, {"error": "O sistema aceita uma janela de consulta de, no máximo, 10 anos em séries de periodicidade diária"})
+                    return
+                records = server.sgs_records(code, start, end)
+                if not records:
+                    self._send(404, {"error": "Value(s) not found", "message": "Value(s) not found"})
+                    return
+                self._send(200, records, records=len(records))
+
+            def _handle_focus(self, resource: str, params: dict):
+                if not resource:
+                    self._send(200, server.service_document())
+                elif resource == "$metadata":
+                    self._send(200, server.metadata_document(), "application/xml; charset=utf-8")
+                elif resource in server.focus_endpoints:
+                    if server._should_fail():
+                        server._count(falhas_injetadas=1)
+                        self._send(500, "Falha simulada", "text/plain; charset=utf-8")
+                        return
+                    records = server.focus_page(resource, params)
+                    self._send(200, {"@odata.context": f"{server.focus_url}$metadata#{resource}", "value": records}, records=len(records))
+                else:
+                    self._send(404, {"error": f"Endpoint desconhecido: {resource}"})
+
+        return Handler
@@ -0,0 +1,66 @@
+import argparse
+import signal
+import threading
+
+from methods._run_focus_batch import _run_focus_batch
+from methods._run_series_profiling import _run_series_profiling
+from methods._run_scheduler import _run_scheduler
+from methods._run_series_collection import _run_series_collection
+from methods._run_storage_migration import _run_storage_migration
+from persistence.adapter_registry import close_all_adapters
+
+def main() -> int:
+    """
+    Ponto de entrada sem interface (Eel), para serviços e agendadores do sistema operacional.
+    Fica na raiz do projeto, ao lado do main.py, para que os arquivos de configuração sejam encontrados por get_base_path.
+
+    Comandos:
+        agendador [--uma-vez]          Mantém as séries atualizadas conforme a periodicidade de cada uma.
+        series [--completo]            Coleta as séries do series_config.yaml com observações novas esperadas
+                                       (todas e todo o histórico, com --completo).
+        focus [--jobs ...] [--completo] Executa o lote de coletas `focus_jobs` do focus_config.yaml.
+        perfis [--forcar]              Recalcula os perfis das séries gravadas (todos, com --forcar).
+        migrar [--manter-tabelas]      Importa as tabelas existentes para o layout normalizado (`observacoes` e esquema
+                                       estrela do Focus; SQLite).
+    Retorna:
+        int: Código de saída (1 se alguma coleta do lote Focus ou a migração de alguma série terminou com erro).
+    """
+    parser = argparse.ArgumentParser(description="Coletor de dados do BCB sem interface.")
+    commands = parser.add_subparsers(dest="comando", required=True)
+    scheduler_parser = commands.add_parser("agendador", help="Executa o agendador de coletas por periodicidade.")
+    scheduler_parser.add_argument("--uma-vez", action="store_true", help="Executa apenas uma rodada e encerra.")
+    series_parser = commands.add_parser("series", help="Coleta as séries do series_config.yaml com observações novas esperadas.")
+    series_parser.add_argument("--completo", action="store_true", help="Ignora o planejamento e busca todo o histórico de todas as séries.")
+    focus_parser = commands.add_parser("focus", help="Executa o lote de coletas do Boletim Focus (focus_jobs).")
+    focus_parser.add_argument("--jobs", nargs="*", help="Nomes das coletas a executar (padrão: todas).")
+    focus_parser.add_argument("--completo", action="store_true", help="Ignora as marcas d'água e busca todo o período.")
+    profile_parser = commands.add_parser("perfis", help="Calcula os perfis (periodicidade, lacunas, duplicados) das séries gravadas.")
+    profile_parser.add_argument("--forcar", action="store_true", help="Recalcula também os perfis que já estão atualizados.")
+    migration_parser = commands.add_parser("migrar", help="Migra as séries e as tabelas do Focus para o layout normalizado (SQLite).")
+    migration_parser.add_argument("--manter-tabelas", action="store_true", help="Mantém as tabelas antigas após a migração.")
+    args = parser.parse_args()
+
+    stop_event = threading.Event()
+    for signal_name in ("SIGINT", "SIGTERM"):
+        if hasattr(signal, signal_name):
+            signal.signal(getattr(signal, signal_name), lambda *_: stop_event.set())
+
+    try:
+        if args.comando == "agendador":
+            _run_scheduler(once=args.uma_vez, stop_event=stop_event)
+        elif args.comando == "series":
+            _run_series_collection(force=args.completo)
+        elif args.comando == "perfis":
+            _run_series_profiling(force=args.forcar)
+        elif args.comando == "migrar":
+            results = _run_storage_migration(keep_tables=args.manter_tabelas)
+            return 1 if any(result["status"] == "erro" for result in results) else 0
+        else:
+            results = _run_focus_batch(args.jobs, incremental=not args.completo)
+            return 1 if any(result["status"] == "erro" for result in results) else 0
+    finally:
+        close_all_adapters()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,10 +6,13 @@ document.addEventListener("DOMContentLoaded", function () {
     const contentSections = document.querySelectorAll(".content-section");
     const startCollectionBtn = document.getElementById("start-collection-btn");
     const startFocusCollectionBtn = document.getElementById("start-focus-collection-btn");
+    const startFocusBatchBtn = document.getElementById("start-focus-batch-btn");
     const clearLogsBtn = document.getElementById("clear-logs-btn");
     const logContainer = document.getElementById("log-container");
     const loadingOverlay = document.getElementById("loading-overlay");
     const seriesSelect = document.getElementById("series-select");
+    const dataViewStartDate = document.getElementById("data-view-start-date");
+    const dataViewEndDate = document.getElementById("data-view-end-date");
     const exportCsvBtn = document.getElementById("export-csv-btn");
     const exportExcelBtn = document.getElementById("export-excel-btn");
     const dataTableElement = document.getElementById("data-table");
@@ -35,6 +38,9 @@ document.addEventListener("DOMContentLoaded", function () {
     // ===================================================================
     let isCollecting = false;
     let dataTable;
+    // Identifica a carga de dados em andamento; trocar de série cancela as páginas pendentes.
+    let dataLoadToken = 0;
+    const SERIES_PAGE_SIZE = 5000;
     // <<< ALTERAÇÃO >>>: Variável para armazenar a configuração do Focus vinda do YAML.
     let focusConfigData = null;
 
@@ -52,8 +58,11 @@ document.addEventListener("DOMContentLoaded", function () {
 
         startCollectionBtn.addEventListener("click", handleStartCollection);
         startFocusCollectionBtn.addEventListener("click", handleStartFocusCollection);
+        startFocusBatchBtn.addEventListener("click", handleStartFocusBatch);
         clearLogsBtn.addEventListener("click", handleClearLogs);
         seriesSelect.addEventListener("change", handleSeriesSelectChange);
+        dataViewStartDate.addEventListener("change", handleSeriesSelectChange);
+        dataViewEndDate.addEventListener("change", handleSeriesSelectChange);
         exportCsvBtn.addEventListener("click", () => handleExport("csv"));
         exportExcelBtn.addEventListener("click", () => handleExport("excel"));
         addSeriesToListBtn.addEventListener("click", handleAddSeriesToList);
@@ -105,8 +114,10 @@ document.addEventListener("DOMContentLoaded", function () {
     function handleStartCollection() {
         if (isCollecting) return;
         setCollectionState(true, 'series');
-        addLog("Iniciando processo de coleta de Séries Temporais...", "info");
-        eel.start_data_collection();
+        // Coleta completa: ignora o planejamento e busca todo o histórico de todas as séries
+        const force = document.getElementById("force-refresh-checkbox").checked;
+        addLog(force ? "Iniciando coleta completa de Séries Temporais..." : "Iniciando processo de coleta de Séries Temporais...", "info");
+        eel.start_data_collection(force);
     }
 
     function handleStartFocusCollection() {
@@ -124,7 +135,18 @@ document.addEventListener("DOMContentLoaded", function () {
         addLog(`Endpoint selecionado: ${focusConfig.endpoint}`, "info");
         addLog(`Filtros aplicados: ${JSON.stringify(focusConfig.filters)}`, "info");
         
-        eel.start_focus_collection(focusConfig.endpoint, focusConfig.filters);
+        if (focusConfig.fields) {
+            addLog(`Campos selecionados: ${focusConfig.fields.join(", ")}`, "info");
+        }
+
+        eel.start_focus_collection(focusConfig.endpoint, focusConfig.filters, focusConfig.fields);
+    }
+
+    function handleStartFocusBatch() {
+        if (isCollecting) return;
+        setCollectionState(true, 'focus');
+        addLog("Iniciando lote de coletas do Boletim Focus (focus_jobs)...", "info");
+        eel.start_focus_batch(null);
     }
 
     function handleClearLogs() {
@@ -140,6 +162,7 @@ document.addEventListener("DOMContentLoaded", function () {
             startCollectionBtn.innerHTML = collecting ? `<i class="fas fa-spinner fa-spin"></i> Coletando...` : `<i class="fas fa-download"></i> Iniciar Coleta Séries Temporais`;
         } else if (type === 'focus') {
             startFocusCollectionBtn.disabled = collecting;
+            startFocusBatchBtn.disabled = collecting;
             startFocusCollectionBtn.innerHTML = collecting ? `<i class="fas fa-spinner fa-spin"></i> Coletando...` : `<i class="fas fa-chart-line"></i> Iniciar Coleta Boletim Focus`;
         }
     }
@@ -157,6 +180,47 @@ document.addEventListener("DOMContentLoaded", function () {
         });
     }
 
+    // Decodifica o payload colunar ("colunar-v1") enviado por get_series_page em linhas para o DataTable.
+    // Datas chegam como Int32 (dias desde 1970-01-01) e números como Float64, ambos em base64.
+    function decodeBase64Buffer(base64) {
+        const binary = atob(base64);
+        const bytes = new Uint8Array(binary.length);
+        for (let i = 0; i < binary.length; i++) {
+            bytes[i] = binary.charCodeAt(i);
+        }
+        return bytes.buffer;
+    }
+
+    function decodeColumnarPayload(payload) {
+        const DATE_NULL = -2147483648;
+        const MS_PER_DAY = 86400000;
+        const columns = payload.columns.map(column => {
+            if (column.type === "date") {
+                const days = new Int32Array(decodeBase64Buffer(column.data));
+                const formatted = new Array(days.length);
+                for (let i = 0; i < days.length; i++) {
+                    formatted[i] = days[i] === DATE_NULL ? null : new Date(days[i] * MS_PER_DAY).toISOString().slice(0, 10);
+                }
+                return formatted;
+            }
+            if (column.type === "float64") {
+                const values = new Float64Array(decodeBase64Buffer(column.data));
+                return Array.from(values, value => Number.isNaN(value) ? null : value);
+            }
+            return column.data;
+        });
+
+        const rows = new Array(payload.length);
+        for (let i = 0; i < payload.length; i++) {
+            const row = new Array(columns.length);
+            for (let j = 0; j < columns.length; j++) {
+                row[j] = columns[j][i];
+            }
+            rows[i] = row;
+        }
+        return rows;
+    }
+
     async function handleSeriesSelectChange() {
         const seriesName = seriesSelect.value;
         
@@ -177,12 +241,22 @@ document.addEventListener("DOMContentLoaded", function () {
             return;
         }
 
+        const loadToken = ++dataLoadToken;
+        const startDate = dataViewStartDate.value || null;
+        const endDate = dataViewEndDate.value || null;
+
         try {
-            // Passo 2: Buscar os dados do backend PRIMEIRO.
-            const seriesData = await eel.get_series_data(seriesName)();
+            // Passo 2: Buscar a primeira página dos dados no backend.
+            // O filtro de datas é aplicado no banco e as páginas seguintes são carregadas sob demanda.
+            let page = await eel.get_series_page(seriesName, startDate, endDate, null, SERIES_PAGE_SIZE, null, "colunar")();
+            if (loadToken !== dataLoadToken) return;
+
+            if (!page.success) {
+                throw new Error(page.error);
+            }
 
             // Passo 3: verificar se os dados retornados são válidos.
-            if (!seriesData || seriesData.length === 0) {
+            if (page.payload.length === 0) {
                 addLog(`A tabela '${seriesName}' está vazia ou não retornou dados.`, 'warning');
                 exportCsvBtn.disabled = true;
                 exportExcelBtn.disabled = true;
@@ -191,19 +265,17 @@ document.addEventListener("DOMContentLoaded", function () {
                 return;
             }
 
-            // Passo 4: Construir as colunas e os dados dinamicamente.
-            const columns = Object.keys(seriesData[0]).map(key => ({
-                title: key,
-                data: key
+            // Passo 4: Construir as colunas dinamicamente (linhas chegam como arrays, na ordem das colunas).
+            const columns = page.columns.map(key => ({
+                title: key
             }));
 
-            const data = seriesData;
-
-            // Passo 5: Inicializar o DataTable com a nova estrutura.
+            // Passo 5: Inicializar o DataTable com a primeira página.
             dataTable = $(dataTableElement).DataTable({
-                data: data,
+                data: decodeColumnarPayload(page.payload),
                 columns: columns,
                 responsive: true,
+                deferRender: true,
                 language: {
                     url: "https://cdn.datatables.net/plug-ins/1.11.5/i18n/pt-BR.json"
                 }
@@ -213,6 +285,16 @@ document.addEventListener("DOMContentLoaded", function () {
             exportCsvBtn.disabled = false;
             exportExcelBtn.disabled = false;
 
+            // Passo 7: Acrescentar as páginas restantes sem bloquear a interface.
+            while (page.next_cursor) {
+                page = await eel.get_series_page(seriesName, startDate, endDate, null, SERIES_PAGE_SIZE, page.next_cursor, "colunar")();
+                if (loadToken !== dataLoadToken || !dataTable) return;
+                if (!page.success) {
+                    throw new Error(page.error);
+                }
+                dataTable.rows.add(decodeColumnarPayload(page.payload)).draw(false);
+            }
+
         } catch (error) {
             addLog(`Erro ao carregar a tabela '${seriesName}': ${error.message}`, 'error');
             console.error("Erro detalhado do DataTable:", error);
@@ -331,9 +413,11 @@ document.addEventListener("DOMContentLoaded", function () {
         displayMessage(saveConfigMessage, "Validando e salvando...", "info");
         
         const result = await eel.validate_and_save_configuration(configData)();
+        markSeriesValidationResults(rows, result.results || []);
 
         if (result.success) {
-            displayMessage(saveConfigMessage, "Configurações salvas com sucesso!", "success");
+            const validated = (result.results || []).filter(item => item.status === "valida").length;
+            displayMessage(saveConfigMessage, `Configurações salvas com sucesso! ${validated} série(s) nova(s) ou alterada(s) validada(s).`, "success");
             
             const newSeriesRows = configuredSeriesTableBody.querySelectorAll(".new-series-row");
             newSeriesRows.forEach(row => {
@@ -344,6 +428,15 @@ document.addEventListener("DOMContentLoaded", function () {
         }
     }
 
+    // Destaca as linhas das séries reprovadas; o resultado de cada série vem na mesma ordem das linhas enviadas
+    function markSeriesValidationResults(rows, results) {
+        rows.forEach((row, index) => {
+            const item = results[index];
+            row.classList.toggle("invalid-series-row", Boolean(item && item.status === "erro"));
+            row.title = item && item.message ? item.message : "";
+        });
+    }
+
 
     // ===================================================================
     // <<< INÍCIO DA NOVA LÓGICA PARA CONFIGURAÇÕES DO BOLETIM FOCUS >>>
@@ -432,11 +525,20 @@ document.addEventListener("DOMContentLoaded", function () {
         let filtersHTML = '';
         
         // Lista de parâmetros que são dados de RETORNO e não devem virar filtros.
-        const nonFilterParams = ['Data', 'Media', 'Mediana', 'DesvioPadrao', 'Minimo', 'Maximo', 'numeroRespondentes', 'baseCalculo', 'coeficienteVariacao'];
+        // Data e DataFim têm campos próprios no formulário.
+        const nonFilterParams = ['Data', 'DataFim', 'Media', 'Mediana', 'DesvioPadrao', 'Minimo', 'Maximo', 'numeroRespondentes', 'baseCalculo', 'coeficienteVariacao'];
+        const keyColumns = (endpointConfig && endpointConfig.chave_natural) || [];
+        const resultFields = [];
 
         // Itera sobre os parâmetros definidos no YAML para o endpoint selecionado.
         if (endpointConfig && endpointConfig.parametros) {
             for (const paramKey in endpointConfig.parametros) {
+                // Campos de resultado (sem operador) que não fazem parte da chave podem ser omitidos da consulta.
+                const param = endpointConfig.parametros[paramKey];
+                if (!param.operador && !param.campo && !keyColumns.includes(paramKey)) {
+                    resultFields.push(paramKey);
+                }
+
                 // Pula os parâmetros que não são filtros de entrada.
                 if (nonFilterParams.some(p => p.toLowerCase() === paramKey.toLowerCase())) {
                     continue;
@@ -463,6 +565,17 @@ document.addEventListener("DOMContentLoaded", function () {
             }
         }
 
+        if (resultFields.length > 0) {
+            filtersHTML += '<div class="form-group">';
+            filtersHTML += '<label for="focus-fields-select">Campos a coletar (Ctrl+clique para desmarcar):</label>';
+            filtersHTML += `<select id="focus-fields-select" class="form-control" multiple size="${Math.min(resultFields.length, 6)}">`;
+            resultFields.forEach(field => {
+                filtersHTML += `<option value="${field}" selected>${field}</option>`;
+            });
+            filtersHTML += '</select>';
+            filtersHTML += '</div>';
+        }
+
         dynamicContainer.innerHTML = filtersHTML || '<p class="text-muted">Nenhum filtro configurável para este endpoint.</p>';
     }
 
@@ -484,7 +597,7 @@ document.addEventListener("DOMContentLoaded", function () {
         
         // Pega os valores dos filtros que foram criados dinamicamente
         const dynamicContainer = document.getElementById("dynamic-filters-container");
-        const dynamicInputs = dynamicContainer.querySelectorAll("input, select");
+        const dynamicInputs = dynamicContainer.querySelectorAll("input[name], select[name]");
         
         dynamicInputs.forEach(input => {
             // Adiciona ao objeto de filtros somente se tiver um valor
@@ -498,9 +611,20 @@ document.addEventListener("DOMContentLoaded", function () {
             delete filters.DataFim;
         }
 
+        // Campos selecionados para a projeção ($select). Se todos estiverem marcados, nenhuma projeção é enviada.
+        let fields = null;
+        const fieldsSelect = document.getElementById("focus-fields-select");
+        if (fieldsSelect) {
+            const selected = Array.from(fieldsSelect.selectedOptions).map(option => option.value);
+            if (selected.length < fieldsSelect.options.length) {
+                fields = selected;
+            }
+        }
+
         return {
             endpoint: endpoint,
-            filters: filters
+            filters: filters,
+            fields: fields
         };
     }
     
@@ -512,23 +636,47 @@ document.addEventListener("DOMContentLoaded", function () {
     // ===================================================================
     // FUNÇÕES DE LOG E GLOBAIS
     // ===================================================================
-    eel.expose(add_log);
-    function add_log(message, type = 'info') {
-        addLog(message, type);
+    // Quantidade máxima de mensagens mantidas no painel de logs
+    const MAX_LOG_ENTRIES = 1000;
+
+    // Recebe os eventos de log em lotes (ver utils/log_bus.py); cada lote é inserido no painel de uma só vez.
+    eel.expose(add_logs);
+    function add_logs(events) {
+        const fragment = document.createDocumentFragment();
+        events.forEach(event => {
+            fragment.appendChild(createLogEntry(event.mensagem, event.nivel, event.horario));
+        });
+        appendLogEntries(fragment);
     }
 
     function addLog(message, type = "info") {
+        const fragment = document.createDocumentFragment();
+        fragment.appendChild(createLogEntry(message, type));
+        appendLogEntries(fragment);
+    }
+
+    function createLogEntry(message, type = "info", timestamp = null) {
         const logEntry = document.createElement("div");
         logEntry.className = `log-entry ${type}`;
-        const timestamp = new Date().toLocaleTimeString("pt-BR");
+        timestamp = timestamp || new Date().toLocaleTimeString("pt-BR");
         logEntry.innerHTML = `<span class="timestamp">[${timestamp}]</span> <span class="message">${message}</span>`;
-        logContainer.appendChild(logEntry);
-        logContainer.scrollTop = logContainer.scrollHeight;
-        
         logEntry.style.opacity = '0';
+        return logEntry;
+    }
+
+    function appendLogEntries(fragment) {
+        const entries = Array.from(fragment.children);
+        logContainer.appendChild(fragment);
+        while (logContainer.children.length > MAX_LOG_ENTRIES) {
+            logContainer.removeChild(logContainer.firstChild);
+        }
+        logContainer.scrollTop = logContainer.scrollHeight;
+
         requestAnimationFrame(() => {
-            logEntry.style.transition = 'opacity 0.5s ease';
-            logEntry.style.opacity = '1';
+            entries.forEach(logEntry => {
+                logEntry.style.transition = 'opacity 0.5s ease';
+                logEntry.style.opacity = '1';
+            });
         });
     }
 
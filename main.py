@@ -1,123 +1,211 @@
+import copy
 import pandas as pd
 import yaml
 from datetime import datetime
+import atexit
 import eel
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from methods._run_focus_batch import _run_focus_batch
 from methods._run_focus_collection import _run_focus_collection
-from methods._run_series_collection import _run_series_collection
+from methods._run_series_collection import _run_series_collection, DEFAULT_MAX_WORKERS, DEFAULT_RATE_LIMIT_PER_HOST
 from modules.data_acquirer_sgs import fetch_bcb_series
+from modules.data_cache import get_response_cache
 from modules.data_config import ConfigManager
-from modules.data_processor import process_series_data, infer_periodicity
-from modules.data_exporter import export_dataframe
-from persistence.sqlite_adapter import SQLiteAdapter
+from modules.data_processor import process_series_data
+from modules.data_profiler import MIN_CONFIDENCE, profile_series
+from modules.data_exporter import export_chunks
+from persistence.adapter_registry import get_adapter, close_all_adapters
+from utils.columnar_payload import encode_columnar
 from utils.get_base_path import get_base_path
+from utils.metrics import get_metrics, prometheus_text
+from utils.rate_limiter import RateLimiter
+
+# Quantidade de linhas lidas do banco por bloco durante a exportação
+EXPORT_CHUNK_SIZE = 50000
+# Janela de dados recentes buscada para validar uma série, por periodicidade
+VALIDATION_DAYS_BACK = {"diaria": 30, "semanal": 90, "mensal": 90, "trimestral": 400, "anual": 366}
 
 # Inicializa o Eel
 eel.init("frontend")
 
+# Libera o pool de conexões compartilhado ao encerrar a aplicação
+atexit.register(close_all_adapters)
+
+def _to_records(df: pd.DataFrame) -> list[dict]:
+    """
+    Converte o DataFrame em uma lista de dicionários serializável pelo Eel.
+    Colunas de data nativas (ex: adaptador DuckDB) são enviadas como texto, no mesmo formato do SQLite.
+    """
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+    return df.to_dict("records")
+
 @eel.expose
-def start_data_collection():
+def start_data_collection(force: bool = False):
     """
     Função exposta para a interface web para iniciar a coleta de dados.
     Executa em uma thread separada para não bloquear a UI.
+    Apenas as séries com observações novas esperadas são buscadas; com `force`, todas as séries e todo o histórico.
     """
-    threading.Thread(target=_run_series_collection).start()
+    threading.Thread(target=_run_series_collection, args=(force,)).start()
 
 @eel.expose
-def start_focus_collection(endpoint: str, filters: dict):
+def start_focus_collection(endpoint: str, filters: dict, fields: list | None = None, incremental: bool = True):
     """
     Função exposta para a interface web para iniciar a coleta do Boletim Focus.
     Executa em uma thread separada para não bloquear a UI.
+    `fields` restringe os campos retornados pela API (as colunas da chave natural são sempre incluídas).
+    Com `incremental`, apenas as datas posteriores à última já gravada para os mesmos filtros são buscadas.
+    """
+    threading.Thread(target=_run_focus_collection, args=(endpoint, filters, fields, incremental)).start()
+
+@eel.expose
+def start_focus_batch(job_names: list | None = None):
+    """
+    Função exposta para a interface web para executar o lote de coletas `focus_jobs` do focus_config.yaml.
+    Executa em uma thread separada para não bloquear a UI.
     """
-    threading.Thread(target=_run_focus_collection, args=(endpoint, filters)).start()
+    threading.Thread(target=_run_focus_batch, args=(job_names,)).start()
 
 @eel.expose
 def get_series_list():
     """
     Retorna a lista de séries disponíveis no banco de dados.
     """
-    config_path = get_base_path("series_config.yaml")
     try:
-        with open(config_path, "r") as f:
-            config = yaml.safe_load(f)
-    except FileNotFoundError:
+        adapter = get_adapter(ConfigManager.load_series_config().get("database", {}))
+        return adapter.get_table_names()
+    except Exception as e:
+        print(f"Erro ao listar séries: {e}")
         return []
 
-    db_config = config.get("database", {})
-    db_type = db_config.get("type")
-    db_name = db_config.get("db_name")
+@eel.expose
+def get_series_catalog():
+    """
+    Retorna o catálogo de séries (fonte, código, periodicidade, intervalo de datas e total de registros).
+    """
+    try:
+        adapter = get_adapter(ConfigManager.load_series_config().get("database", {}))
+        return adapter.get_catalog()
+    except Exception as e:
+        print(f"Erro ao carregar o catálogo de séries: {e}")
+        return []
 
-    if db_type == "sqlite":
-        adapter = SQLiteAdapter(db_name)
-        adapter.connect()
-        try:
-            table_names = adapter.get_table_names()
-            return table_names
-        finally:
-            adapter.disconnect()
-    
-    return []
+@eel.expose
+def get_series_profiles():
+    """
+    Retorna os perfis gravados das séries (periodicidade e confiança, dias úteis, lacunas, duplicados,
+    intervalo de datas e mínimo/máximo dos valores), calculados ao final de cada coleta.
+    """
+    try:
+        adapter = get_adapter(ConfigManager.load_series_config().get("database", {}))
+        return {"success": True, "profiles": adapter.get_profiles()}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+@eel.expose
+def get_run_metrics(formato: str = "json"):
+    """
+    Retorna as métricas da coleta em andamento ou, se não houver, da última coleta instrumentada.
+    `formato` pode ser "json" (relatório) ou "prometheus" (texto no formato de exposição do Prometheus).
+    """
+    try:
+        report = get_metrics().snapshot()
+        if formato == "prometheus":
+            return {"success": True, "metrics": prometheus_text(report)}
+        return {"success": True, "metrics": report}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
 
 @eel.expose
 def get_series_data(series_name: str):
     """
     Retorna os dados de uma série específica.
     """
-    config_path = get_base_path("series_config.yaml")
     try:
-        with open(config_path, "r") as f:
-            config = yaml.safe_load(f)
-    except FileNotFoundError:
+        adapter = get_adapter(ConfigManager.load_series_config().get("database", {}))
+        df = adapter.fetch_full_table_data(series_name)
+        return _to_records(df)
+    except Exception as e:
+        print(f"Erro ao carregar a série {series_name}: {e}")
         return []
 
-    db_config = config.get("database", {})
-    db_type = db_config.get("type")
-    db_name = db_config.get("db_name")
+@eel.expose
+def get_series_page(series_name: str, start_date: str | None = None, end_date: str | None = None,
+                    columns: list | None = None, page_size: int = 1000, cursor: str | None = None,
+                    payload_format: str = "registros"):
+    """
+    Retorna uma página dos dados de uma série, com filtro de datas e projeção de colunas
+    executados no banco. O campo "next_cursor" deve ser repassado para obter a página seguinte
+    e é None quando não há mais dados.
 
-    if db_type == "sqlite":
-        adapter = SQLiteAdapter(db_name)
-        adapter.connect()
-        try:
-            df = adapter.fetch_full_table_data(series_name)
-            return df.to_dict("records")
-        finally:
-            adapter.disconnect()
-    
-    return []
+    Com payload_format="colunar", os dados são enviados no campo "payload" em formato orientado
+    a colunas (datas como inteiros e valores como Float64 empacotados, ver `encode_columnar`),
+    em vez de uma lista de dicionários no campo "rows".
+    """
+    try:
+        adapter = get_adapter(ConfigManager.load_series_config().get("database", {}))
+        df, next_cursor = adapter.fetch_table_page(series_name, columns or None, start_date or None, end_date or None, page_size, cursor)
+        if payload_format == "colunar":
+            return {"success": True, "columns": list(df.columns), "payload": encode_columnar(df), "next_cursor": next_cursor}
+        return {"success": True, "columns": list(df.columns), "rows": _to_records(df), "next_cursor": next_cursor}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
 
 @eel.expose
-def export_series(series_name: str, export_format: str):
+def export_series(series_name: str, export_format: str, compress: bool = False):
     """
-    Exporta uma série para CSV ou Excel.
+    Exporta uma série para CSV (opcionalmente compactado com gzip) ou Excel.
+    Os dados são lidos do banco em blocos e gravados no arquivo à medida que chegam.
     """
     try:
-        config_path = get_base_path("series_config.yaml")
-        with open(config_path, "r") as f:
-            config = yaml.safe_load(f)
-
-        db_config = config.get("database", {})
-        db_type = db_config.get("type")
-        db_name = db_config.get("db_name")
-
-        if db_type == "sqlite":
-            adapter = SQLiteAdapter(db_name)
-            adapter.connect()
-            try:
-                df = adapter.fetch_full_table_data(series_name)
-                if not df.empty:
-                    file_path = export_dataframe(df, export_format, series_name)
-                    return {"success": True, "path": file_path}
-                else:
-                    return {"success": False, "error": "Nenhum dado encontrado para a série"}
-            finally:
-                adapter.disconnect()
-        
-        return {"success": False, "error": "Tipo de banco não suportado"}
+        adapter = get_adapter(ConfigManager.load_series_config().get("database", {}))
+        if series_name not in adapter.get_table_names():
+            return {"success": False, "error": "Nenhum dado encontrado para a série"}
+        file_path = export_chunks(adapter.iter_table_chunks(series_name, chunk_size=EXPORT_CHUNK_SIZE), export_format, series_name, compress)
+        return {"success": True, "path": file_path}
     
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+def _validate_series(code: str, table_name: str, periodicidade: str, stored_profile: dict | None, rate_limiter=None,
+                     backend=None) -> dict:
+    """
+    Valida uma série nova ou alterada da configuração.
+
+    Se a tabela já estiver gravada com o mesmo código e tiver um perfil conclusivo (ver `profile_tables`),
+    a periodicidade é conferida pelo perfil, sem consultar a API. Caso contrário, busca dados recentes da
+    série no BCB, conforme a periodicidade informada, e confere a periodicidade inferida das datas.
+    Retorna:
+        dict: {"code", "table_name", "status" ("valida" ou "erro"), "message"}.
+    """
+    result = {"code": code, "table_name": table_name, "status": "valida", "message": ""}
+    profile = stored_profile
+    if profile is None or profile["confianca"] < MIN_CONFIDENCE:
+        try:
+            days_back = VALIDATION_DAYS_BACK.get(periodicidade, VALIDATION_DAYS_BACK["diaria"])
+            start_date = datetime.now() - pd.Timedelta(days=days_back)
+            test_data = fetch_bcb_series(code, start_date, datetime.now(), table_name, rate_limiter=rate_limiter, backend=backend)
+            if test_data.empty:
+                return {**result, "status": "erro", "message": f"Série {code} ({table_name}) não retornou dados. Verifique o código da série."}
+            test_data = process_series_data(test_data, code)
+        except Exception as e:
+            return {**result, "status": "erro", "message": f"Erro ao validar série {code} ({table_name}): {str(e)}"}
+        profile = profile_series(test_data["data"])
+        result["message"] = f"{len(test_data)} registros recentes encontrados"
+    else:
+        result["message"] = f"validada pelo perfil gravado ({profile['total_registros']} registros)"
+
+    # Só reprova quando o perfil das datas é conclusivo (confiança mínima atingida)
+    inferred_periodicity = profile["periodicidade"]
+    if inferred_periodicity != periodicidade and profile["confianca"] >= MIN_CONFIDENCE:
+        return {**result, "status": "erro",
+                "message": f"Periodicidade inconsistente para série {code} ({table_name}). Esperado: {periodicidade}, Detectado: {inferred_periodicity} (confiança {profile['confianca']:.0%})"}
+    return result
+
 @eel.expose
 def validate_and_save_configuration(config_data: dict):
     """
@@ -125,78 +213,84 @@ def validate_and_save_configuration(config_data: dict):
     Esta função realiza as seguintes operações:
     1. Carrega a configuração atual de séries a partir de um arquivo YAML.
     2. Valida a unicidade dos códigos de série e nomes de tabela na nova configuração.
-    3. Para cada série informada:
-        - Verifica se o código e o nome da tabela são únicos.
-        - Busca dados recentes da série no BCB, conforme a periodicidade informada.
-        - Valida se a série retorna dados e se a periodicidade inferida dos dados corresponde à informada.
-    4. Atualiza e salva a configuração no arquivo YAML, caso todas as validações sejam bem-sucedidas.
+    3. Compara a lista enviada com a configuração atual: séries já configuradas com o mesmo código e
+       nome de tabela não são revalidadas.
+    4. Valida em paralelo as séries novas ou alteradas (`collection.max_workers` threads, respeitando
+       `collection.rate_limit_per_host`), ver `_validate_series`:
+        - Reaproveita o perfil gravado quando a tabela já existe com o mesmo código.
+        - Caso contrário, busca dados recentes da série no BCB e confere a periodicidade inferida das datas.
+    5. Atualiza e salva a configuração no arquivo YAML, caso todas as validações sejam bem-sucedidas.
     Parâmetros:
         config_data (dict): Dicionário contendo a configuração das séries, com as chaves:
             - "series": Lista de dicionários, cada um contendo:
                 - "code": Código da série.
                 - "table_name": Nome da tabela para armazenar os dados.
-                - "periodicidade": Periodicidade esperada ("diaria", "mensal", "anual").
+                - "periodicidade": Periodicidade esperada ("diaria", "semanal", "mensal", "trimestral", "anual").
     Retorna:
-        dict: Um dicionário indicando o sucesso ou falha da operação. Em caso de falha, inclui uma mensagem de erro.
-            - {"success": True} em caso de sucesso.
-            - {"success": False, "error": <mensagem>} em caso de erro de validação ou de escrita do arquivo.
+        dict: Um dicionário indicando o sucesso ou falha da operação, com o resultado de cada série.
+            - "success": True se a configuração foi salva.
+            - "error": Resumo das falhas (apenas em caso de erro).
+            - "results": Lista com um item por série: {"code", "table_name", "status" ("inalterada",
+              "valida" ou "erro"), "message"}.
     """
 
     try:
-        current_config = ConfigManager.load_series_config()
+        # Cópia: a configuração em memória do ConfigManager é compartilhada
+        current_config = copy.deepcopy(ConfigManager.load_series_config())
     except Exception as e:
-        return {"success": False, "error": f"Erro ao carregar series_config.yaml: {str(e)}"}
-        
+        return {"success": False, "error": f"Erro ao carregar series_config.yaml: {str(e)}", "results": []}
 
-    # Critério 3: Inicializar estruturas de verificação de unicidade
+    # Critério 3: Verificação de duplicatas e diferença em relação à configuração atual
     unique_codes = set()
     unique_table_names = set()
-    
+    results = []
+    pending = []
     new_series_codes = {}
     for series in config_data.get("series", []):
         code = str(series["code"])
         table_name = series["table_name"]
         periodicidade = series["periodicidade"]
+        result = {"code": code, "table_name": table_name, "status": "inalterada", "message": ""}
 
-        # Critério 3: Verificação de duplicatas na lista atual
         if code in unique_codes:
-            return {"success": False, "error": f"Código de série duplicado encontrado: {code}"}
-        if table_name in unique_table_names:
-            return {"success": False, "error": f"Nome de tabela duplicado encontrado: {table_name}"}
-        
+            result.update(status="erro", message=f"Código de série duplicado encontrado: {code}")
+        elif table_name in unique_table_names:
+            result.update(status="erro", message=f"Nome de tabela duplicado encontrado: {table_name}")
+        elif ConfigManager.get_series_table(code) != table_name:
+            pending.append((len(results), code, table_name, periodicidade))
         unique_codes.add(code)
         unique_table_names.add(table_name)
+        new_series_codes[code] = table_name
+        results.append(result)
 
-        # Critério 1: Validação de Existência Baseada na Periodicidade
+    # Critérios 1 e 2: Validação de existência e de periodicidade das séries novas ou alteradas, em paralelo
+    if pending:
+        collection_config = current_config.get("collection", {}) or {}
+        rate_limit = collection_config.get("rate_limit_per_host", DEFAULT_RATE_LIMIT_PER_HOST)
+        rate_limiter = RateLimiter(rate_limit) if rate_limit else None
+        stored_profiles = {}
         try:
-            # Definir intervalo dinâmico baseado na periodicidade
-            if periodicidade == "diaria":
-                days_back = 30
-            elif periodicidade == "mensal":
-                days_back = 90
-            elif periodicidade == "anual":
-                days_back = 366
-            else:
-                days_back = 30  # padrão para periodicidades não reconhecidas
-            
-            start_date = datetime.now() - pd.Timedelta(days=days_back)
-            test_data = fetch_bcb_series(code, start_date, datetime.now(), table_name)
-            
-            if test_data.empty:
-                return {"success": False, "error": f"Série {code} ({table_name}) não retornou dados. Verifique o código da série."}
+            adapter = get_adapter(current_config.get("database", {}))
+            catalog_codes = {entry["nome_tabela"]: str(entry.get("codigo")) for entry in adapter.get_catalog()}
+            candidates = [table_name for _, code, table_name, _ in pending if catalog_codes.get(table_name) == code]
+            stored_profiles = adapter.get_profiles(candidates) if candidates else {}
         except Exception as e:
-            return {"success": False, "error": f"Erro ao validar série {code} ({table_name}): {str(e)}"}
+            print(f"AVISO: Perfis gravados indisponíveis; todas as séries serão validadas na API: {e}")
 
-        # Critério 2: Validação Real de Periodicidade
-        try:
-            test_data = process_series_data(test_data, code)
-            inferred_periodicity = infer_periodicity(test_data)
-            if inferred_periodicity != periodicidade and inferred_periodicity != "Desconhecida":
-                return {"success": False, "error": f"Periodicidade inconsistente para série {code} ({table_name}). Esperado: {periodicidade}, Detectado: {inferred_periodicity}"}
-        except Exception as e:
-            return {"success": False, "error": f"Erro ao validar periodicidade da série {code} ({table_name}): {str(e)}"}
-        
-        new_series_codes[code] = table_name
+        max_workers = max(1, int(collection_config.get("max_workers", DEFAULT_MAX_WORKERS)))
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+            futures = {
+                executor.submit(_validate_series, code, table_name, periodicidade, stored_profiles.get(table_name),
+                                rate_limiter, collection_config.get("sgs_backend")): position
+                for position, code, table_name, periodicidade in pending
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+    failures = [result for result in results if result["status"] == "erro"]
+    if failures:
+        summary = "; ".join(result["message"] for result in failures)
+        return {"success": False, "error": f"{len(failures)} série(s) com erro: {summary}", "results": results}
 
     current_config["series_codes"] = new_series_codes
 
@@ -204,9 +298,24 @@ def validate_and_save_configuration(config_data: dict):
         current_config_path = get_base_path("series_config.yaml")
         with open(current_config_path, "w") as f:
             yaml.safe_dump(current_config, f, sort_keys=False)
-        return {"success": True}
+        ConfigManager.invalidate("series_config.yaml")
+        return {"success": True, "results": results}
+    except Exception as e:
+        return {"success": False, "error": f"Erro ao salvar series_config.yaml: {str(e)}", "results": results}
+
+@eel.expose
+def clear_response_cache(source: str | None = None):
+    """
+    Invalida o cache local de respostas das APIs do BCB.
+    Se `source` ("sgs" ou "focus") for informado, apenas as entradas dessa fonte são removidas.
+    """
+    cache = get_response_cache()
+    if not cache:
+        return {"success": True, "removed": 0}
+    try:
+        return {"success": True, "removed": cache.invalidate(source)}
     except Exception as e:
-        return {"success": False, "error": f"Erro ao salvar series_config.yaml: {str(e)}"}
+        return {"success": False, "error": str(e)}
 
 @eel.expose
 def get_series_config():
@@ -216,7 +325,7 @@ def get_series_config():
     try:
         return ConfigManager.load_series_config()
     except Exception as e:
-        return {e}
+        return {"error": str(e)}
 
 @eel.expose
 def get_focus_config():
@@ -0,0 +1,67 @@
+from modules.data_collector import collect_focus_jobs, DEFAULT_MAX_FOCUS_JOBS
+from modules.data_config import ConfigManager
+from persistence.adapter_registry import get_adapter
+from utils.metrics import get_metrics
+from utils.rate_limiter import RateLimiter
+from utils.send_log_to_frontend import send_log_to_frontend, notify_collection_finished
+
+DEFAULT_RATE_LIMIT_PER_HOST = 5
+
+def _run_focus_batch(job_names: list[str] | None = None, incremental: bool = True) -> list[dict]:
+    """
+    Executa o lote de coletas do Boletim Focus declarado em `focus_jobs` no focus_config.yaml.
+
+    Parâmetros:
+        job_names (list[str], opcional): Nomes das coletas a executar. Se omitido, todas as coletas do lote.
+        incremental (bool): Usa as marcas d'água para buscar apenas as datas ainda não gravadas (padrão: True).
+    Fluxo:
+        1. Obtém o focus_config.yaml (validado e mantido em memória pelo ConfigManager) e seleciona as coletas de `focus_jobs`.
+        2. Obtém o adaptador compartilhado e um único limitador de requisições para todo o lote.
+        3. Executa as coletas via collect_focus_jobs, com até `collection.max_jobs` coletas simultâneas.
+        4. Envia um resumo único com o resultado de cada coleta.
+        5. Grava o relatório de instrumentação, se habilitado (seção `instrumentacao` do series_config.yaml).
+        6. Sinaliza o término do processo ao frontend (sem efeito em execuções pela linha de comando).
+    Retorna:
+        list[dict]: Um resultado por coleta (ver `collect_focus_job`).
+    """
+    send_log_to_frontend("Iniciando lote de coletas do Boletim Focus...")
+    results = []
+    metrics = get_metrics()
+    metrics.start_run("focus", ConfigManager.get_metrics_config())
+    try:
+        try:
+            config = ConfigManager.load_focus_settings()
+        except FileNotFoundError as e:
+            send_log_to_frontend(f"Erro: {e}.", "error")
+            return results
+
+        jobs = ConfigManager.get_focus_jobs(job_names)
+        if not jobs:
+            send_log_to_frontend("Nenhuma coleta encontrada em focus_jobs.")
+            return results
+
+        adapter = get_adapter(config.get("database", {}))
+        collection_config = config.get("collection") or {}
+        max_jobs = collection_config.get("max_jobs", DEFAULT_MAX_FOCUS_JOBS)
+        rate_limit = collection_config.get("rate_limit_per_host", DEFAULT_RATE_LIMIT_PER_HOST)
+        rate_limiter = RateLimiter(rate_limit) if rate_limit else None
+
+        send_log_to_frontend(f"Executando {len(jobs)} coletas com até {max_jobs} simultâneas.")
+        results = collect_focus_jobs(jobs, adapter, config.get("focus_endpoints", {}), collection_config,
+                                     max_jobs=max_jobs, rate_limiter=rate_limiter, incremental=incremental, log=send_log_to_frontend)
+
+        send_log_to_frontend("\nResumo do lote do Boletim Focus:")
+        for result in results:
+            if result["status"] == "erro":
+                send_log_to_frontend(f'- {result["nome"]} ({result["endpoint"]}): erro - {result["erro"]}', "error")
+            else:
+                send_log_to_frontend(f'- {result["nome"]} -> {result["tabela"]}: {result["status"]}, {result["registros"]} registros em {result["paginas"]} páginas, {result["duracao"]:.2f}s')
+    except Exception as e:
+        send_log_to_frontend(f"Erro durante o lote de coletas do Boletim Focus: {str(e)}", "error")
+
+    finally:
+        metrics.finish_run()
+        send_log_to_frontend("Lote de coletas do Boletim Focus finalizado.")
+        notify_collection_finished("focus")
+
+    return results
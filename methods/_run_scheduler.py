@@ -0,0 +1,88 @@
+import threading
+from datetime import datetime
+
+from methods._run_series_collection import DEFAULT_MAX_WORKERS, DEFAULT_RATE_LIMIT_PER_HOST
+from modules.data_collector import collect_series
+from modules.data_config import ConfigManager
+from modules.data_scheduler import ScheduleState, catalog_periodicities, scheduler_config
+from persistence.adapter_registry import get_adapter
+from utils.metrics import get_metrics
+from utils.rate_limiter import RateLimiter
+from utils.send_log_to_frontend import send_log_to_frontend
+
+def _run_scheduler_cycle(state: ScheduleState, now: datetime | None = None) -> list[dict]:
+    """
+    Executa uma rodada do agendador: planeja as verificações a partir do catálogo (sem consultar a API)
+    e coleta apenas as séries vencidas.
+    Retorna:
+        list[dict]: Resultados da coleta (ver `collect_series`); vazio quando nenhuma série estava vencida.
+    """
+    now = now or datetime.now()
+    config = ConfigManager.load_series_config()
+    schedule_config = scheduler_config(config.get("agendador"))
+    adapter = get_adapter(config.get("database", {}))
+    series_codes = config.get("series_codes", {})
+
+    periodicity_overrides = schedule_config.get("periodicidades")
+    last_dates = adapter.get_last_dates(list(series_codes.values()))
+    due = state.due_series(series_codes, last_dates, catalog_periodicities(adapter, periodicity_overrides), now, schedule_config)
+    results = []
+    if due:
+        collection_config = config.get("collection", {}) or {}
+        rate_limit = collection_config.get("rate_limit_per_host", DEFAULT_RATE_LIMIT_PER_HOST)
+        send_log_to_frontend(f"Agendador: {len(due)} de {len(series_codes)} séries com verificação vencida: {', '.join(due.values())}.")
+        metrics = get_metrics()
+        metrics.start_run("agendador", config.get("instrumentacao"))
+        try:
+            results = collect_series(due, adapter, max_workers=collection_config.get("max_workers", DEFAULT_MAX_WORKERS),
+                                     rate_limiter=RateLimiter(rate_limit) if rate_limit else None,
+                                     backend=collection_config.get("sgs_backend"), log=send_log_to_frontend)
+        finally:
+            metrics.finish_run()
+        # Registra o resultado (aprendendo as defasagens de divulgação) e replaneja com as novas últimas datas
+        periodicities = catalog_periodicities(adapter, periodicity_overrides)
+        last_dates = adapter.get_last_dates(list(series_codes.values()))
+        state.record_results(results, now, last_dates, periodicities)
+        state.plan(series_codes, last_dates, periodicities, datetime.now(), schedule_config)
+    state.save()
+    return results
+
+def _run_scheduler(once: bool = False, stop_event: threading.Event | None = None):
+    """
+    Executa o coletor sem interface, com agendamento conforme a periodicidade de cada série.
+
+    Parâmetros:
+        once (bool): Executa apenas uma rodada (útil para agendadores do sistema operacional, como cron).
+        stop_event (threading.Event, opcional): Encerra o laço quando sinalizado (ex: SIGTERM).
+    Fluxo:
+        1. Carrega o estado salvo do agendador (`agendador.estado` no series_config.yaml).
+        2. A cada rodada, lê as últimas datas do catálogo e define a próxima verificação de cada série
+           (ver `plan_next_check`). Séries ociosas não geram nenhuma requisição à API.
+        3. Coleta apenas as séries vencidas via collect_series e registra o resultado no estado.
+        4. Salva o estado e aguarda até a próxima verificação (no máximo `agendador.espera_maxima_segundos`,
+           para que alterações no series_config.yaml sejam percebidas).
+    """
+    stop_event = stop_event or threading.Event()
+    schedule_config = scheduler_config(ConfigManager.load_series_config().get("agendador"))
+    state = ScheduleState.load(schedule_config["estado"])
+    send_log_to_frontend(f"Agendador iniciado. Estado em {state.path}.")
+    announced_check = None
+    try:
+        while not stop_event.is_set():
+            try:
+                _run_scheduler_cycle(state)
+            except Exception as e:
+                send_log_to_frontend(f"Erro na rodada do agendador: {str(e)}", "error")
+            if once:
+                break
+
+            schedule_config = scheduler_config(ConfigManager.load_series_config().get("agendador"))
+            max_wait = float(schedule_config["espera_maxima_segundos"])
+            next_check = state.next_check()
+            wait = max_wait if next_check is None else min(max((next_check - datetime.now()).total_seconds(), 1.0), max_wait)
+            if next_check is not None and next_check != announced_check:
+                announced_check = next_check
+                send_log_to_frontend(f"Agendador: próxima verificação em {next_check.strftime('%d/%m/%Y %H:%M')}.")
+            stop_event.wait(wait)
+    finally:
+        send_log_to_frontend("Agendador finalizado.")
@@ -1,115 +1,120 @@
-import pandas as pd
-import yaml
 from datetime import datetime
-import eel
 
-from modules.data_acquirer_sgs import fetch_bcb_series
-from modules.data_processor import process_series_data
-from persistence.sqlite_adapter import SQLiteAdapter
-from utils.get_base_path import get_base_path
-from utils.send_log_to_frontend import send_log_to_frontend
+from modules.data_collector import collect_series
+from modules.data_config import ConfigManager
+from modules.data_scheduler import ScheduleState, catalog_periodicities, plan_fetch, scheduler_config
+from persistence.adapter_registry import get_adapter
+from utils.metrics import get_metrics
+from utils.rate_limiter import RateLimiter
+from utils.send_log_to_frontend import send_log_to_frontend, notify_collection_finished
 
-def _run_series_collection():
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_RATE_LIMIT_PER_HOST = 5
+
+def _run_series_collection(force: bool = False):
     """
     Executa o processo principal de coleta de séries temporais do Banco Central do Brasil (BCB).
+    Parâmetros:
+        force (bool): Coleta completa: busca todas as séries, ignorando o planejamento, e todo o histórico
+            desde 01/01/1990, regravando os registros existentes (padrão: False).
     Este método realiza as seguintes etapas:
     1. Envia log de início do processo para o frontend.
-    2. Carrega as configurações a partir do arquivo 'series_config.yaml'.
-    3. Inicializa o adaptador de banco de dados conforme especificado na configuração.
-    4. Para cada série definida na configuração:
+    2. Obtém as configurações do arquivo 'series_config.yaml' pelo ConfigManager (lido e validado uma única vez).
+    3. Obtém o adaptador de banco de dados compartilhado (com pool de conexões) conforme a configuração.
+    3.1. Planeja a coleta sem consultar a API (`plan_fetch`): a partir da última data gravada, da periodicidade
+         e da defasagem de divulgação aprendida, busca apenas as séries que podem ter observações novas e
+         informa o motivo de cada decisão.
+    4. Coleta as séries planejadas em paralelo via `collect_series`, respeitando o limite de concorrência
+       (`collection.max_workers`) e o limite de requisições por host (`collection.rate_limit_per_host`):
         - Obtém a última data registrada no banco de dados.
         - Define a data de início para a coleta (após a última data ou desde 01/01/1990).
-        - Busca os dados da série via API do BCB.
-        - Processa e filtra os dados para evitar duplicidades.
-        - Salva novos registros no banco de dados.
-        - Envia logs detalhados para o frontend sobre o progresso e resultados.
-    5. Trata e reporta erros de configuração, conexão e coleta.
-    6. Encerra a conexão com o banco de dados e sinaliza o término do processo ao frontend.
+        - Busca e processa os dados da série via API do BCB.
+        - Filtra os dados para evitar duplicidades e salva novos registros no banco de dados.
+    5. Registra o resultado no estado do agendador (`agendador.estado`), onde as defasagens são aprendidas.
+    5.1. Com a seção `instrumentacao` habilitada, grava o relatório de tempos e contadores da execução (ver `Metrics`).
+    6. Envia ao frontend um resumo com o resultado de cada série.
+    7. Trata e reporta erros de configuração, conexão e coleta.
+    8. Sinaliza o término do processo ao frontend. O adaptador permanece conectado para as demais chamadas.
     Exceções:
-        - FileNotFoundError: Caso o arquivo de configuração não seja encontrado.
-        - ValueError: Caso a configuração do banco de dados seja inválida.
+        - ValueError: Caso a configuração seja inválida (ConfigError) ou o banco de dados não seja suportado.
         - Exception: Para outros erros durante a configuração, coleta ou processamento dos dados.
     Observação:
         Esta função depende de funções auxiliares e classes externas, como:
         - send_log_to_frontend
-        - get_base_path
-        - yaml.safe_load
-        - SQLiteAdapter
-        - fetch_bcb_series
-        - process_series_data
-        - eel.collection_finished
-        - pandas (pd)
-        - datetime
+        - ConfigManager
+        - get_adapter
+        - plan_fetch
+        - collect_series
+        - RateLimiter
+        - notify_collection_finished
     """
     
     send_log_to_frontend("Iniciando processo de coleta de dados...")
-    config = {}
-    config_path = get_base_path("series_config.yaml")
     try:
-        with open(config_path, "r") as f:
-            config = yaml.safe_load(f)
-    except FileNotFoundError:
-        send_log_to_frontend(f"Erro: Arquivo series_config.yaml não encontrado em {config_path}.")
-        eel.collection_finished()()
+        config = ConfigManager.load_series_config()
+    except Exception as e:
+        send_log_to_frontend(f"Erro ao carregar series_config.yaml: {str(e)}", "error")
+        notify_collection_finished()
         return
 
-    db_config = config.get("database", {})
-    db_type = db_config.get("type")
-    db_name = db_config.get("db_name")
-    
     try:
-        if not db_type or not db_name:
-            raise ValueError("Configuração do banco de dados inválida. Verifique o arquivo series_config.yaml.")
-        if db_type == "sqlite":
-            adapter = SQLiteAdapter(db_name)
-        else:
-            send_log_to_frontend(f"Erro: Tipo de banco de dados \'{db_type}\' não suportado.")
-            eel.collection_finished()()
-            return
+        adapter = get_adapter(config.get("database", {}))
     except Exception as e:
-        send_log_to_frontend(f"Erro ao configurar o adaptador de banco de dados: {str(e)}")
-        eel.collection_finished()()
+        send_log_to_frontend(f"Erro ao configurar o adaptador de banco de dados: {str(e)}", "error")
+        notify_collection_finished()
         return
 
-    adapter.connect()
+    collection_config = config.get("collection", {}) or {}
+    max_workers = collection_config.get("max_workers", DEFAULT_MAX_WORKERS)
+    rate_limit = collection_config.get("rate_limit_per_host", DEFAULT_RATE_LIMIT_PER_HOST)
+    rate_limiter = RateLimiter(rate_limit) if rate_limit else None
+    backend = collection_config.get("sgs_backend")
 
+    metrics = get_metrics()
+    metrics.start_run("series", config.get("instrumentacao"))
     try:
         series_codes = config.get("series_codes", {})
-        for code, series_name in series_codes.items():
-            send_log_to_frontend(f"\nProcessando série: {series_name} (Código BCB: {code})")
-            last_date = adapter.get_last_date(series_name)
-            
-            start_date = None
-            if last_date:
-                start_date = last_date + pd.Timedelta(days=1)
-                send_log_to_frontend(f'Última data encontrada para {series_name}: {last_date.strftime("%Y-%m-%d")}. Buscando a partir de {start_date.strftime("%Y-%m-%d")}')
-            else:
-                start_date = datetime(1990, 1, 1)
-                send_log_to_frontend(f'Nenhum registro encontrado para {series_name}. Buscando desde {start_date.strftime("%Y-%m-%d")}')
+        schedule_config = scheduler_config(config.get("agendador"))
+        state = ScheduleState.load(schedule_config["estado"])
+        periodicity_overrides = schedule_config.get("periodicidades")
+        now = datetime.now()
 
-            raw_data = fetch_bcb_series(code, start_date, datetime.now(), series_name)
-            processed_data = process_series_data(raw_data, code)
+        # Planejamento: apenas as séries que podem ter observações novas são buscadas na API
+        plan = plan_fetch(series_codes, adapter.get_last_dates(list(series_codes.values())),
+                          catalog_periodicities(adapter, periodicity_overrides), state, now, schedule_config, force=force)
+        send_log_to_frontend("Plano de coleta:")
+        for item in plan:
+            send_log_to_frontend(f'- {item["serie"]} ({item["codigo"]}): {"buscar" if item["buscar"] else "ignorada"} - {item["motivo"]}',
+                                 serie=item["serie"], etapa="planejamento")
+        due = {item["codigo"]: item["serie"] for item in plan if item["buscar"]}
+        if not due:
+            send_log_to_frontend("Nenhuma série com observações novas esperadas. Use a coleta completa para buscar mesmo assim.")
+            return
+
+        send_log_to_frontend(f"Coletando {len(due)} de {len(series_codes)} séries com até {max_workers} requisições simultâneas.")
+        results = collect_series(due, adapter, max_workers=max_workers, rate_limiter=rate_limiter, backend=backend,
+                                 full_refresh=force, log=send_log_to_frontend)
 
-            if not processed_data.empty:
-                if last_date:
-                    processed_data = processed_data[processed_data["data"] > last_date]
-                
-                if not processed_data.empty:
-                    adapter.save_data(series_name, processed_data)
-                    send_log_to_frontend(f"{len(processed_data)} novos registros salvos para {series_name}.")
-                else:
-                    send_log_to_frontend(f"Nenhum novo registro para {series_name} desde a última atualização.")
+        # O resultado alimenta o agendador e o aprendizado das defasagens de divulgação
+        periodicities = catalog_periodicities(adapter, periodicity_overrides)
+        last_dates = adapter.get_last_dates(list(series_codes.values()))
+        state.record_results(results, now, last_dates, periodicities)
+        state.plan(series_codes, last_dates, periodicities, datetime.now(), schedule_config)
+        state.save()
+
+        send_log_to_frontend("\nResumo da coleta:")
+        for result in results:
+            if result["status"] == "erro":
+                send_log_to_frontend(f'- {result["series_name"]} ({result["code"]}): erro - {result["erro"]}', "error")
             else:
-                send_log_to_frontend(f"Nenhum dado retornado da API para a série {series_name}.")
+                send_log_to_frontend(f'- {result["series_name"]} ({result["code"]}): {result["status"]}, {result["registros"]} registros em {result["duracao"]:.2f}s')
     except Exception as e:
-        send_log_to_frontend(f"Erro durante a coleta de dados: {str(e)}")
-        eel.collection_finished()()
-        return
+        send_log_to_frontend(f"Erro durante a coleta de dados: {str(e)}", "error")
 
     finally:
-        adapter.disconnect()
+        metrics.finish_run()
         send_log_to_frontend("Processo de coleta de dados finalizado.")
-        eel.collection_finished()()
+        notify_collection_finished()
 
 # Teste de execução direta
 if __name__ == "__main__":
@@ -0,0 +1,29 @@
+from modules.data_config import ConfigManager
+from modules.data_profiler import profile_tables
+from persistence.adapter_registry import get_adapter
+from utils.send_log_to_frontend import send_log_to_frontend
+
+def _run_series_profiling(force: bool = False) -> dict:
+    """
+    Calcula e grava os perfis de todas as séries SGS do catálogo (ver `profile_tables`).
+    Parâmetros:
+        force (bool): Recalcula também os perfis cujo conteúdo não mudou desde o último cálculo.
+    Retorna:
+        dict: {nome da tabela: perfil} das tabelas perfiladas.
+    """
+    try:
+        adapter = get_adapter(ConfigManager.load_series_config().get("database", {}))
+        profiles = profile_tables(adapter, force=force)
+    except Exception as e:
+        send_log_to_frontend(f"Erro ao calcular os perfis das séries: {str(e)}", "error", etapa="perfil")
+        return {}
+
+    for table_name, profile in sorted(profiles.items()):
+        business_days = ", dias úteis" if profile["dias_uteis"] else ""
+        send_log_to_frontend(
+            f"{table_name}: {profile['periodicidade']}{business_days} (confiança {profile['confianca']:.0%}), "
+            f"{profile['total_registros']} registros de {profile['primeira_data']} a {profile['ultima_data']}, "
+            f"{profile['lacunas']} lacuna(s), {profile['duplicados']} duplicado(s).", serie=table_name, etapa="perfil"
+        )
+    send_log_to_frontend(f"{len(profiles)} perfil(is) de séries calculado(s); os demais já estavam atualizados.")
+    return profiles
@@ -0,0 +1,35 @@
+from modules.data_config import ConfigManager
+from persistence.adapter_registry import get_adapter
+from utils.send_log_to_frontend import send_log_to_frontend
+
+def _run_storage_migration(keep_tables: bool = False) -> list[dict]:
+    """
+    Migra as tabelas existentes para o layout "observacoes": séries SGS para a tabela única `observacoes`
+    e tabelas do Focus para o esquema estrela (`fato_expectativas`).
+    Parâmetros:
+        keep_tables (bool): Mantém as tabelas antigas no banco após a migração (padrão: False).
+    Retorna:
+        list[dict]: Um resultado por tabela do catálogo (ver `SQLiteAdapter.migrate_to_normalized_layout`).
+    """
+    send_log_to_frontend("Iniciando migração das tabelas para o layout normalizado...")
+    try:
+        database = ConfigManager.load_series_config().get("database", {})
+        if database.get("type") != "sqlite":
+            send_log_to_frontend("A migração para o layout normalizado está disponível apenas para database.type: sqlite.", "error")
+            return []
+        adapter = get_adapter(database)
+        results = adapter.migrate_to_normalized_layout(
+            keep_tables=keep_tables, log=lambda message: send_log_to_frontend(message, etapa="migracao")
+        )
+    except Exception as e:
+        send_log_to_frontend(f"Erro durante a migração das tabelas: {str(e)}", "error")
+        return []
+
+    migrated = [result for result in results if result["status"] == "migrada"]
+    for result in results:
+        if result["status"] == "erro":
+            send_log_to_frontend(f'- {result["tabela"]}: erro - {result["mensagem"]}', "error", serie=result["tabela"], etapa="migracao")
+    send_log_to_frontend(f"Migração finalizada: {len(migrated)} tabela(s) migrada(s), {sum(result['registros'] for result in migrated)} registros.")
+    if database.get("layout") != "observacoes":
+        send_log_to_frontend("Configure database.layout: observacoes no series_config.yaml e no focus_config.yaml para manter o layout em bancos novos.")
+    return results
@@ -1,27 +1,70 @@
 from bcb import Expectativas, sgs
+import operator
+import os
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from .data_config import ConfigManager
+from .data_cache import get_response_cache
 
-def _build_query_filters(user_params: dict, endpoint_config: dict) -> dict | None:
+FOCUS_HOST = "olinda.bcb.gov.br"
+# Permite apontar a API de Expectativas para um servidor local (ex: benchmarks/stand_in_server.py)
+FOCUS_URL_ENV = "COLETOR_BCB_FOCUS_URL"
+DEFAULT_PAGE_SIZE = 5000
+DEFAULT_WINDOW_DAYS = 365
+DEFAULT_PAGE_WORKERS = 4
+
+_expectativas = None
+_endpoints = {}
+_endpoints_lock = threading.Lock()
+
+# Operadores aceitos na chave `operador` dos parâmetros do focus_config.yaml
+FILTER_OPERATORS = {
+    "eq": operator.eq,
+    "ge": operator.ge,
+    "le": operator.le,
+    "gt": operator.gt,
+    "lt": operator.lt,
+}
+
+class FocusFetchError(Exception):
+    """
+    Erro levantado quando uma ou mais páginas de uma consulta ao Boletim Focus não puderam ser obtidas.
+
+    Atributos:
+        endpoint (str): Nome técnico do endpoint.
+        failed_pages (list[tuple]): Páginas (janela, skip, erro) que falharam.
     """
-    Valida e constrói o dicionário de filtros para a API.
+    def __init__(self, endpoint: str, failed_pages: list):
+        self.endpoint = endpoint
+        self.failed_pages = failed_pages
+        super().__init__(f"Falha ao buscar {len(failed_pages)} página(s) do endpoint {endpoint}. Execute a coleta novamente para completá-las.")
+
+def _build_query_filters(user_params: dict, endpoint_name: str, endpoint_config: dict) -> list[tuple[str, str, str]] | None:
+    """
+    Valida e constrói a lista de filtros para a API.
+
+    Apenas os parâmetros do YAML que declaram `operador` (eq, ge, le, gt ou lt) são filtros; os demais
+    são campos de resultado e são ignorados com um aviso. `campo` aplica o filtro a outro campo da API
+    (ex: DataFim -> Data).
 
     Args:
         user_params (dict): Dicionário com os filtros fornecidos pelo usuário.
+        endpoint_name (str): Nome técnico do boletim.
         endpoint_config (dict): A seção de configuração do boletim, vinda do YAML.
 
     Returns:
-        Um dicionário com filtros validados ou None se as regras não forem atendidas.
+        Uma lista de filtros (campo, operador, valor) validados ou None se as regras não forem atendidas.
     """
     valid_filters = {}
-    available_params = endpoint_config.get('parametros', {})
+    available_params = ConfigManager.get_focus_params(endpoint_name)
 
     for key, value in user_params.items():
         if key in available_params:
             valid_filters[key] = value
         else:
-            print(f"AVISO: O filtro '{key}' não é válido para este boletim e será ignorado.")
+            print(f"AVISO: '{key}' não é um filtro deste boletim (apenas parâmetros com operador) e será ignorado.")
 
     # VALIDAÇÃO OBRIGATÓRIA DE FILTROS
     # Garante que 'Data' (data de início) está presente.
@@ -33,64 +76,282 @@ def _build_query_filters(user_params: dict, endpoint_config: dict) -> dict | Non
     if len(valid_filters) <= 1:
         print("ERRO CRÍTICO: Para otimizar a consulta, forneça pelo menos um filtro além da data de início (ex: Indicador, DataReferencia, Reuniao).")
         return None
-    
-    # Validação do formato da data
-    try:
-        datetime.strptime(valid_filters['Data'], '%Y-%m-%d')
-    except (ValueError, TypeError):
-        print("ERRO CRÍTICO: Formato de data inválido para o filtro 'Data'. Use 'YYYY-MM-DD'.")
+
+    query_filters = []
+    for key, value in valid_filters.items():
+        param_config = endpoint_config['parametros'][key] or {}
+        field = param_config.get('campo', key)
+        op = param_config['operador']
+        if op not in FILTER_OPERATORS:
+            print(f"ERRO CRÍTICO: Operador '{op}' inválido para o filtro '{key}'. Utilize {', '.join(FILTER_OPERATORS)}.")
+            return None
+
+        # Validação do formato das datas (Data e filtros derivados, como DataFim)
+        if field == 'Data':
+            try:
+                datetime.strptime(value, '%Y-%m-%d')
+            except (ValueError, TypeError):
+                print(f"ERRO CRÍTICO: Formato de data inválido para o filtro '{key}'. Use 'YYYY-MM-DD'.")
+                return None
+
+        query_filters.append((field, op, value))
+
+    return query_filters
+
+
+def _build_select_fields(fields: list[str] | None, endpoint_name: str, endpoint_config: dict) -> list[str] | None:
+    """
+    Define os campos da projeção ($select). As colunas da chave natural são sempre incluídas,
+    para que os registros possam ser gravados sem duplicidades.
+
+    Returns:
+        A lista de campos a selecionar, ou None para retornar todos os campos do endpoint.
+    """
+    if fields is None:
         return None
+    available_fields = ConfigManager.get_focus_fields(endpoint_name)
+    selected = list(endpoint_config.get('chave_natural', []))
+    for field in fields:
+        if field not in available_fields:
+            print(f"AVISO: O campo '{field}' não existe neste boletim e será ignorado.")
+        elif field not in selected:
+            selected.append(field)
+    return selected
+
+
+def _create_expectativas() -> Expectativas:
+    """
+    Cria o cliente da API de Expectativas. Se a variável de ambiente COLETOR_BCB_FOCUS_URL estiver
+    definida, o documento de serviço, os metadados e as consultas usam essa URL base no lugar da API do BCB.
+    """
+    base_url = os.environ.get(FOCUS_URL_ENV)
+    if not base_url:
+        return Expectativas()
+    local_api = type("Expectativas", (Expectativas,), {"BASE_URL": base_url.rstrip("/") + "/"})
+    return local_api()
+
+
+def _get_endpoint(endpoint_name: str):
+    """
+    Retorna o endpoint da API de Expectativas, reutilizado por todo o processo.
+    O documento de serviço e os metadados OData são baixados uma única vez, e não a cada consulta.
+    """
+    global _expectativas
+    with _endpoints_lock:
+        if endpoint_name not in _endpoints:
+            if _expectativas is None:
+                _expectativas = _create_expectativas()
+            _endpoints[endpoint_name] = _expectativas.get_endpoint(endpoint_name)
+        return _endpoints[endpoint_name]
+
+
+def reset_focus_client():
+    """
+    Descarta o cliente e os endpoints em memória, para que a próxima consulta baixe novamente
+    o documento de serviço e os metadados (ex: após alterar COLETOR_BCB_FOCUS_URL).
+    """
+    global _expectativas
+    with _endpoints_lock:
+        _expectativas = None
+        _endpoints.clear()
+
+
+def _window_filters(filters: list[tuple[str, str, str]], window: tuple[str, str] | None) -> list[tuple[str, str, str]]:
+    """
+    Acrescenta aos filtros do usuário o intervalo de datas (Data ge início, Data le fim) da janela.
+    """
+    if window is None:
+        return list(filters)
+    return list(filters) + [("Data", "ge", window[0]), ("Data", "le", window[1])]
+
+
+def _plan_windows(filters: list[tuple[str, str, str]], window_days: int | None) -> list[tuple[str, str] | None]:
+    """
+    Divide o intervalo de datas da consulta (Data ge ... e, se houver, Data le ...) em janelas de
+    `window_days` dias, buscadas de forma independente. Sem `window_days`, a consulta usa uma única janela.
+    """
+    start = max((value for field, op, value in filters if field == "Data" and op in ("ge", "gt", "eq")), default=None)
+    end = min((value for field, op, value in filters if field == "Data" and op in ("le", "lt", "eq")), default=None)
+    if not window_days or start is None:
+        return [None]
 
-    return valid_filters
+    start_date = datetime.strptime(start, '%Y-%m-%d')
+    end_date = datetime.strptime(end, '%Y-%m-%d') if end else datetime.now()
+    windows = []
+    window_start = start_date
+    while window_start <= end_date:
+        window_end = min(window_start + timedelta(days=int(window_days) - 1), end_date)
+        windows.append((window_start.strftime('%Y-%m-%d'), window_end.strftime('%Y-%m-%d')))
+        window_start = window_end + timedelta(days=1)
+    return windows
 
 
-def _request_focus_data(endpoint_name: str, filters: dict) -> pd.DataFrame | None:
+def _request_focus_data(endpoint_name: str, filters: list[tuple[str, str, str]], fields: list[str] | None = None, use_cache: bool = True,
+                        endpoint=None, order_fields: list[str] | None = None, top: int | None = None, skip: int = 0, rate_limiter=None) -> pd.DataFrame:
     """
-    Executa a requisição à API do BCB com os filtros pré-construídos.
+    Executa uma requisição (ou uma página, com $top/$skip) à API do BCB com os filtros pré-construídos.
+    Os filtros e a projeção de campos são enviados à API ($filter/$select), de modo que apenas
+    os registros e colunas solicitados são transferidos.
+    Consultas repetidas com os mesmos filtros são atendidas pelo cache de respostas em disco.
 
     Args:
         endpoint_name (str): O nome técnico do endpoint a ser consultado.
-        filters (dict): Dicionário com os filtros validados.
+        filters (list): Filtros validados, como tuplas (campo, operador, valor).
+        fields (list, opcional): Campos retornados pela API. Se omitido, todos os campos do endpoint.
+        use_cache (bool): Consulta e alimenta o cache de respostas (padrão: True).
+        endpoint (opcional): Endpoint já obtido via `_get_endpoint`, reutilizado entre páginas.
+        order_fields (list, opcional): Campos de ordenação. A paginação exige uma ordem estável (chave natural).
+        top (int, opcional): Tamanho da página ($top). Se omitido, todos os registros são retornados.
+        skip (int): Deslocamento da página ($skip).
+        rate_limiter (RateLimiter, opcional): Limitador consultado antes da requisição.
     
     Returns:
-        Um DataFrame do Pandas com os dados retornados, ou None se ocorrer um erro.
+        Um DataFrame do Pandas com os dados retornados.
+
+    Raises:
+        Exception: Erros da API são propagados para que o chamador registre a página que falhou.
+    """
+    cache = get_response_cache() if use_cache else None
+    if cache:
+        cache_filters = {f"{field} {op}": value for field, op, value in filters}
+        if fields:
+            cache_filters["$select"] = ",".join(fields)
+        if top:
+            cache_filters["$top"] = top
+            cache_filters["$skip"] = skip
+        cache_key = cache.make_key("focus", endpoint_name, cache_filters)
+        cached_data = cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
+
+    ep = endpoint or _get_endpoint(endpoint_name)
+
+    # Inicia a query
+    query = ep.query()
+
+    # Adiciona dinamicamente todos os filtros validados, com o operador declarado no YAML
+    for field, op, value in filters:
+        # getattr permite acessar o atributo do endpoint dinamicamente (ex: ep.Data, ep.Indicador)
+        prop = getattr(ep, field)
+        if prop.type == "Edm.Date":
+            value = datetime.strptime(value, '%Y-%m-%d')
+        query = query.filter(FILTER_OPERATORS[op](prop, value))
+
+    if fields:
+        query = query.select(*(getattr(ep, field) for field in fields))
+
+    # Ordena pela data (e pelos demais campos da chave, para páginas estáveis) e coleta os dados
+    query = query.orderby(*(getattr(ep, field).asc() for field in (order_fields or ["Data"])))
+    if top:
+        query = query.limit(top).skip(skip)
+
+    if rate_limiter:
+        rate_limiter.acquire(FOCUS_HOST)
+    df = query.collect()
+
+    if cache:
+        cache.set(cache_key, "focus", endpoint_name, df, cache.ttl_for("focus"))
+    return df
+
+
+def _resolve_endpoint(nome_boletim: str) -> tuple[str, dict]:
+    """
+    Encontra o nome técnico e a configuração do endpoint a partir do nome amigável (ou do próprio nome técnico).
     """
-    print(f"Executando consulta no endpoint '{endpoint_name}' com os filtros: {filters}")
     try:
-        em = Expectativas()
-        ep = em.get_endpoint(endpoint_name)
+        return ConfigManager.resolve_focus_endpoint(nome_boletim)
+    except FileNotFoundError as e:
+        raise ValueError(f"Configuração do Boletim Focus não foi carregada corretamente: {e}")
 
-        # Inicia a query
-        query = ep.query()
 
-        # Adiciona dinamicamente todos os filtros validados
-        for field, value in filters.items():
-            # getattr permite acessar o atributo do endpoint dinamicamente (ex: ep.Data, ep.Indicador)
-            query = query.filter(getattr(ep, field) >= value)
+def iter_bcb_focus(nome_boletim: str, campos: list[str] | None = None, page_size: int = DEFAULT_PAGE_SIZE,
+                   window_days: int | None = DEFAULT_WINDOW_DAYS, max_workers: int = DEFAULT_PAGE_WORKERS,
+                   rate_limiter=None, use_cache: bool = True, **kwargs):
+    """
+    Busca dados do Boletim Focus em páginas, entregando cada página assim que é recebida.
 
-        # Ordena pela data e coleta os dados
-        df = query.orderby(ep.Data.asc()).collect()
+    O intervalo de datas é dividido em janelas de `window_days` dias e cada janela é percorrida
+    em páginas de `page_size` registros ($top/$skip, ordenadas pela chave natural). Até `max_workers`
+    páginas são buscadas ao mesmo tempo; a página seguinte de uma janela só é solicitada quando a
+    anterior volta completa. Como no máximo `max_workers` páginas ficam em memória, o consumo
+    não depende do tamanho total da consulta.
 
-        if df.empty:
-            print("AVISO: A consulta foi bem-sucedida, mas não retornou dados para os filtros especificados.")
-        else:
-            print("Consulta finalizada com sucesso. Dados retornados.")
-        
-        return df
+    Args:
+        nome_boletim (str): O nome amigável (ou técnico) do boletim.
+        campos (list, opcional): Campos a retornar; as colunas da chave natural são sempre incluídas.
+        page_size (int): Registros por página.
+        window_days (int, opcional): Tamanho das janelas de datas, em dias. None usa uma única janela.
+        max_workers (int): Número máximo de páginas buscadas simultaneamente.
+        rate_limiter (RateLimiter, opcional): Limitador de requisições ao host da API.
+        use_cache (bool): Consulta e alimenta o cache de respostas (padrão: True).
+        **kwargs: Filtros de consulta (ex: Data="2024-01-01", Indicador="IPCA").
 
-    except Exception as e:
-        print(f"ERRO: Falha ao consultar a API do BCB. Detalhes: {e}")
-        return None
+    Yields:
+        tuple[pd.DataFrame, dict]: A página e suas informações ("endpoint", "janela", "pagina", "registros").
+
+    Raises:
+        ValueError: Se o boletim não existir ou os filtros não atenderem às regras.
+        FocusFetchError: Ao final, se alguma página não pôde ser obtida (as demais já foram entregues).
+    """
+    endpoint_name, endpoint_config = _resolve_endpoint(nome_boletim)
+    filters = _build_query_filters(kwargs, endpoint_name, endpoint_config)
+    if not filters:
+        raise ValueError("Filtros inválidos para o Boletim Focus. Verifique as mensagens anteriores.")
+    fields = _build_select_fields(campos, endpoint_name, endpoint_config)
+    key_fields = list(endpoint_config.get('chave_natural', []))
+    order_fields = ["Data"] + [field for field in key_fields if field != "Data"]
+    page_size = max(1, int(page_size))
+
+    print(f"Executando consulta no endpoint '{endpoint_name}' com os filtros: {filters}")
+    ep = _get_endpoint(endpoint_name)
+    windows = _plan_windows(filters, window_days)
+    pending_pages = [(window, 0) for window in windows]
+    failed_pages = []
+    page_number = 0
+
+    def _fetch_page(window, skip):
+        return _request_focus_data(endpoint_name, _window_filters(filters, window), fields, use_cache,
+                                   endpoint=ep, order_fields=order_fields, top=page_size, skip=skip, rate_limiter=rate_limiter)
+
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as executor:
+        in_flight = {}
+        while pending_pages or in_flight:
+            # Mantém no máximo `max_workers` páginas em andamento
+            while pending_pages and len(in_flight) < max(1, int(max_workers)):
+                window, skip = pending_pages.pop(0)
+                in_flight[executor.submit(_fetch_page, window, skip)] = (window, skip)
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                window, skip = in_flight.pop(future)
+                try:
+                    page = future.result()
+                except Exception as e:
+                    print(f"ERRO: Falha ao buscar a página {skip // page_size + 1} da janela {window}: {e}")
+                    failed_pages.append((window, skip, str(e)))
+                    continue
 
+                if len(page) >= page_size:
+                    pending_pages.append((window, skip + page_size))
+                if not page.empty:
+                    page_number += 1
+                    yield page, {"endpoint": endpoint_name, "janela": window, "pagina": page_number, "registros": len(page)}
 
-def fetch_bcb_focus(nome_boletim: str, **kwargs) -> pd.DataFrame | None:
+    if failed_pages:
+        raise FocusFetchError(endpoint_name, failed_pages)
+
+
+def fetch_bcb_focus(nome_boletim: str, campos: list[str] | None = None, **kwargs) -> pd.DataFrame | None:
     """
     Orquestra a busca de dados do Boletim Focus de forma otimizada e segura.
 
-    Esta é a função principal a ser chamada por outros módulos.
+    Reúne em um único DataFrame as páginas de `iter_bcb_focus`. Para consultas grandes, prefira
+    consumir `iter_bcb_focus` diretamente e gravar cada página à medida que chega.
 
     Args:
         nome_boletim (str): O nome amigável do boletim (ex: "Expectativas de Mercado Anuais").
+        campos (list, opcional): Campos a retornar (ex: ["Mediana"]). As colunas da chave natural
+                  são sempre incluídas. Se omitido, todos os campos do endpoint são retornados.
         **kwargs: Filtros de consulta (ex: Data="2024-01-01", Indicador="IPCA").
                   'Data' e pelo menos mais um filtro são obrigatórios.
 
@@ -98,52 +359,14 @@ def fetch_bcb_focus(nome_boletim: str, **kwargs) -> pd.DataFrame | None:
         Um DataFrame do Pandas com os dados solicitados, ou None se ocorrer um erro.
     """
     print(f"\n--- Iniciando processo para o boletim: '{nome_boletim}' ---")
-    config_geral = ConfigManager.load_focus_config()
-    if not config_geral:
-        print("ERRO: Configuração do Boletim Focus não foi carregada corretamente.")
-        return None
-
-    # 1. Encontrar a configuração do endpoint solicitado
-    endpoint_nome_tecnico = None
-    endpoint_config_especifica = None
-    for key, value in config_geral.items():
-        if value.get('nome_amigavel') == nome_boletim:
-            endpoint_nome_tecnico = key
-            endpoint_config_especifica = value
-            break
-    
-    if not endpoint_nome_tecnico:
-        print(f"ERRO: Boletim '{nome_boletim}' não encontrado no arquivo de configuração.")
+    try:
+        pages = [page for page, _ in iter_bcb_focus(nome_boletim, campos, **kwargs)]
+    except Exception as e:
+        print(f"ERRO: Falha ao consultar a API do BCB. Detalhes: {e}")
         return None
 
-    # 2. Construir e validar os filtros
-    # O dicionário kwargs contém todos os parâmetros passados (Data="...", Indicador="...")
-    filtros_para_api = _build_query_filters(kwargs, endpoint_config_especifica)
-    if not filtros_para_api:
-        return None  # Encerra se os filtros não atenderem às regras
-
-    # 3. Executar a requisição
-    dataframe_resultado = _request_focus_data(endpoint_nome_tecnico, filtros_para_api)
-
-    return dataframe_resultado
-
-
-if __name__ == "__main__":
-    # Teste de chamada para todos os endpoints
-    print("Iniciando testes de consulta aos endpoints do Boletim Focus...")
-    endpoints = ConfigManager.load_focus_config() # Obtém todos os nomes amigáveis dos endpoints
-    aprovados = []
-    reprovados = []
-    for endpoint in endpoints:
-        print(f"Testando endpoint: {endpoint}")
-        df = fetch_bcb_focus(endpoint_name=endpoint, start_date="2025-01-01", config=ConfigManager.load_focus_config())
-        if df is not None:
-            print(f"Dados retornados para o endpoint '{endpoint}' '{df.shape}':")
-            print(df.head())
-            aprovados.append(endpoint)
-        else:
-            print(f"Nenhum dado retornado para o endpoint '{endpoint}'.")
-            reprovados.append(endpoint)
-    print("\nTestes concluídos.")
-    print(f"Endpoints aprovados: {aprovados}")
-    print(f"Endpoints reprovados: {reprovados}")
\ No newline at end of file
+    if not pages:
+        print("AVISO: A consulta foi bem-sucedida, mas não retornou dados para os filtros especificados.")
+        return pd.DataFrame()
+    print("Consulta finalizada com sucesso. Dados retornados.")
+    return pd.concat(pages, ignore_index=True)
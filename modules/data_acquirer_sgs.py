@@ -1,59 +1,149 @@
 from bcb import sgs
 import pandas as pd
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
-def fetch_bcb_series(code, start_date=None, end_date=None, table_name="") -> pd.DataFrame:
+from modules.data_acquirer_sgs_native import fetch_sgs_window
+from modules.data_cache import get_response_cache
+from utils.metrics import count as count_metric
+
+SGS_HOST = "api.bcb.gov.br"
+DAILY_WINDOW = timedelta(days=365 * 10)
+DEFAULT_WINDOW_WORKERS = 4
+SGS_BACKENDS = ("bcb", "nativo")
+DEFAULT_BACKEND = "bcb"
+
+class SeriesFetchError(Exception):
+    """
+    Erro levantado quando uma ou mais janelas de busca de uma série não puderam ser obtidas.
+
+    Atributos:
+        code (str): Código da série do BCB.
+        missing_windows (list[tuple[datetime, datetime, str]]): Janelas (início, fim, erro) que falharam.
+    """
+    def __init__(self, code, missing_windows: list):
+        self.code = str(code)
+        self.missing_windows = missing_windows
+        windows = ", ".join(f'{start.strftime("%Y-%m-%d")} a {end.strftime("%Y-%m-%d")}' for start, end, _ in missing_windows)
+        super().__init__(f"Falha ao buscar a série {code}. Janelas não obtidas: {windows}")
+
+def _plan_windows(start_date: datetime, end_date: datetime, is_daily_series: bool) -> list[tuple[datetime, datetime]]:
+    """
+    Divide o intervalo solicitado nas janelas aceitas pela API do SGS.
+    Séries diárias são limitadas a 10 anos por requisição; as demais usam uma única janela.
+    """
+    if start_date > end_date:
+        return []
+    if not is_daily_series:
+        return [(start_date, end_date)]
+
+    windows = []
+    window_start = start_date
+    while window_start <= end_date:
+        window_end = min(window_start + DAILY_WINDOW - timedelta(days=1), end_date)
+        windows.append((window_start, window_end))
+        window_start = window_end + timedelta(days=1)
+    return windows
+
+def _periodicity_from_table_name(table_name: str) -> str | None:
+    """
+    Extrai a periodicidade do sufixo do nome da tabela (ex: 'selic_diaria' -> 'diaria').
+    """
+    for periodicity in ("diaria", "mensal", "anual"):
+        if table_name.endswith(periodicity):
+            return periodicity
+    return None
+
+def _fetch_window(code, window_start: datetime, window_end: datetime, rate_limiter, backend: str, table_name: str = "") -> pd.DataFrame:
+    """
+    Busca uma única janela da série na API do SGS, usando o backend informado.
+    """
+    print(f'Buscando série {code} de {window_start.strftime("%Y-%m-%d")} até {window_end.strftime("%Y-%m-%d")}')
+    if rate_limiter:
+        rate_limiter.acquire(SGS_HOST)
+    if backend == "nativo":
+        return fetch_sgs_window(code, window_start, window_end, series_label=table_name or None)
+    try:
+        return sgs.get({"value": code}, start=window_start, end=window_end)
+    except Exception as e:
+        # A API responde com erro quando não há observações no intervalo
+        if "not found" in str(e).lower():
+            return pd.DataFrame()
+        raise
+
+def fetch_bcb_series(code, start_date=None, end_date=None, table_name="", rate_limiter=None, max_workers=DEFAULT_WINDOW_WORKERS, backend=None, use_cache=True) -> pd.DataFrame:
     """
     Busca dados de uma série temporal do Banco Central do Brasil (BCB) para um determinado código de série e intervalo de datas.
-    Esta função lida com a limitação do BCB de um máximo de 10 anos para séries diárias, realizando a busca em blocos de 10 anos quando necessário.
-    
+    Esta função lida com a limitação do BCB de um máximo de 10 anos para séries diárias: as janelas de 10 anos são
+    planejadas de antemão, buscadas em paralelo e concatenadas uma única vez, na ordem cronológica.
+
     Parâmetros:
         code (int ou str): Código da série do BCB a ser buscada.
         start_date (datetime, opcional): Data inicial para a busca dos dados. Padrão é 1900-01-01 se não informado.
         end_date (datetime, opcional): Data final para a busca dos dados. Padrão é a data atual se não informado.
         table_name (str, opcional): Nome da tabela ou série. Se contiver "diaria", a função trata a série como diária e aplica a busca em blocos.
+        rate_limiter (RateLimiter, opcional): Limitador de taxa consultado antes de cada requisição à API do SGS.
+        max_workers (int, opcional): Número máximo de janelas buscadas simultaneamente.
+        backend (str, opcional): "bcb" (padrão) usa a biblioteca python-bcb; "nativo" usa o cliente HTTP
+            persistente de `data_acquirer_sgs_native`, que já devolve as colunas 'data' e 'valor'.
+        use_cache (bool, opcional): Consulta e alimenta o cache de respostas em disco (padrão: True).
     Retorna:
         pandas.DataFrame: DataFrame contendo os dados da série temporal solicitada.
     Exceções:
-        Exception: Em caso de erro durante a busca dos dados, a função imprime uma mensagem de erro e retorna os dados obtidos até o momento.
-    
+        SeriesFetchError: Se qualquer janela falhar. Nenhum dado parcial é retornado; o erro informa as janelas ausentes.
+
     """
-    all_data = pd.DataFrame()
-    current_start_date = start_date if start_date else datetime(1900, 1, 1)
-    current_end_date = end_date if end_date else datetime.now()
-    is_daily_series = False
+    start_date = start_date if start_date else datetime(1900, 1, 1)
+    end_date = end_date if end_date else datetime.now()
+    is_daily_series = "diaria" in table_name
+    backend = backend or DEFAULT_BACKEND
+    if backend not in SGS_BACKENDS:
+        raise ValueError(f"Backend de aquisição SGS não suportado: {backend}. Utilize {' ou '.join(SGS_BACKENDS)}.")
 
-    if "diaria" in table_name:
-        # Para séries diárias, buscar em chunks de 10 anos
-        is_daily_series = True
+    windows = _plan_windows(start_date, end_date, is_daily_series)
+    if not windows:
+        return pd.DataFrame()
 
-    while current_start_date <= current_end_date:
-        try:
-            if is_daily_series:
-                # Para séries diárias, buscar em chunks de 10 anos
-                end_date_chunk = current_start_date + timedelta(days=365 * 10) - timedelta(days=1)
-                if end_date_chunk > current_end_date:
-                    end_date_chunk = current_end_date
-                
-                print(f'Buscando série {code} de {current_start_date.strftime("%Y-%m-%d")} até {end_date_chunk.strftime("%Y-%m-%d")}')
-                df_chunk = sgs.get({"value": code}, start=current_start_date, end=end_date_chunk)
-            else:
-                # Para outras periodicidades, buscar tudo de uma vez até a data final
-                print(f'Buscando série {code} a partir de {current_start_date.strftime("%Y-%m-%d")} até {current_end_date.strftime("%Y-%m-%d")}')
-                df_chunk = sgs.get({"value": code}, start=current_start_date, end=current_end_date)
-
-            if df_chunk.empty:
-                break
-
-            all_data = pd.concat([all_data, df_chunk])
-
-            if not is_daily_series or end_date_chunk >= current_end_date:
-                break
-            
-            current_start_date = end_date_chunk + timedelta(days=1)
+    cache = get_response_cache() if use_cache else None
+    if cache:
+        cache_key = cache.make_key("sgs", code, {"backend": backend}, start_date, end_date)
+        cached_data = cache.get(cache_key)
+        if cached_data is not None:
+            print(f'Série {code} de {start_date.strftime("%Y-%m-%d")} até {end_date.strftime("%Y-%m-%d")} obtida do cache local.')
+            count_metric("acertos_cache", 1, table_name or None)
+            return cached_data
 
+    if len(windows) == 1:
+        chunks = [None]
+        try:
+            chunks[0] = _fetch_window(code, windows[0][0], windows[0][1], rate_limiter, backend, table_name)
         except Exception as e:
             print(f"Erro ao buscar série {code}: {e}")
-            break
+            raise SeriesFetchError(code, [(windows[0][0], windows[0][1], str(e))]) from e
+    else:
+        chunks = [None] * len(windows)
+        missing_windows = []
+        with ThreadPoolExecutor(max_workers=max(1, min(int(max_workers), len(windows)))) as executor:
+            futures = [executor.submit(_fetch_window, code, window_start, window_end, rate_limiter, backend, table_name) for window_start, window_end in windows]
+            for index, future in enumerate(futures):
+                try:
+                    chunks[index] = future.result()
+                except Exception as e:
+                    window_start, window_end = windows[index]
+                    print(f'Erro ao buscar série {code} de {window_start.strftime("%Y-%m-%d")} até {window_end.strftime("%Y-%m-%d")}: {e}')
+                    missing_windows.append((window_start, window_end, str(e)))
+
+        if missing_windows:
+            raise SeriesFetchError(code, missing_windows)
+
+    chunks = [chunk for chunk in chunks if chunk is not None and not chunk.empty]
+    if not chunks:
+        data = pd.DataFrame()
+    elif len(chunks) == 1:
+        data = chunks[0]
+    else:
+        data = pd.concat(chunks, ignore_index=backend == "nativo", copy=False)
 
-    return all_data
+    if cache:
+        cache.set(cache_key, "sgs", code, data, cache.ttl_for(_periodicity_from_table_name(table_name)))
+    return data
@@ -0,0 +1,182 @@
+import os
+import json
+import codecs
+import threading
+import http.client
+import numpy as np
+import pandas as pd
+from datetime import datetime, date
+from urllib.parse import urlsplit, urlencode
+
+from utils.metrics import count as count_metric
+
+DEFAULT_BASE_URL = "https://api.bcb.gov.br"
+READ_CHUNK_SIZE = 64 * 1024
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_DECODER = json.JSONDecoder()
+_local = threading.local()
+
+class SGSClientError(Exception):
+    """
+    Erro de comunicação com a API do SGS no cliente nativo.
+    """
+    pass
+
+def _get_base_url(base_url: str | None) -> str:
+    """
+    Resolve a URL base da API. A variável de ambiente COLETOR_BCB_SGS_URL permite apontar
+    o cliente para um servidor local que sirva respostas gravadas do SGS.
+    """
+    return (base_url or os.environ.get("COLETOR_BCB_SGS_URL") or DEFAULT_BASE_URL).rstrip("/")
+
+def _get_connection(scheme: str, netloc: str) -> http.client.HTTPConnection:
+    """
+    Retorna a conexão keep-alive da thread atual para o host informado, criando-a se necessário.
+    """
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    key = (scheme, netloc)
+    connection = connections.get(key)
+    if connection is None:
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        connection = connection_class(netloc, timeout=60)
+        connections[key] = connection
+    return connection
+
+def _drop_connection(scheme: str, netloc: str):
+    """
+    Fecha e descarta a conexão da thread atual, forçando uma reconexão na próxima requisição.
+    """
+    connections = getattr(_local, "connections", {})
+    connection = connections.pop((scheme, netloc), None)
+    if connection is not None:
+        connection.close()
+
+def _parse_date(text: str) -> int:
+    """
+    Converte uma data 'dd/mm/aaaa' em dias desde 1970-01-01.
+    """
+    return date(int(text[6:10]), int(text[3:5]), int(text[0:2])).toordinal() - _EPOCH_ORDINAL
+
+def _decode_payload(response, capacity: int) -> tuple[np.ndarray, np.ndarray, int, int]:
+    """
+    Lê o corpo JSON da resposta em blocos e decodifica cada observação diretamente
+    em vetores pré-alocados de datas (dias desde a época) e valores (float64).
+    Retorna também a quantidade de bytes lidos do corpo.
+    """
+    dates = np.empty(max(1, capacity), dtype=np.int64)
+    values = np.empty(max(1, capacity), dtype=np.float64)
+    count = 0
+    bytes_read = 0
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    position = 0
+    started = False
+
+    while True:
+        block = response.read(READ_CHUNK_SIZE)
+        bytes_read += len(block)
+        buffer = buffer[position:] + decoder.decode(block, final=not block)
+        position = 0
+        length = len(buffer)
+
+        while position < length:
+            char = buffer[position]
+            if char in " \t\r\n,":
+                position += 1
+                continue
+            if not started:
+                if char != "[":
+                    raise SGSClientError("Resposta inesperada da API do SGS: o corpo não é uma lista JSON.")
+                started = True
+                position += 1
+                continue
+            if char == "]":
+                return dates, values, count, bytes_read
+            try:
+                item, end = _DECODER.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Objeto incompleto: aguarda o próximo bloco da resposta
+                break
+
+            if count == len(dates):
+                dates = np.resize(dates, len(dates) * 2)
+                values = np.resize(values, len(values) * 2)
+            dates[count] = _parse_date(item["data"])
+            valor = item.get("valor")
+            values[count] = float(valor) if valor not in (None, "") else np.nan
+            count += 1
+            position = end
+
+        if not block:
+            if not started:
+                return dates, values, 0, bytes_read
+            raise SGSClientError("Resposta da API do SGS terminou antes do fim da lista JSON.")
+
+def fetch_sgs_window(code, start_date: datetime, end_date: datetime, base_url: str | None = None, series_label: str | None = None) -> pd.DataFrame:
+    """
+    Busca uma janela de uma série do SGS usando uma conexão HTTP persistente por thread.
+
+    O JSON retornado é decodificado de forma incremental em vetores NumPy, e o DataFrame
+    resultante já segue o esquema de `process_series_data` (colunas 'data' em datetime64
+    e 'valor' em float64), dispensando uma segunda conversão.
+
+    Args:
+        code (int ou str): Código da série do BCB.
+        start_date (datetime): Data inicial da janela.
+        end_date (datetime): Data final da janela.
+        base_url (str, opcional): URL base da API (padrão: https://api.bcb.gov.br).
+        series_label (str, opcional): Nome da série usado nos contadores de instrumentação.
+
+    Returns:
+        pd.DataFrame: DataFrame com as colunas 'data' e 'valor'.
+    """
+    parts = urlsplit(_get_base_url(base_url))
+    query = urlencode({
+        "formato": "json",
+        "dataInicial": start_date.strftime("%d/%m/%Y"),
+        "dataFinal": end_date.strftime("%d/%m/%Y"),
+    })
+    path = f"{parts.path}/dados/serie/bcdata.sgs.{code}/dados?{query}"
+    headers = {"Accept": "application/json", "Connection": "keep-alive"}
+    capacity = (end_date - start_date).days + 1
+
+    for attempt in range(2):
+        connection = _get_connection(parts.scheme, parts.netloc)
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+        except (http.client.HTTPException, ConnectionError, OSError) as e:
+            # Conexões keep-alive podem ter sido encerradas pelo servidor; tenta uma nova
+            _drop_connection(parts.scheme, parts.netloc)
+            if attempt == 1:
+                raise SGSClientError(f"Falha de conexão com a API do SGS: {e}") from e
+            count_metric("retentativas", 1, series_label)
+            continue
+
+        if response.status == 404:
+            response.read()
+            return pd.DataFrame(columns=["data", "valor"]).astype({"data": "datetime64[ns]", "valor": "float64"})
+        if response.status != 200:
+            body = response.read()[:200].decode("utf-8", errors="replace")
+            _drop_connection(parts.scheme, parts.netloc)
+            raise SGSClientError(f"A API do SGS retornou o status {response.status} para a série {code}: {body}")
+
+        try:
+            dates, values, count, bytes_read = _decode_payload(response, capacity)
+            # Consome o restante do corpo para que a conexão possa ser reutilizada
+            bytes_read += len(response.read())
+        except Exception:
+            _drop_connection(parts.scheme, parts.netloc)
+            raise
+        if response.will_close:
+            _drop_connection(parts.scheme, parts.netloc)
+        count_metric("bytes_recebidos", bytes_read, series_label)
+        break
+
+    return pd.DataFrame({
+        "data": dates[:count].astype("datetime64[D]").astype("datetime64[ns]"),
+        "valor": values[:count],
+    })
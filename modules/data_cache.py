@@ -0,0 +1,194 @@
+import json
+import time
+import pickle
+import sqlite3
+import hashlib
+import threading
+import pandas as pd
+from contextlib import contextmanager
+
+from modules.data_config import ConfigManager
+from utils.get_base_path import get_base_path
+
+DEFAULT_CACHE_CONFIG = {
+    "enabled": True,
+    "path": "cache_bcb.db",
+    "max_size_mb": 200,
+    "ttl_segundos": {
+        "diaria": 6 * 3600,
+        "mensal": 24 * 3600,
+        "anual": 7 * 24 * 3600,
+        "focus": 6 * 3600,
+        "padrao": 6 * 3600,
+    },
+}
+
+_cache_instance = None
+_cache_settings = None
+_cache_lock = threading.Lock()
+
+class ResponseCache:
+    """
+    Cache persistente em disco para respostas das APIs do BCB (SGS e Boletim Focus).
+
+    As respostas são armazenadas como DataFrames serializados em um arquivo SQLite próprio,
+    indexadas por uma chave derivada de (fonte, código/endpoint, filtros normalizados, intervalo de datas).
+    Cada entrada possui um prazo de validade (TTL) e o tamanho total do cache é limitado:
+    ao ultrapassar o limite, as entradas acessadas há mais tempo são descartadas (LRU).
+
+    Atributos:
+        path (str): Caminho do arquivo SQLite do cache.
+        max_size_bytes (int): Tamanho máximo ocupado pelas respostas armazenadas.
+        ttl (dict): Validade, em segundos, por periodicidade ou fonte.
+    """
+    def __init__(self, path: str, max_size_mb: float = 200, ttl: dict | None = None):
+        self.path = path
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.ttl = dict(DEFAULT_CACHE_CONFIG["ttl_segundos"])
+        self.ttl.update(ttl or {})
+        self._lock = threading.Lock()
+        with self._connect() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS respostas (
+                    chave TEXT PRIMARY KEY,
+                    fonte TEXT NOT NULL,
+                    identificador TEXT NOT NULL,
+                    criado_em REAL NOT NULL,
+                    expira_em REAL NOT NULL,
+                    ultimo_acesso REAL NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    conteudo BLOB NOT NULL
+                )
+                """
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_respostas_acesso ON respostas (ultimo_acesso)")
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_respostas_fonte ON respostas (fonte, identificador)")
+
+    @contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            yield connection
+            connection.commit()
+        finally:
+            connection.close()
+
+    @staticmethod
+    def make_key(source: str, identifier, filters: dict | None = None, start_date=None, end_date=None) -> str:
+        """
+        Gera a chave do cache. Datas são normalizadas para o dia, de modo que chamadas
+        repetidas no mesmo dia compartilhem a mesma entrada.
+        """
+        def _normalize_date(value):
+            if value is None:
+                return None
+            return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+        normalized_filters = {str(k): str(v) for k, v in sorted((filters or {}).items())}
+        payload = json.dumps(
+            [source, str(identifier), normalized_filters, _normalize_date(start_date), _normalize_date(end_date)],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, periodicity: str | None) -> float:
+        """
+        Retorna a validade (em segundos) para a periodicidade ou fonte informada.
+        """
+        return float(self.ttl.get(periodicity or "padrao", self.ttl.get("padrao", 0)))
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        """
+        Retorna o DataFrame armazenado para a chave, ou None se ausente ou expirado.
+        """
+        now = time.time()
+        with self._lock, self._connect() as connection:
+            row = connection.execute("SELECT expira_em, conteudo FROM respostas WHERE chave = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[0] < now:
+                connection.execute("DELETE FROM respostas WHERE chave = ?", (key,))
+                return None
+            connection.execute("UPDATE respostas SET ultimo_acesso = ? WHERE chave = ?", (now, key))
+        return pickle.loads(row[1])
+
+    def set(self, key: str, source: str, identifier, data: pd.DataFrame, ttl_seconds: float):
+        """
+        Armazena um DataFrame no cache e aplica a política de descarte LRU.
+        """
+        if ttl_seconds <= 0:
+            return
+        content = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(content) > self.max_size_bytes:
+            return
+        now = time.time()
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO respostas VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, source, str(identifier), now, now + ttl_seconds, now, len(content), content),
+            )
+            self._evict(connection)
+
+    def _evict(self, connection: sqlite3.Connection):
+        """
+        Remove entradas expiradas e, se necessário, as menos usadas recentemente até respeitar o limite de tamanho.
+        """
+        connection.execute("DELETE FROM respostas WHERE expira_em < ?", (time.time(),))
+        total = connection.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+        excess = total - self.max_size_bytes
+        removed = 0
+        to_remove = []
+        for key, size in connection.execute("SELECT chave, tamanho FROM respostas ORDER BY ultimo_acesso ASC"):
+            if removed >= excess:
+                break
+            to_remove.append((key,))
+            removed += size
+        connection.executemany("DELETE FROM respostas WHERE chave = ?", to_remove)
+
+    def invalidate(self, source: str | None = None, identifier=None) -> int:
+        """
+        Remove explicitamente entradas do cache.
+
+        Args:
+            source (str, opcional): Fonte ("sgs" ou "focus"). Se omitida, todo o cache é limpo.
+            identifier (opcional): Código da série ou nome do endpoint dentro da fonte.
+
+        Returns:
+            int: Quantidade de entradas removidas.
+        """
+        with self._lock, self._connect() as connection:
+            if source is None:
+                cursor = connection.execute("DELETE FROM respostas")
+            elif identifier is None:
+                cursor = connection.execute("DELETE FROM respostas WHERE fonte = ?", (source,))
+            else:
+                cursor = connection.execute("DELETE FROM respostas WHERE fonte = ? AND identificador = ?", (source, str(identifier)))
+            return cursor.rowcount
+
+def get_response_cache() -> ResponseCache | None:
+    """
+    Retorna a instância compartilhada do cache de respostas, configurada pela seção `cache`
+    do series_config.yaml. Retorna None se o cache estiver desabilitado.
+
+    A seção é consultada a cada chamada (o ConfigManager só relê o arquivo quando ele muda), e a
+    instância é recriada quando o caminho, o tamanho máximo ou as validades mudam. O caminho é
+    relativo ao diretório da aplicação (ver `get_base_path`).
+    """
+    global _cache_instance, _cache_settings
+    cache_config = dict(DEFAULT_CACHE_CONFIG)
+    cache_config.update(ConfigManager.get_cache_config())
+    if not cache_config.get("enabled", True):
+        return None
+    path = get_base_path(cache_config.get("path") or DEFAULT_CACHE_CONFIG["path"])
+    max_size_mb = cache_config.get("max_size_mb", DEFAULT_CACHE_CONFIG["max_size_mb"])
+    ttl = cache_config.get("ttl_segundos")
+    settings = (path, max_size_mb, json.dumps(ttl, sort_keys=True, default=str))
+    with _cache_lock:
+        if settings != _cache_settings:
+            _cache_instance = ResponseCache(path, max_size_mb, ttl)
+            _cache_settings = settings
+        return _cache_instance
@@ -0,0 +1,277 @@
+import time
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from modules.data_acquirer_focus import iter_bcb_focus, DEFAULT_PAGE_SIZE, DEFAULT_WINDOW_DAYS, DEFAULT_PAGE_WORKERS
+from modules.data_acquirer_sgs import fetch_bcb_series
+from modules.data_processor import process_series_data, focus_processor
+from modules.data_profiler import profile_tables
+from persistence.base_adapter import DatabaseAdapter
+from utils.log_bus import print_log
+from utils.metrics import count, stage_timer, timed_iter
+
+DEFAULT_START_DATE = datetime(1990, 1, 1)
+SGS_KEY_COLUMNS = ["data"]
+DEFAULT_MAX_FOCUS_JOBS = 2
+
+def _fetch_series_task(code: str, series_name: str, start_date: datetime, rate_limiter, backend) -> pd.DataFrame:
+    """
+    Etapa executada pelas threads de trabalho: busca e processa os dados de uma série.
+    A persistência fica a cargo da thread coordenadora. As coletas não usam o cache de respostas:
+    uma verificação sem dados novos precisa consultar a API novamente na retentativa seguinte.
+    """
+    with stage_timer("busca", series_name):
+        raw_data = fetch_bcb_series(code, start_date, datetime.now(), series_name, rate_limiter=rate_limiter, backend=backend,
+                                    use_cache=False)
+    count("registros_recebidos", len(raw_data), series_name)
+    with stage_timer("processamento", series_name):
+        return process_series_data(raw_data, code)
+
+def collect_series(series_codes: dict, adapter: DatabaseAdapter, max_workers: int = 4, rate_limiter=None, backend=None,
+                   full_refresh: bool = False, log=print_log) -> list[dict]:
+    """
+    Coleta várias séries do SGS em paralelo, com um número limitado de threads de trabalho.
+
+    As últimas datas de todas as séries são lidas do catálogo, em uma única consulta, antes do disparo das requisições. As buscas à API
+    são executadas concorrentemente e, à medida que cada uma termina, os novos registros
+    são gravados em lote pela thread chamadora através de `DatabaseAdapter.upsert_data`
+    (chave natural: coluna 'data'), de modo que o banco nunca recebe escritas simultâneas
+    e reexecuções não geram duplicatas.
+
+    Args:
+        series_codes (dict): Mapeamento {código BCB: nome da tabela}.
+        adapter (DatabaseAdapter): Adaptador de banco de dados já conectado.
+        max_workers (int): Número máximo de séries buscadas ao mesmo tempo.
+        rate_limiter (RateLimiter, opcional): Limitador de requisições por host.
+        backend (str, opcional): Backend de aquisição do SGS ("bcb" ou "nativo").
+        full_refresh (bool): Busca todo o histórico desde DEFAULT_START_DATE e regrava os registros existentes
+            pela chave natural (correções retroativas), em vez de buscar apenas após a última data.
+        log (callable): Função usada para registrar mensagens de progresso. Recebe a mensagem, o nível
+            ("info", "warning" ou "error") e os campos estruturados serie, etapa, registros e coalesce
+            (ver `send_log_to_frontend`); o padrão apenas imprime a mensagem.
+
+    Returns:
+        list[dict]: Um resultado por série, com as chaves "code", "series_name", "status"
+        ("sucesso", "sem_novos", "sem_dados" ou "erro"), "registros", "duracao" e "erro".
+        Ao final, os perfis das séries que receberam registros são recalculados (ver `profile_tables`).
+    """
+    results = []
+    pending = {}
+
+    # Planejamento: as últimas datas de todas as séries vêm de uma única consulta ao catálogo
+    last_dates = adapter.get_last_dates(list(series_codes.values()))
+
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as executor:
+        for code, series_name in series_codes.items():
+            code = str(code)
+            last_date = None if full_refresh else last_dates.get(series_name)
+
+            if full_refresh:
+                start_date = DEFAULT_START_DATE
+                log(f'Coleta completa de {series_name}: buscando todo o histórico desde {start_date.strftime("%Y-%m-%d")}',
+                    serie=series_name, etapa="planejamento")
+            elif last_date:
+                start_date = last_date + pd.Timedelta(days=1)
+                log(f'Última data encontrada para {series_name}: {last_date.strftime("%Y-%m-%d")}. Buscando a partir de {start_date.strftime("%Y-%m-%d")}',
+                    serie=series_name, etapa="planejamento")
+            else:
+                start_date = DEFAULT_START_DATE
+                log(f'Nenhum registro encontrado para {series_name}. Buscando desde {start_date.strftime("%Y-%m-%d")}',
+                    serie=series_name, etapa="planejamento")
+
+            future = executor.submit(_fetch_series_task, code, series_name, start_date, rate_limiter, backend)
+            pending[future] = (code, series_name, last_date, time.monotonic())
+
+        for future in as_completed(pending):
+            code, series_name, last_date, started_at = pending[future]
+            result = {"code": code, "series_name": series_name, "status": "sucesso", "registros": 0, "duracao": 0.0, "erro": None}
+            try:
+                processed_data = future.result()
+                if processed_data.empty:
+                    result["status"] = "sem_dados"
+                    log(f"Nenhum dado retornado da API para a série {series_name}.", "warning", serie=series_name, etapa="busca", registros=0)
+                else:
+                    if last_date:
+                        processed_data = processed_data[processed_data["data"] > last_date]
+
+                    if processed_data.empty:
+                        result["status"] = "sem_novos"
+                        log(f"Nenhum novo registro para {series_name} desde a última atualização.", serie=series_name, etapa="gravacao", registros=0)
+                    else:
+                        with stage_timer("gravacao", series_name):
+                            adapter.upsert_data(series_name, processed_data, SGS_KEY_COLUMNS, {"fonte": "sgs", "codigo": code})
+                        count("registros_gravados", len(processed_data), series_name)
+                        result["registros"] = len(processed_data)
+                        log(f"{len(processed_data)} novos registros salvos para {series_name}.", serie=series_name, etapa="gravacao", registros=len(processed_data))
+            except Exception as e:
+                result["status"] = "erro"
+                result["erro"] = str(e)
+                count("falhas", 1, series_name)
+                log(f"Erro ao coletar a série {series_name} (Código BCB: {code}): {str(e)}", "error", serie=series_name, etapa="erro")
+
+            result["duracao"] = round(time.monotonic() - started_at, 3)
+            results.append(result)
+
+    # Perfil (periodicidade, lacunas, duplicados) recalculado em lote sobre a série completa das tabelas alteradas
+    updated_tables = [result["series_name"] for result in results if result["registros"]]
+    if updated_tables:
+        try:
+            with stage_timer("perfil"):
+                profiles = profile_tables(adapter, updated_tables)
+            for table_name, profile in profiles.items():
+                log(f"Perfil de {table_name}: {profile['periodicidade']} (confiança {profile['confianca']:.0%}), "
+                    f"{profile['lacunas']} lacuna(s), {profile['duplicados']} duplicado(s).", serie=table_name, etapa="perfil")
+        except Exception as e:
+            log(f"Erro ao calcular o perfil das séries atualizadas: {str(e)}", "warning", etapa="perfil")
+
+    return results
+
+def focus_table_name(endpoint: str, filters: dict) -> str:
+    """
+    Nome padrão da tabela de um endpoint do Focus: focus_<endpoint>[_<indicador>].
+    """
+    table_name = f"focus_{endpoint.lower()}"
+    if filters.get("Indicador"):
+        table_name += f"_{filters['Indicador'].lower().replace(' ', '_')}"
+    return table_name
+
+def _focus_watermark_filters(filters: dict, fields: list | None) -> dict:
+    """
+    Filtros que identificam a combinação coletada. O intervalo de datas fica de fora,
+    pois é justamente o que a marca d'água controla; a projeção de campos faz parte da identidade.
+    """
+    identity = {key: value for key, value in filters.items() if key not in ("Data", "DataFim")}
+    if fields:
+        identity["$select"] = ",".join(sorted(fields))
+    return identity
+
+def collect_focus_job(job: dict, adapter: DatabaseAdapter, endpoints_config: dict, collection_config: dict | None = None,
+                      rate_limiter=None, incremental: bool = True, log=print_log) -> dict:
+    """
+    Executa uma coleta do Boletim Focus: busca paginada, gravação de cada página e atualização da marca d'água.
+
+    Se já houver marca d'água para o endpoint e os filtros (exceto datas), e a Data de Início estiver
+    dentro do período já coberto, a busca começa na última Data gravada; a última data é relida e
+    regravada pela chave natural, sem duplicar. A marca d'água só avança quando todas as páginas foram
+    gravadas. Coletas com Data de Fim não usam nem atualizam a marca d'água.
+
+    Args:
+        job (dict): Especificação da coleta, com as chaves "endpoint", "filtros" e, opcionalmente,
+            "nome", "tabela" (padrão: `focus_table_name`) e "campos" ($select).
+        adapter (DatabaseAdapter): Adaptador de banco de dados já conectado.
+        endpoints_config (dict): Seção `focus_endpoints` do focus_config.yaml.
+        collection_config (dict, opcional): Seção `collection` do focus_config.yaml (paginação e concorrência).
+        rate_limiter (RateLimiter, opcional): Limitador de requisições por host, compartilhado entre coletas.
+        incremental (bool): Usa a marca d'água para buscar apenas as datas ainda não gravadas (padrão: True).
+        log (callable): Função usada para registrar mensagens de progresso.
+
+    Returns:
+        dict: Resultado com as chaves "nome", "endpoint", "tabela", "status" ("sucesso", "sem_dados" ou "erro"),
+        "registros", "paginas", "duracao" e "erro".
+    """
+    started_at = time.monotonic()
+    endpoint = job["endpoint"]
+    filters = dict(job.get("filtros") or {})
+    fields = job.get("campos")
+    collection_config = collection_config or {}
+    table_name = job.get("tabela") or focus_table_name(endpoint, filters)
+    result = {"nome": job.get("nome") or table_name, "endpoint": endpoint, "tabela": table_name,
+              "status": "sucesso", "registros": 0, "paginas": 0, "duracao": 0.0, "erro": None}
+
+    try:
+        # Chave natural do endpoint (regravações não duplicam registros)
+        endpoint_config = endpoints_config.get(endpoint, {})
+        metadata = {"fonte": "focus", "codigo": endpoint}
+
+        # Coleta incremental: retoma a partir da última Data já gravada para esta combinação de filtros
+        query_filters = dict(filters)
+        identity = _focus_watermark_filters(filters, fields)
+        use_watermark = incremental and not filters.get("DataFim")
+        requested_start = pd.Timestamp(filters["Data"]) if filters.get("Data") else None
+        first_date = requested_start
+        resumed = False
+        watermark = adapter.get_watermark(endpoint, identity) if use_watermark and requested_start is not None else None
+        if (watermark and watermark["tabela"] == table_name and watermark["primeira_data"] is not None
+                and watermark["ultima_data"] is not None and watermark["primeira_data"] <= requested_start <= watermark["ultima_data"]):
+            first_date = watermark["primeira_data"]
+            resumed = True
+            query_filters["Data"] = watermark["ultima_data"].strftime("%Y-%m-%d")
+            log(f"[{result['nome']}] Coleta incremental: dados já gravados até {query_filters['Data']}. Buscando apenas datas a partir dela.",
+                serie=result["nome"], etapa="planejamento")
+
+        # Cada página é gravada assim que chega; apenas uma página por thread fica em memória.
+        # Sem cache de respostas: a coleta precisa ver as expectativas publicadas desde a última execução.
+        last_date = watermark["ultima_data"] if resumed else None
+        pages = iter_bcb_focus(
+            endpoint,
+            campos=fields,
+            page_size=collection_config.get("tamanho_pagina", DEFAULT_PAGE_SIZE),
+            window_days=collection_config.get("janela_dias", DEFAULT_WINDOW_DAYS),
+            max_workers=collection_config.get("max_workers", DEFAULT_PAGE_WORKERS),
+            rate_limiter=rate_limiter,
+            use_cache=False,
+            **query_filters,
+        )
+        for page, info in timed_iter(pages, "busca", result["nome"]):
+            count("registros_recebidos", info["registros"], result["nome"])
+            with stage_timer("processamento", result["nome"]):
+                page = focus_processor(page, endpoint, filters)
+            key_columns = [column for column in endpoint_config.get("chave_natural", []) if column in page.columns]
+            with stage_timer("gravacao", result["nome"]):
+                # upsert_data levanta erro se a página não puder ser gravada: a marca d'água não avança
+                adapter.upsert_data(table_name, page, key_columns, metadata)
+            count("registros_gravados", len(page), result["nome"])
+            if "Data" in page.columns and not page["Data"].isna().all():
+                page_last_date = pd.Timestamp(page["Data"].max())
+                last_date = page_last_date if last_date is None else max(last_date, page_last_date)
+            result["registros"] += info["registros"]
+            result["paginas"] += 1
+            janela = f" (janela {info['janela'][0]} a {info['janela'][1]})" if info["janela"] else ""
+            log(f"[{result['nome']}] Página {info['pagina']}{janela}: {info['registros']} registros salvos. Total: {result['registros']}",
+                serie=result["nome"], etapa="pagina", registros=result["registros"], coalesce=True)
+
+        # Todas as páginas foram gravadas: a marca d'água avança até a última Data recebida
+        if use_watermark and first_date is not None and last_date is not None:
+            adapter.set_watermark(endpoint, identity, table_name, first_date, last_date)
+
+        if not result["registros"]:
+            result["status"] = "sem_dados"
+    except Exception as e:
+        result["status"] = "erro"
+        result["erro"] = str(e)
+        count("falhas", len(getattr(e, "failed_pages", None) or [None]), result["nome"])
+        log(f"[{result['nome']}] Erro durante a coleta do Boletim Focus: {str(e)}", "error", serie=result["nome"], etapa="erro")
+
+    result["duracao"] = round(time.monotonic() - started_at, 3)
+    return result
+
+def collect_focus_jobs(jobs: list[dict], adapter: DatabaseAdapter, endpoints_config: dict, collection_config: dict | None = None,
+                       max_jobs: int = DEFAULT_MAX_FOCUS_JOBS, rate_limiter=None, incremental: bool = True, log=print_log) -> list[dict]:
+    """
+    Executa um lote de coletas do Boletim Focus com concorrência limitada.
+
+    Todas as coletas compartilham o mesmo adaptador (pool de conexões), o mesmo limitador de
+    requisições e os metadados da API. Cada coleta ainda busca suas páginas em paralelo
+    (`collection.max_workers`), de modo que o total de requisições simultâneas é limitado
+    pelo `rate_limiter`.
+
+    Args:
+        jobs (list[dict]): Especificações das coletas (ver `collect_focus_job`).
+        adapter (DatabaseAdapter): Adaptador de banco de dados já conectado.
+        endpoints_config (dict): Seção `focus_endpoints` do focus_config.yaml.
+        collection_config (dict, opcional): Seção `collection` do focus_config.yaml.
+        max_jobs (int): Número máximo de coletas executadas ao mesmo tempo.
+        rate_limiter (RateLimiter, opcional): Limitador de requisições por host.
+        incremental (bool): Usa as marcas d'água das coletas anteriores (padrão: True).
+        log (callable): Função usada para registrar mensagens de progresso.
+
+    Returns:
+        list[dict]: Um resultado por coleta, na ordem das especificações.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, int(max_jobs))) as executor:
+        futures = [
+            executor.submit(collect_focus_job, job, adapter, endpoints_config, collection_config, rate_limiter, incremental, log)
+            for job in jobs
+        ]
+        return [future.result() for future in futures]
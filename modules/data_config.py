@@ -1,13 +1,203 @@
+import copy
+import os
+import threading
 import yaml
 from utils.get_base_path import get_base_path
 
+SERIES_CONFIG_FILE = "series_config.yaml"
+FOCUS_CONFIG_FILE = "focus_config.yaml"
+
+# Configuração usada quando o series_config.yaml não existe
+DEFAULT_SERIES_CONFIG = {
+    "database": {"type": "sqlite", "db_name": "dados_bcb.db"},
+    "collection": {"max_workers": 4, "rate_limit_per_host": 5, "sgs_backend": "bcb"},
+    "series_codes": {},
+}
+
+# Operadores aceitos na chave `operador` dos parâmetros do focus_config.yaml (ver FILTER_OPERATORS em data_acquirer_focus)
+FOCUS_OPERATORS = ("eq", "ge", "le", "gt", "lt")
+
+# Configurações já carregadas, por caminho do arquivo: (assinatura, configuração, índices, erro)
+_config_cache = {}
+_config_lock = threading.Lock()
+
+class ConfigError(ValueError):
+    """
+    Erro levantado quando um arquivo de configuração não segue a estrutura esperada.
+    """
+    def __init__(self, file_name: str, message: str):
+        self.file_name = file_name
+        super().__init__(f"{file_name}: {message}")
+
+def _file_signature(config_path: str) -> tuple[int, int] | None:
+    """
+    Retorna a data de modificação (em nanossegundos) e o tamanho do arquivo, ou None se ele não existir.
+    """
+    try:
+        stat = os.stat(config_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def _check_section(config: dict, section: str, expected_type: type, file_name: str, required: bool = False):
+    """
+    Verifica o tipo de uma seção de primeiro nível (seções opcionais podem estar vazias).
+    """
+    value = config.get(section)
+    if value is None:
+        if required:
+            raise ConfigError(file_name, f"a seção '{section}' é obrigatória.")
+        return
+    if not isinstance(value, expected_type):
+        raise ConfigError(file_name, f"a seção '{section}' deve ser um {'dicionário' if expected_type is dict else 'lista'}.")
+
+def _check_database(config: dict, file_name: str):
+    """
+    Valida a seção `database`, comum aos dois arquivos de configuração.
+    """
+    _check_section(config, "database", dict, file_name)
+    database = config.get("database") or {}
+    for key in ("type", "db_name", "layout"):
+        if key in database and not isinstance(database[key], str):
+            raise ConfigError(file_name, f"database.{key} deve ser um texto.")
+    if database.get("layout", "tabelas") not in ("tabelas", "observacoes"):
+        raise ConfigError(file_name, "database.layout deve ser 'tabelas' ou 'observacoes'.")
+
+def _validate_series_config(config: dict, file_name: str) -> dict:
+    """
+    Valida o series_config.yaml e monta o índice código -> tabela.
+    """
+    _check_database(config, file_name)
+    _check_section(config, "collection", dict, file_name)
+    _check_section(config, "cache", dict, file_name)
+    _check_section(config, "agendador", dict, file_name)
+    _check_section(config, "instrumentacao", dict, file_name)
+    _check_section(config, "series_codes", dict, file_name)
+
+    # Os códigos são sempre tratados como texto, mesmo quando escritos sem aspas no YAML
+    series_codes = {str(code): table for code, table in (config.get("series_codes") or {}).items()}
+    config["series_codes"] = series_codes
+    table_by_code = {}
+    code_by_table = {}
+    for code, table_name in series_codes.items():
+        if not isinstance(table_name, str) or not table_name:
+            raise ConfigError(file_name, f"a série {code} precisa de um nome de tabela.")
+        if table_name in code_by_table:
+            raise ConfigError(file_name, f"a tabela '{table_name}' está associada às séries {code_by_table[table_name]} e {code}.")
+        table_by_code[code] = table_name
+        code_by_table[table_name] = code
+    return {"tabela_por_codigo": table_by_code}
+
+def _validate_focus_config(config: dict, file_name: str) -> dict:
+    """
+    Valida o focus_config.yaml e monta os índices de endpoints (nome amigável ou técnico -> nome técnico),
+    de parâmetros aceitos como filtro (os que declaram `operador`) por endpoint e de coletas (`focus_jobs`) por nome.
+    """
+    _check_database(config, file_name)
+    _check_section(config, "collection", dict, file_name)
+    _check_section(config, "focus_jobs", list, file_name)
+    _check_section(config, "focus_endpoints", dict, file_name, required=True)
+
+    endpoint_by_name = {}
+    params_by_endpoint = {}
+    fields_by_endpoint = {}
+    for endpoint, endpoint_config in config["focus_endpoints"].items():
+        if not isinstance(endpoint_config, dict):
+            raise ConfigError(file_name, f"a configuração do endpoint '{endpoint}' deve ser um dicionário.")
+        friendly_name = endpoint_config.get("nome_amigavel")
+        if not isinstance(friendly_name, str) or not friendly_name:
+            raise ConfigError(file_name, f"o endpoint '{endpoint}' precisa de um nome_amigavel.")
+        if endpoint_by_name.get(friendly_name, endpoint) != endpoint:
+            raise ConfigError(file_name, f"o nome_amigavel '{friendly_name}' está repetido.")
+        endpoint_by_name[friendly_name] = endpoint
+        endpoint_by_name[endpoint] = endpoint
+
+        params = endpoint_config.get("parametros") or {}
+        if not isinstance(params, dict):
+            raise ConfigError(file_name, f"os parâmetros do endpoint '{endpoint}' devem ser um dicionário.")
+        for param, param_config in params.items():
+            op = (param_config or {}).get("operador")
+            if op is not None and op not in FOCUS_OPERATORS:
+                raise ConfigError(file_name, f"operador '{op}' inválido em {endpoint}.{param}. Utilize {', '.join(FOCUS_OPERATORS)}.")
+        natural_key = endpoint_config.get("chave_natural")
+        if not isinstance(natural_key, list) or not natural_key:
+            raise ConfigError(file_name, f"o endpoint '{endpoint}' precisa de uma chave_natural (lista de campos que identificam uma expectativa).")
+        missing_keys = [key for key in natural_key if key not in params]
+        if missing_keys:
+            raise ConfigError(file_name, f"a chave_natural do endpoint '{endpoint}' usa campos inexistentes: {', '.join(missing_keys)}.")
+        # Apenas parâmetros com `operador` são filtros; os demais são campos de resultado
+        params_by_endpoint[endpoint] = frozenset(param for param, param_config in params.items() if (param_config or {}).get("operador"))
+        fields_by_endpoint[endpoint] = tuple(param for param, param_config in params.items() if "campo" not in (param_config or {}))
+
+    jobs_by_name = {}
+    for job in config.get("focus_jobs") or []:
+        job_name = (job or {}).get("nome")
+        if not job_name:
+            raise ConfigError(file_name, "toda coleta de focus_jobs precisa de um nome.")
+        if job_name in jobs_by_name:
+            raise ConfigError(file_name, f"a coleta '{job_name}' está repetida em focus_jobs.")
+        endpoint = endpoint_by_name.get(job.get("endpoint"))
+        if endpoint is None:
+            raise ConfigError(file_name, f"a coleta '{job_name}' usa o endpoint desconhecido '{job.get('endpoint')}'.")
+        invalid_filters = [key for key in job.get("filtros") or {} if key not in params_by_endpoint[endpoint]]
+        if invalid_filters:
+            raise ConfigError(file_name, f"a coleta '{job_name}' usa filtros inexistentes no endpoint {endpoint}: {', '.join(invalid_filters)}.")
+        jobs_by_name[job_name] = job
+
+    return {
+        "endpoint_por_nome": endpoint_by_name,
+        "parametros_por_endpoint": params_by_endpoint,
+        "campos_por_endpoint": fields_by_endpoint,
+        "coletas_por_nome": jobs_by_name,
+    }
+
+def _load_config(file_name: str, validator, default: dict | None = None) -> tuple[dict, dict]:
+    """
+    Retorna a configuração e os índices de um arquivo YAML, lendo e validando o arquivo apenas
+    quando ele muda (data de modificação ou tamanho). Um arquivo inválido é validado uma única vez:
+    o mesmo erro é levantado até que o arquivo seja corrigido.
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir e não houver configuração padrão.
+        ConfigError: Se o arquivo não seguir a estrutura esperada.
+    """
+    config_path = get_base_path(file_name)
+    signature = _file_signature(config_path)
+    with _config_lock:
+        cached = _config_cache.get(config_path)
+        if cached is None or cached[0] != signature:
+            config, indexes, error = None, None, None
+            try:
+                if signature is None:
+                    if default is None:
+                        raise FileNotFoundError(f"Arquivo {file_name} não encontrado em {config_path}")
+                    config = copy.deepcopy(default)
+                else:
+                    with open(config_path, "r", encoding="utf-8") as f:
+                        config = yaml.safe_load(f) or {}
+                if not isinstance(config, dict):
+                    raise ConfigError(file_name, "o arquivo deve conter um dicionário de seções.")
+                indexes = validator(config, file_name)
+            except (FileNotFoundError, yaml.YAMLError, ConfigError) as e:
+                config, indexes, error = None, None, e
+            cached = (signature, config, indexes, error)
+            _config_cache[config_path] = cached
+    if cached[3] is not None:
+        raise cached[3]
+    return cached[1], cached[2]
+
 class ConfigManager:
     """
     Classe utilitária para centralizar o acesso e manipulação de arquivos de configuração YAML.
 
+    Cada arquivo é lido e validado uma única vez e mantido em memória até ser modificado.
+    Os dicionários retornados são compartilhados entre as chamadas: faça uma cópia (copy.deepcopy)
+    antes de alterá-los.
+
     Exemplo de uso:
-    from modules.config_manager import ConfigManager
+    from modules.data_config import ConfigManager
     series_config = ConfigManager.load_series_config()
+    endpoint, endpoint_config = ConfigManager.resolve_focus_endpoint("Expectativas de Mercado Anuais")
     """
 
     @staticmethod
@@ -16,14 +206,44 @@ class ConfigManager:
         Retorna a configuração atual do series_config.yaml.
         Returns:
             dict: Dicionário com a configuração atual ou os valores padrão se o arquivo não existir.
+        Raises:
+            ConfigError: Se o arquivo não seguir a estrutura esperada.
+        """
+        return _load_config(SERIES_CONFIG_FILE, _validate_series_config, DEFAULT_SERIES_CONFIG)[0]
+
+    @staticmethod
+    def get_metrics_config() -> dict:
+        """
+        Retorna a seção `instrumentacao` do series_config.yaml, que vale para as coletas de séries e do Focus.
+        Uma configuração ilegível desabilita a instrumentação em vez de interromper a coleta.
         """
-        config_path = get_base_path("series_config.yaml")
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
-                return config
-        except FileNotFoundError:
-            return {"database": {"type": "sqlite", "db_name": "dados_bcb.db"}, "series_codes": {}}
+            return ConfigManager.load_series_config().get("instrumentacao") or {}
+        except Exception as e:
+            print(f"AVISO: Instrumentação desabilitada, series_config.yaml inválido: {e}")
+            return {}
+
+    @staticmethod
+    def get_cache_config() -> dict:
+        """
+        Retorna a seção `cache` do series_config.yaml, relida quando o arquivo muda.
+        Uma configuração ilegível desabilita o cache em vez de interromper as consultas.
+        """
+        try:
+            return ConfigManager.load_series_config().get("cache") or {}
+        except Exception as e:
+            print(f"AVISO: Cache de respostas desabilitado, series_config.yaml inválido: {e}")
+            return {"enabled": False}
+
+    @staticmethod
+    def load_focus_settings():
+        """
+        Retorna a configuração completa do focus_config.yaml (database, collection, focus_jobs e focus_endpoints).
+        Raises:
+            FileNotFoundError: Se o arquivo não existir.
+            ConfigError: Se o arquivo não seguir a estrutura esperada.
+        """
+        return _load_config(FOCUS_CONFIG_FILE, _validate_focus_config)[0]
 
     @staticmethod
     def load_focus_config():
@@ -32,17 +252,75 @@ class ConfigManager:
         Returns:
             dict: Dicionário com a configuração dos endpoints do Focus, ou None se houver erro.
         """
-        config_path = get_base_path("focus_config.yaml")
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
-            return config.get("focus_endpoints", {})
-        except FileNotFoundError:
-            print(f"ERRO: Arquivo focus_config.yaml não encontrado em {config_path}")
+            return ConfigManager.load_focus_settings().get("focus_endpoints", {})
+        except FileNotFoundError as e:
+            print(f"ERRO: {e}")
             return None
-        except yaml.YAMLError as e:
+        except (yaml.YAMLError, ConfigError) as e:
             print(f"ERRO: Erro ao ler o arquivo focus_config.yaml: {e}")
             return None
         except Exception as e:
             print(f"ERRO: Erro inesperado ao carregar configuração: {e}")
             return None
+
+    @staticmethod
+    def resolve_focus_endpoint(name: str) -> tuple[str, dict]:
+        """
+        Encontra o nome técnico e a configuração de um endpoint do Focus a partir do nome amigável
+        (ex: "Expectativas de Mercado Anuais") ou do próprio nome técnico.
+        Raises:
+            ValueError: Se o endpoint não existir no focus_config.yaml.
+        """
+        config, indexes = _load_config(FOCUS_CONFIG_FILE, _validate_focus_config)
+        endpoint = indexes["endpoint_por_nome"].get(name)
+        if endpoint is None:
+            raise ValueError(f"Boletim '{name}' não encontrado no arquivo de configuração.")
+        return endpoint, config["focus_endpoints"][endpoint]
+
+    @staticmethod
+    def get_focus_params(endpoint: str) -> frozenset:
+        """
+        Retorna os nomes dos parâmetros aceitos como filtro pelo endpoint (nome amigável ou técnico),
+        isto é, os que declaram `operador` no focus_config.yaml.
+        """
+        indexes = _load_config(FOCUS_CONFIG_FILE, _validate_focus_config)[1]
+        return indexes["parametros_por_endpoint"].get(indexes["endpoint_por_nome"].get(endpoint), frozenset())
+
+    @staticmethod
+    def get_focus_fields(endpoint: str) -> tuple:
+        """
+        Retorna os campos retornados pelo endpoint (nome amigável ou técnico), na ordem do focus_config.yaml.
+        Filtros derivados, como DataFim, não são campos.
+        """
+        indexes = _load_config(FOCUS_CONFIG_FILE, _validate_focus_config)[1]
+        return indexes["campos_por_endpoint"].get(indexes["endpoint_por_nome"].get(endpoint), ())
+
+    @staticmethod
+    def get_focus_jobs(job_names: list[str] | None = None) -> list[dict]:
+        """
+        Retorna as coletas de `focus_jobs`, na ordem do arquivo. Se `job_names` for informado, apenas as coletas com esses nomes.
+        """
+        config, indexes = _load_config(FOCUS_CONFIG_FILE, _validate_focus_config)
+        if not job_names:
+            return list(config.get("focus_jobs") or [])
+        return [job for name, job in indexes["coletas_por_nome"].items() if name in job_names]
+
+    @staticmethod
+    def get_series_table(code: str) -> str | None:
+        """
+        Retorna o nome da tabela da série SGS `code`, ou None se a série não estiver configurada.
+        """
+        return _load_config(SERIES_CONFIG_FILE, _validate_series_config, DEFAULT_SERIES_CONFIG)[1]["tabela_por_codigo"].get(str(code))
+
+    @staticmethod
+    def invalidate(file_name: str | None = None):
+        """
+        Descarta a configuração em memória de `file_name` (ou de todos os arquivos), forçando uma nova leitura.
+        Alterações no arquivo já são detectadas automaticamente; use após gravá-lo pela própria aplicação.
+        """
+        with _config_lock:
+            if file_name is None:
+                _config_cache.clear()
+            else:
+                _config_cache.pop(get_base_path(file_name), None)
@@ -1,62 +1,142 @@
-import pandas as pd
 import os
+import csv
+import gzip
+import pandas as pd
 from datetime import datetime
+from typing import Iterable
+
+from openpyxl import Workbook
 
 from utils.dataframe_format import date_format as formatar_datas_dataframe
 
-def export_dataframe(df: pd.DataFrame, file_format: str, table_name: str) -> str:
+DATE_COLUMNS = ("data", "Data")
+EXCEL_MAX_ROWS = 1048576
+
+def _build_export_path(file_format: str, table_name: str, compress: bool = False) -> str:
     """
-    Exporta um DataFrame para CSV ou Excel.
-    
-    Args:
-        df: DataFrame a ser exportado
-        file_format: Formato do arquivo ('csv' ou 'excel')
-        table_name: Nome da tabela/série para nomear o arquivo
-    
-    Returns:
-        Caminho completo do arquivo salvo
+    Monta o caminho do arquivo de exportação na pasta Downloads do usuário (ou no diretório atual).
     """
     # Determinar pasta de Downloads do usuário
     home_dir = os.path.expanduser("~")
     downloads_dir = os.path.join(home_dir, "Downloads")
-    sheet_name = f'ColetorBCB_v2.2-{table_name}'
-
-    # Verificar se o DataFrame está vazio
-    if df.empty:
-        raise ValueError("O DataFrame está vazio. Não há dados para exportar.")
 
     # Se não existir pasta Downloads, usar diretório atual
     if not os.path.exists(downloads_dir):
         downloads_dir = os.getcwd()
-    
+
     # Criar nome do arquivo com timestamp
     timestamp = datetime.now().strftime("%d-%m-%Y_%H-%M-%S")
-    
-    # Formata colunas genéricas datatime para o formato brasileiro
-    df = formatar_datas_dataframe(df)
+    extension = {"csv": "csv", "excel": "xlsx"}[file_format]
+
+    filename = f"dados_{table_name}_{timestamp}.{extension}"
+    # Testa se o filename ultrapassa 31 caracteres
+    if len(filename) > 31:
+        filename = f"dados_{table_name[:20]}_{timestamp}.{extension}"
+    if compress:
+        filename += ".gz"
 
-    if len(sheet_name) > 31:
-        sheet_name = sheet_name[:31]
+    return os.path.join(downloads_dir, filename)
+
+def _format_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte as colunas de data (lidas do banco como texto) e as formata no padrão brasileiro.
+    """
+    for col in DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], format="ISO8601", errors="coerce")
+    return formatar_datas_dataframe(df)
+
+def _write_csv(chunks: Iterable[pd.DataFrame], filepath: str, compress: bool) -> int:
+    """
+    Grava os blocos em CSV de forma incremental; o cabeçalho é escrito apenas no primeiro bloco.
+    """
+    total_rows = 0
+    opener = gzip.open if compress else open
+    with opener(filepath, "wt", encoding="utf-8", newline="") as file:
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            _format_chunk(chunk).to_csv(file, index=False, header=total_rows == 0, quoting=csv.QUOTE_MINIMAL)
+            total_rows += len(chunk)
+    return total_rows
 
-    if file_format.lower() == 'csv':
-        filename = f"dados_{table_name}_{timestamp}.csv"
-        # Testa se o filename ultrapassa 31 caracteres
-        if len(filename) > 31:
-            filename = f"dados_{table_name[:20]}_{timestamp}.csv"
+def _write_excel(chunks: Iterable[pd.DataFrame], filepath: str, sheet_name: str) -> int:
+    """
+    Grava os blocos em Excel usando o modo write-only do openpyxl, que envia as linhas
+    diretamente para o arquivo em vez de manter a planilha inteira em memória.
+    """
+    total_rows = 0
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet_name)
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        if total_rows == 0:
+            worksheet.append(list(chunk.columns))
+        if total_rows + len(chunk) + 1 > EXCEL_MAX_ROWS:
+            raise ValueError(f"A série excede o limite de {EXCEL_MAX_ROWS} linhas do Excel. Utilize a exportação em CSV.")
+        chunk = _format_chunk(chunk)
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False, name=None):
+            worksheet.append(row)
+        total_rows += len(chunk)
+    if total_rows:
+        workbook.save(filepath)
+    workbook.close()
+    return total_rows
 
-        filepath = os.path.join(downloads_dir, filename)
-        df.to_csv(filepath, index=False, encoding='utf-8')
+def export_chunks(chunks: Iterable[pd.DataFrame], file_format: str, table_name: str, compress: bool = False) -> str:
+    """
+    Exporta uma sequência de blocos de DataFrame para CSV ou Excel, sem materializar a tabela inteira.
 
-    elif file_format.lower() == 'excel':
-        filename = f"dados_{table_name}_{timestamp}.xlsx"
-        # Testa se o filename ultrapassa 31 caracteres
-        if len(filename) > 31:
-            filename = f"dados_{table_name[:20]}_{timestamp}.xlsx"
+    Cada bloco tem suas datas formatadas e é gravado imediatamente, de modo que o pico de memória
+    depende apenas do tamanho do bloco (ver `DatabaseAdapter.iter_table_chunks`).
 
-        filepath = os.path.join(downloads_dir, filename)
-        df.to_excel(filepath, sheet_name=sheet_name, index=False, engine='openpyxl')
+    Args:
+        chunks: Iterável de DataFrames com as mesmas colunas
+        file_format: Formato do arquivo ('csv' ou 'excel')
+        table_name: Nome da tabela/série para nomear o arquivo
+        compress: Se True, o CSV é gravado compactado com gzip (.csv.gz). Ignorado para Excel.
 
-    else:
+    Returns:
+        Caminho completo do arquivo salvo
+    """
+    file_format = file_format.lower()
+    if file_format not in ("csv", "excel"):
         raise ValueError(f"Formato não suportado: {file_format} \n Utilize 'csv' ou 'excel'.")
+
+    compress = compress and file_format == "csv"
+    filepath = _build_export_path(file_format, table_name, compress)
+    sheet_name = f'ColetorBCB_v2.2-{table_name}'[:31]
+
+    try:
+        if file_format == "csv":
+            total_rows = _write_csv(chunks, filepath, compress)
+        else:
+            total_rows = _write_excel(chunks, filepath, sheet_name)
+    except Exception:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        raise
+
+    # Verificar se havia dados para exportar
+    if total_rows == 0:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        raise ValueError("O DataFrame está vazio. Não há dados para exportar.")
+
+    return filepath
+
+def export_dataframe(df: pd.DataFrame, file_format: str, table_name: str) -> str:
+    """
+    Exporta um DataFrame para CSV ou Excel.
     
-    return filepath
\ No newline at end of file
+    Args:
+        df: DataFrame a ser exportado
+        file_format: Formato do arquivo ('csv' ou 'excel')
+        table_name: Nome da tabela/série para nomear o arquivo
+    
+    Returns:
+        Caminho completo do arquivo salvo
+    """
+    return export_chunks([df.copy()], file_format, table_name)
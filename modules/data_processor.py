@@ -1,50 +1,21 @@
 import pandas as pd
-from statistics import mode
+
+from modules.data_profiler import profile_series
 
 def infer_periodicity(df: pd.DataFrame) -> str:
     """
-    Analisa um DataFrame de série temporal e infere sua periodicidade
-    baseada na diferença entre datas consecutivas.
-    
+    Infere a periodicidade de um DataFrame de série temporal a partir do perfil vetorizado
+    das datas (ver `modules.data_profiler.profile_series`).
+
     Args:
         df: DataFrame com coluna 'data' contendo as datas da série
-        
+
     Returns:
-        str: "Diária", "Mensal", "Anual" ou "Desconhecida"
+        str: "diaria", "semanal", "mensal", "trimestral", "anual" ou "Desconhecida"
     """
-    if df.empty or len(df) < 2:
-        return "Desconhecida"
-    
-    # Garantir que a coluna data está em formato datetime
-    df_copy = df.copy()
-    df_copy['data'] = pd.to_datetime(df_copy['data'])
-    
-    # Ordenar por data para garantir sequência correta
-    df_copy = df_copy.sort_values('data')
-    
-    # Calcular diferenças em dias entre datas consecutivas
-    date_diffs = df_copy['data'].diff().dt.days.dropna()
-    
-    if date_diffs.empty:
-        return "Desconhecida"
-    
-    try:
-        # Calcular a moda (valor mais comum) das diferenças
-        most_common_diff = mode(date_diffs)
-        
-        # Classificar baseado na diferença mais comum
-        if most_common_diff == 1:
-            return "diaria"
-        elif 28 <= most_common_diff <= 31:
-            return "mensal"
-        elif 365 <= most_common_diff <= 366:
-            return "anual"
-        else:
-            return "Desconhecida"
-            
-    except Exception:
-        # Em caso de erro ou dados inconsistentes
+    if df.empty or 'data' not in df.columns:
         return "Desconhecida"
+    return profile_series(df['data'])["periodicidade"]
 
 def process_series_data(df, series_code):
     """
@@ -54,6 +25,10 @@ def process_series_data(df, series_code):
     if df.empty:
         return pd.DataFrame()
 
+    # O cliente nativo do SGS já entrega as colunas 'data' (datetime64) e 'valor' (float64)
+    if list(df.columns) == ['data', 'valor'] and pd.api.types.is_datetime64_any_dtype(df['data']):
+        return df
+
     # A biblioteca python-bcb já retorna o DataFrame com a coluna de data como índice
     # e com o nome 'value' para o valor da série.
     # Vamos resetar o índice para ter 'Date' como uma coluna e renomear 'value' para 'Value'
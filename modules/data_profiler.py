@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+from persistence.base_adapter import DatabaseAdapter
+
+# Confiança mínima (fração dos intervalos compatíveis) para aceitar uma periodicidade
+MIN_CONFIDENCE = 0.6
+# Quantidade máxima de lacunas detalhadas no perfil (as maiores)
+MAX_REPORTED_GAPS = 20
+UNKNOWN_PERIODICITY = "Desconhecida"
+
+PROFILE_FIELDS = [
+    "periodicidade", "confianca", "dias_uteis", "total_registros", "duplicados", "primeira_data", "ultima_data",
+    "valor_minimo", "valor_maximo", "valores_nulos", "lacunas", "lacunas_detalhe",
+]
+
+def _to_days(dates) -> np.ndarray:
+    """
+    Converte datas (datetime64, Timestamp ou texto) em um vetor datetime64[D], sem valores ausentes.
+    """
+    values = np.asarray(dates)
+    if not np.issubdtype(values.dtype, np.datetime64):
+        values = pd.to_datetime(pd.Series(values), errors="coerce").to_numpy()
+    days = values.astype("datetime64[D]")
+    return days[~np.isnat(days)]
+
+def _empty_profile(count: int = 0, duplicates: int = 0) -> dict:
+    return {
+        "periodicidade": UNKNOWN_PERIODICITY, "confianca": 0.0, "dias_uteis": False, "total_registros": count,
+        "duplicados": duplicates, "primeira_data": None, "ultima_data": None, "valor_minimo": None,
+        "valor_maximo": None, "valores_nulos": 0, "lacunas": 0, "lacunas_detalhe": [],
+    }
+
+def profile_series(dates, values=None) -> dict:
+    """
+    Calcula o perfil de uma série temporal em uma única passada vetorizada (NumPy) sobre as datas.
+
+    A periodicidade é a que explica a maior fração dos intervalos entre datas consecutivas
+    (distintas), e essa fração é a confiança:
+        - diaria: intervalos de 1 dia corrido ou de 1 dia útil (`dias_uteis` indica séries de dias úteis,
+          em que fins de semana não são lacunas);
+        - semanal: 7 dias; mensal, trimestral e anual: 1, 3 e 12 meses de calendário.
+    Abaixo de MIN_CONFIDENCE, a periodicidade é "Desconhecida". Lacunas são intervalos maiores que
+    o passo da periodicidade; as MAX_REPORTED_GAPS maiores são detalhadas (início, fim e observações faltantes).
+
+    Args:
+        dates: Datas da série (Series, array ou lista), em qualquer ordem.
+        values (opcional): Valores da série, alinhados às datas, para mínimo, máximo e nulos.
+    Returns:
+        dict: Perfil com as chaves de PROFILE_FIELDS.
+    """
+    days = _to_days(dates)
+    count = int(days.size)
+    if count and np.any(days[1:] < days[:-1]):
+        days = np.sort(days)
+    steps = np.diff(days).astype(np.int64)
+    distinct = days[np.concatenate(([True], steps != 0))] if count else days
+    profile = _empty_profile(count, int(np.count_nonzero(steps == 0)))
+
+    if values is not None:
+        numeric = pd.to_numeric(pd.Series(np.asarray(values)), errors="coerce").to_numpy(dtype=np.float64)
+        nulls = np.isnan(numeric)
+        profile["valores_nulos"] = int(np.count_nonzero(nulls))
+        if profile["valores_nulos"] < numeric.size:
+            profile["valor_minimo"] = float(np.nanmin(numeric))
+            profile["valor_maximo"] = float(np.nanmax(numeric))
+
+    if not count:
+        return profile
+    profile["primeira_data"] = str(distinct[0])
+    profile["ultima_data"] = str(distinct[-1])
+    if distinct.size < 2:
+        return profile
+
+    start, end = distinct[:-1], distinct[1:]
+    calendar_steps = np.diff(distinct).astype(np.int64)
+    business_steps = np.busday_count(start, end)
+    month_steps = np.diff(distinct.astype("datetime64[M]").astype(np.int64))
+
+    # Passos em unidades de cada periodicidade candidata: 1 significa "sem lacuna"
+    candidates = {
+        "diaria_corrida": calendar_steps,
+        "diaria_util": np.where(np.is_busday(start), business_steps, 0),
+        "semanal": np.where(calendar_steps % 7 == 0, calendar_steps // 7, 0),
+        "mensal": month_steps,
+        "trimestral": np.where(month_steps % 3 == 0, month_steps // 3, 0),
+        "anual": np.where(month_steps % 12 == 0, month_steps // 12, 0),
+    }
+    scores = {name: float(np.count_nonzero(units == 1)) / calendar_steps.size for name, units in candidates.items()}
+    best = max(scores, key=scores.get)
+    profile["confianca"] = round(scores[best], 4)
+    if scores[best] < MIN_CONFIDENCE:
+        return profile
+
+    profile["periodicidade"] = "diaria" if best.startswith("diaria") else best
+    profile["dias_uteis"] = best == "diaria_util"
+
+    # Lacunas: intervalos que pulam observações esperadas (passos maiores que 1 na unidade escolhida)
+    units = candidates[best]
+    missing = np.where(units > 1, units - 1, 0)
+    gap_positions = np.flatnonzero(missing)
+    profile["lacunas"] = int(gap_positions.size)
+    if gap_positions.size > MAX_REPORTED_GAPS:
+        gap_positions = np.sort(gap_positions[np.argsort(missing[gap_positions], kind="stable")[-MAX_REPORTED_GAPS:]])
+    profile["lacunas_detalhe"] = [
+        {"inicio": str(start[position]), "fim": str(end[position]), "faltantes": int(missing[position])}
+        for position in gap_positions
+    ]
+    return profile
+
+def profile_tables(adapter: DatabaseAdapter, table_names: list[str] | None = None, force: bool = False,
+                   chunk_size: int = 200000) -> dict:
+    """
+    Calcula e grava no banco os perfis das tabelas de séries SGS (coluna 'data').
+
+    Apenas as colunas de data e valor são lidas, em blocos. Tabelas cujo perfil gravado corresponde
+    ao conteúdo atual (mesmo hash do catálogo) não são relidas, a menos que `force` seja informado.
+
+    Args:
+        adapter (DatabaseAdapter): Adaptador de banco de dados já conectado.
+        table_names (list[str], opcional): Tabelas a perfilar (padrão: todas as séries SGS do catálogo).
+        force (bool): Recalcula mesmo os perfis atualizados.
+    Returns:
+        dict: {nome da tabela: perfil} das tabelas perfiladas nesta chamada.
+    """
+    catalog = {entry["nome_tabela"]: entry for entry in adapter.get_catalog()}
+    if table_names is None:
+        table_names = [name for name, entry in catalog.items() if entry.get("fonte") == "sgs"]
+    stored = {} if force else adapter.get_profiles(table_names)
+
+    profiles = {}
+    for table_name in table_names:
+        entry = catalog.get(table_name)
+        if entry is None:
+            continue
+        if table_name in stored and stored[table_name].get("hash_conteudo") == entry.get("hash_conteudo"):
+            continue
+        date_parts, value_parts = [], []
+        for chunk in adapter.iter_table_chunks(table_name, columns=["data", "valor"], chunk_size=chunk_size):
+            date_parts.append(_to_days(chunk["data"]))
+            value_parts.append(pd.to_numeric(chunk["valor"], errors="coerce").to_numpy(dtype=np.float64))
+        dates = np.concatenate(date_parts) if date_parts else np.array([], dtype="datetime64[D]")
+        values = np.concatenate(value_parts) if value_parts else np.array([], dtype=np.float64)
+        profile = profile_series(dates, values)
+        profile["hash_conteudo"] = entry.get("hash_conteudo")
+        profiles[table_name] = profile
+
+    if profiles:
+        adapter.save_profiles(profiles)
+    return profiles
@@ -0,0 +1,312 @@
+import json
+import os
+import threading
+import pandas as pd
+from datetime import datetime, time, timedelta
+
+from modules.data_profiler import MIN_CONFIDENCE
+from utils.get_base_path import get_base_path
+
+# Valores padrão da seção `agendador` do series_config.yaml
+DEFAULT_SCHEDULER_CONFIG = {
+    "estado": "agendador_estado.json",
+    "horario": "09:00",
+    "defasagem_dias": {"mensal": 5, "trimestral": 60, "anual": 30},
+    "retentativa_horas": {"diaria": 2, "semanal": 24, "mensal": 24, "trimestral": 24, "anual": 168},
+    "espera_maxima_segundos": 300,
+}
+DEFAULT_PERIODICITY = "diaria"
+PERIODICITIES = ("diaria", "semanal", "mensal", "trimestral", "anual")
+# Periodicidades divulgadas com defasagem após o fim do período de referência
+LAGGED_PERIODICITIES = ("mensal", "trimestral", "anual")
+MAX_BACKOFF_HOURS = 24
+# Quantidade de defasagens de divulgação observadas mantidas por série
+LAG_HISTORY_SIZE = 12
+STATE_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+def scheduler_config(config: dict | None) -> dict:
+    """
+    Combina a seção `agendador` do series_config.yaml com os valores padrão (dicionários internos são mesclados chave a chave).
+    """
+    merged = {key: dict(value) if isinstance(value, dict) else value for key, value in DEFAULT_SCHEDULER_CONFIG.items()}
+    for key, value in (config or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key].update(value)
+        else:
+            merged[key] = value
+    return merged
+
+def _release_time(config: dict) -> time:
+    hour, minute = str(config["horario"]).split(":")
+    return time(int(hour), int(minute))
+
+def next_business_time(moment: datetime, config: dict) -> datetime:
+    """
+    Primeiro instante em dia útil (segunda a sexta), a partir de `moment`, que não seja anterior ao `horario` configurado.
+    Feriados não são considerados: uma verificação em feriado apenas não encontra dados novos.
+    """
+    release_time = _release_time(config)
+    if moment.time() < release_time:
+        moment = datetime.combine(moment.date(), release_time)
+    while moment.weekday() >= 5:
+        moment = datetime.combine(moment.date() + timedelta(days=1), release_time)
+    return moment
+
+def reference_end(periodicity: str, observation_date) -> datetime:
+    """
+    Fim do período de referência de uma observação (início do mês, do trimestre ou do ano seguinte;
+    uma semana depois para séries semanais; dia seguinte para séries diárias).
+    """
+    observation_date = pd.Timestamp(observation_date)
+    if periodicity == "mensal":
+        return (pd.Timestamp(observation_date.year, observation_date.month, 1) + pd.DateOffset(months=1)).to_pydatetime()
+    if periodicity == "trimestral":
+        quarter_start = pd.Timestamp(observation_date.year, 3 * ((observation_date.month - 1) // 3) + 1, 1)
+        return (quarter_start + pd.DateOffset(months=3)).to_pydatetime()
+    if periodicity == "semanal":
+        return (observation_date.normalize() + pd.Timedelta(days=7)).to_pydatetime()
+    if periodicity == "anual":
+        return datetime(observation_date.year + 1, 1, 1)
+    return (observation_date.normalize() + pd.Timedelta(days=1)).to_pydatetime()
+
+def release_lag_days(periodicity: str, entry: dict | None, config: dict) -> int:
+    """
+    Dias entre o fim do período de referência e a divulgação: a menor defasagem já observada para a série
+    (ver `ScheduleState.record_results`) ou, sem histórico, `defasagem_dias` da configuração.
+    """
+    learned = (entry or {}).get("defasagens_observadas")
+    if learned:
+        return int(min(learned))
+    return int(config["defasagem_dias"].get(periodicity, 0))
+
+def expected_release(periodicity: str, last_date: pd.Timestamp, config: dict, lag_days: int | None = None) -> datetime:
+    """
+    Estima quando a próxima observação da série, posterior a `last_date`, deve estar disponível na API.
+
+    - diaria: no próximo dia útil após a última data, a partir do `horario` configurado.
+    - semanal: no primeiro dia útil a partir de uma semana após a última data.
+    - mensal, trimestral e anual: após o fim do período de referência seguinte, mais `lag_days` dias.
+
+    Se `lag_days` for omitido, usa `defasagem_dias` da configuração.
+    """
+    last_date = pd.Timestamp(last_date)
+    release_time = _release_time(config)
+    if periodicity in LAGGED_PERIODICITIES:
+        if lag_days is None:
+            lag_days = int(config["defasagem_dias"].get(periodicity, 0))
+        next_observation = reference_end(periodicity, last_date)
+        return datetime.combine(reference_end(periodicity, next_observation).date() + timedelta(days=lag_days), release_time)
+    step = 7 if periodicity == "semanal" else 1
+    return next_business_time(datetime.combine(last_date.date() + timedelta(days=step), release_time), config)
+
+def plan_next_check(periodicity: str, last_date: pd.Timestamp | None, entry: dict | None, now: datetime, config: dict) -> datetime:
+    """
+    Define a próxima verificação de uma série, sem consultar a API.
+
+    Enquanto a próxima observação não é esperada, a série fica ociosa até a data prevista de divulgação.
+    Dentro da janela de divulgação, se a última verificação não trouxe dados novos, a série é consultada
+    novamente a cada `retentativa_horas` (em dias úteis, para séries diárias). Após erros, o intervalo
+    dobra a cada falha consecutiva, até MAX_BACKOFF_HOURS.
+
+    Args:
+        periodicity (str): "diaria", "semanal", "mensal", "trimestral" ou "anual".
+        last_date (pd.Timestamp, opcional): Última data gravada da série (None se a série ainda não foi coletada).
+        entry (dict, opcional): Estado persistido da série (ver ScheduleState).
+        now (datetime): Instante atual.
+        config (dict): Configuração do agendador (ver `scheduler_config`).
+    Returns:
+        datetime: Instante da próxima verificação.
+    """
+    entry = entry or {}
+    retry = timedelta(hours=float(config["retentativa_horas"].get(periodicity, config["retentativa_horas"].get(DEFAULT_PERIODICITY, 2))))
+    last_check = _parse_datetime(entry.get("ultima_verificacao"))
+
+    if entry.get("ultimo_status") == "erro" and last_check is not None:
+        failures = max(1, int(entry.get("falhas") or 1))
+        backoff = min(retry * (2 ** (failures - 1)), timedelta(hours=MAX_BACKOFF_HOURS))
+        return last_check + backoff
+
+    if last_date is None:
+        return now if last_check is None else last_check + retry
+
+    expected = expected_release(periodicity, last_date, config, release_lag_days(periodicity, entry, config))
+    if last_check is None or last_check < expected:
+        return expected
+    # Janela de divulgação aberta e a última verificação não trouxe dados novos
+    next_check = last_check + retry
+    return next_business_time(max(next_check, now), config) if periodicity in ("diaria", "semanal") else next_check
+
+def plan_fetch(series_codes: dict, last_dates: dict, periodicities: dict, state: "ScheduleState", now: datetime,
+               config: dict, force: bool = False) -> list[dict]:
+    """
+    Planejamento anterior à aquisição: decide, sem consultar a API, quais séries podem ter observações novas.
+
+    Uma série é buscada se ainda não tem dados gravados ou se a divulgação da próxima observação já é
+    esperada (ver `expected_release`, com a defasagem aprendida em `release_lag_days`). Com `force`, todas
+    as séries são buscadas.
+
+    Args:
+        series_codes (dict): Mapeamento {código BCB: nome da tabela}.
+        last_dates (dict): Última data gravada de cada tabela (ver `DatabaseAdapter.get_last_dates`).
+        periodicities (dict): Periodicidade de cada tabela (ver `catalog_periodicities`).
+        state (ScheduleState): Estado persistido, com as defasagens observadas.
+        now (datetime): Instante atual.
+        config (dict): Configuração do agendador (ver `scheduler_config`).
+        force (bool): Busca todas as séries, ignorando o planejamento.
+    Returns:
+        list[dict]: Um item por série, com as chaves "codigo", "serie", "periodicidade", "ultima_data",
+        "divulgacao_esperada", "buscar" (bool) e "motivo".
+    """
+    plan = []
+    for code, series_name in series_codes.items():
+        periodicity = series_periodicity(series_name, periodicities.get(series_name))
+        last_date = last_dates.get(series_name)
+        item = {"codigo": str(code), "serie": series_name, "periodicidade": periodicity, "ultima_data": last_date,
+                "divulgacao_esperada": None, "buscar": True, "motivo": ""}
+        if force:
+            item["motivo"] = "coleta completa forçada"
+        elif last_date is None:
+            item["motivo"] = "nenhum dado gravado"
+        else:
+            lag_days = release_lag_days(periodicity, state.series.get(series_name), config)
+            expected = expected_release(periodicity, last_date, config, lag_days)
+            item["divulgacao_esperada"] = expected
+            if expected <= now:
+                item["motivo"] = f"próxima observação ({periodicity}) esperada desde {expected.strftime('%d/%m/%Y %H:%M')}"
+            else:
+                item["buscar"] = False
+                item["motivo"] = f"próxima observação ({periodicity}) prevista para {expected.strftime('%d/%m/%Y %H:%M')}"
+        plan.append(item)
+    return plan
+
+def catalog_periodicities(adapter, overrides: dict | None = None) -> dict:
+    """
+    Periodicidade de cada tabela, em ordem de precedência: a informada em `agendador.periodicidades` no
+    series_config.yaml, a do perfil gravado (ver `modules.data_profiler.profile_tables`), quando a confiança
+    atinge MIN_CONFIDENCE, ou a do catálogo.
+    """
+    periodicities = {entry["nome_tabela"]: entry["periodicidade"] for entry in adapter.get_catalog() if entry.get("periodicidade")}
+    periodicities.update({
+        table_name: profile["periodicidade"] for table_name, profile in adapter.get_profiles().items()
+        if profile.get("periodicidade") in PERIODICITIES and (profile.get("confianca") or 0) >= MIN_CONFIDENCE
+    })
+    periodicities.update(overrides or {})
+    return periodicities
+
+def series_periodicity(series_name: str, catalog_periodicity: str | None = None) -> str:
+    """
+    Periodicidade usada no agendamento: a do catálogo, o sufixo do nome da tabela (ex: ipca_mensal) ou DEFAULT_PERIODICITY.
+    """
+    if catalog_periodicity in PERIODICITIES:
+        return catalog_periodicity
+    for periodicity in PERIODICITIES:
+        if series_name.endswith(periodicity):
+            return periodicity
+    return DEFAULT_PERIODICITY
+
+def _parse_datetime(value) -> datetime | None:
+    if not value:
+        return None
+    return datetime.strptime(value, STATE_DATETIME_FORMAT)
+
+class ScheduleState:
+    """
+    Estado do agendador, persistido em um arquivo JSON para sobreviver a reinícios.
+
+    Para cada série (pelo nome da tabela) guarda a última verificação, o resultado dela, o número de
+    falhas consecutivas e a próxima verificação planejada. O arquivo é regravado de forma atômica.
+
+    Exemplo de uso:
+    state = ScheduleState.load("agendador_estado.json")
+    due = state.due_series(series_codes, last_dates, periodicities, datetime.now(), config)
+    """
+
+    def __init__(self, path: str, series: dict | None = None):
+        self.path = path
+        self.series = series or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, file_name: str) -> "ScheduleState":
+        """
+        Carrega o estado salvo. Um arquivo ausente ou corrompido resulta em um estado vazio (todas as séries são verificadas).
+        """
+        path = get_base_path(file_name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(path, json.load(f).get("series") or {})
+        except FileNotFoundError:
+            return cls(path)
+        except (ValueError, AttributeError) as e:
+            print(f"AVISO: Estado do agendador inválido em {path}, iniciando um novo: {e}")
+            return cls(path)
+
+    def save(self):
+        with self._lock:
+            payload = {"atualizado_em": datetime.now().strftime(STATE_DATETIME_FORMAT), "series": self.series}
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.path)
+
+    def plan(self, series_codes: dict, last_dates: dict, periodicities: dict, now: datetime, config: dict) -> dict:
+        """
+        Recalcula a próxima verificação de todas as séries configuradas e descarta o estado de séries removidas.
+        Returns:
+            dict: {nome da tabela: próxima verificação (datetime)}.
+        """
+        with self._lock:
+            self.series = {name: entry for name, entry in self.series.items() if name in series_codes.values()}
+            schedule = {}
+            for code, series_name in series_codes.items():
+                entry = self.series.setdefault(series_name, {})
+                entry["codigo"] = str(code)
+                entry["periodicidade"] = series_periodicity(series_name, periodicities.get(series_name))
+                next_check = plan_next_check(entry["periodicidade"], last_dates.get(series_name), entry, now, config)
+                entry["proxima_verificacao"] = next_check.strftime(STATE_DATETIME_FORMAT)
+                schedule[series_name] = next_check
+            return schedule
+
+    def due_series(self, series_codes: dict, last_dates: dict, periodicities: dict, now: datetime, config: dict) -> dict:
+        """
+        Retorna o subconjunto {código: nome da tabela} de `series_codes` cuja verificação está vencida.
+        """
+        schedule = self.plan(series_codes, last_dates, periodicities, now, config)
+        return {code: series_name for code, series_name in series_codes.items() if schedule[series_name] <= now}
+
+    def record_results(self, results: list[dict], now: datetime, last_dates: dict | None = None, periodicities: dict | None = None):
+        """
+        Registra o resultado de uma rodada de coleta (ver `collect_series`) e aprende a defasagem de divulgação.
+
+        Quando uma série mensal, trimestral ou anual traz uma observação nova e a verificação anterior (sem erro) já era
+        posterior ao fim do período de referência dessa observação, a divulgação ocorreu entre as duas
+        verificações: os dias entre o fim do período e a verificação anterior são guardados como defasagem
+        observada (as últimas LAG_HISTORY_SIZE). `last_dates` deve conter as últimas datas após a gravação.
+        """
+        with self._lock:
+            for result in results:
+                series_name = result["series_name"]
+                entry = self.series.setdefault(series_name, {"codigo": result["code"]})
+                previous_check = _parse_datetime(entry.get("ultima_verificacao"))
+                new_last_date = (last_dates or {}).get(series_name)
+                periodicity = series_periodicity(series_name, (periodicities or {}).get(series_name))
+                if (result["status"] == "sucesso" and periodicity in LAGGED_PERIODICITIES and new_last_date is not None
+                        and previous_check is not None and entry.get("ultimo_status") != "erro"):
+                    period_end = reference_end(periodicity, new_last_date)
+                    if previous_check >= period_end:
+                        lags = list(entry.get("defasagens_observadas") or [])
+                        lags.append((previous_check - period_end).days)
+                        entry["defasagens_observadas"] = lags[-LAG_HISTORY_SIZE:]
+                entry["ultima_verificacao"] = now.strftime(STATE_DATETIME_FORMAT)
+                entry["ultimo_status"] = result["status"]
+                entry["falhas"] = int(entry.get("falhas") or 0) + 1 if result["status"] == "erro" else 0
+                entry["ultimo_erro"] = result.get("erro")
+
+    def next_check(self) -> datetime | None:
+        """
+        Instante da verificação mais próxima entre todas as séries.
+        """
+        with self._lock:
+            planned = [_parse_datetime(entry.get("proxima_verificacao")) for entry in self.series.values()]
+        planned = [moment for moment in planned if moment is not None]
+        return min(planned) if planned else None
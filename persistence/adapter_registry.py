@@ -0,0 +1,79 @@
+import os
+import threading
+
+from persistence.base_adapter import DatabaseAdapter
+from persistence.sqlite_adapter import SQLiteAdapter
+
+_adapters = {}
+_lock = threading.Lock()
+
+def _create_sqlite_adapter(db_config: dict) -> DatabaseAdapter:
+    return SQLiteAdapter(db_config["db_name"], db_config.get("pragmas"), db_config.get("layout"))
+
+def _create_duckdb_adapter(db_config: dict) -> DatabaseAdapter:
+    if db_config.get("layout", "tabelas") != "tabelas":
+        # O DuckDB já armazena cada tabela por coluna e não tem chave primária agrupada
+        raise ValueError(f"O layout '{db_config['layout']}' está disponível apenas para database.type: sqlite.")
+    # Importado sob demanda: o duckdb só é necessário quando selecionado na configuração
+    from persistence.duckdb_adapter import DuckDBAdapter
+    return DuckDBAdapter(db_config["db_name"], db_config.get("settings"))
+
+ADAPTER_FACTORIES = {
+    "sqlite": _create_sqlite_adapter,
+    "duckdb": _create_duckdb_adapter,
+}
+
+def register_adapter(db_type: str, factory):
+    """
+    Registra uma fábrica de adaptadores para um novo valor de `database.type`.
+
+    Args:
+        db_type (str): Tipo de banco, como informado na configuração.
+        factory (callable): Função que recebe a seção `database` e retorna um DatabaseAdapter não conectado.
+    """
+    ADAPTER_FACTORIES[db_type] = factory
+
+def get_adapter(db_config: dict) -> DatabaseAdapter:
+    """
+    Retorna o adaptador compartilhado para o banco de dados descrito em `db_config`.
+
+    Existe um único adaptador (e, portanto, um único engine com pool de conexões) por
+    caminho de banco de dados no processo. O adaptador é conectado na primeira solicitação
+    e reutilizado pelas chamadas da interface e pelas threads de coleta, sem reconexões.
+
+    Args:
+        db_config (dict): Seção `database` dos arquivos de configuração, com as chaves
+            "type" ("sqlite" ou "duckdb"), "db_name" e, opcionalmente, "pragmas" e "layout" (SQLite)
+            ou "settings" (DuckDB).
+
+    Returns:
+        DatabaseAdapter: Adaptador já conectado.
+
+    Raises:
+        ValueError: Se a configuração estiver incompleta ou o tipo de banco não for suportado.
+    """
+    db_type = db_config.get("type")
+    db_name = db_config.get("db_name")
+    if not db_type or not db_name:
+        raise ValueError("Configuração do banco de dados inválida. Verifique a seção 'database' do arquivo de configuração.")
+    factory = ADAPTER_FACTORIES.get(db_type)
+    if factory is None:
+        raise ValueError(f"Tipo de banco de dados '{db_type}' não suportado. Utilize {' ou '.join(ADAPTER_FACTORIES)}.")
+
+    key = (db_type, os.path.abspath(db_name))
+    with _lock:
+        adapter = _adapters.get(key)
+        if adapter is None:
+            adapter = factory(db_config)
+            adapter.connect()
+            _adapters[key] = adapter
+        return adapter
+
+def close_all_adapters():
+    """
+    Desconecta e descarta todos os adaptadores registrados. Chamado no encerramento da aplicação.
+    """
+    with _lock:
+        for adapter in _adapters.values():
+            adapter.disconnect()
+        _adapters.clear()
@@ -1,6 +1,19 @@
 from abc import ABC, abstractmethod
+import hashlib
+import json
 import pandas as pd
 
+# Tabelas internas e colunas comuns a todos os adaptadores: o catálogo, as marcas d'água do Focus e os
+# perfis têm o mesmo layout em qualquer banco; apenas o DDL de cada dialeto fica em cada adaptador.
+CATALOG_TABLE = "catalogo_series"
+WATERMARK_TABLE = "marcas_focus"
+PROFILE_TABLE = "perfis_series"
+DATE_COLUMNS = ("data", "Data")
+WATERMARK_COLUMNS = ["endpoint", "filtros_hash", "filtros", "tabela", "primeira_data", "ultima_data", "atualizado_em"]
+PROFILE_COLUMNS = ["nome_tabela", "periodicidade", "confianca", "dias_uteis", "total_registros", "duplicados", "primeira_data", "ultima_data",
+                   "valor_minimo", "valor_maximo", "valores_nulos", "lacunas", "lacunas_detalhe", "hash_conteudo", "atualizado_em"]
+CATALOG_COLUMNS = ["nome_tabela", "fonte", "codigo", "periodicidade", "primeira_data", "ultima_data", "total_registros", "ultima_coleta", "hash_conteudo"]
+
 class DatabaseAdapter(ABC):
     """
     Classe base abstrata para adaptadores de banco de dados.
@@ -30,16 +43,106 @@ class DatabaseAdapter(ABC):
         pass
 
     @abstractmethod
-    def save_data(self, series_name: str, data: pd.DataFrame):
+    def get_last_dates(self, series_names: list[str]) -> dict:
+        """
+        Retorna um dicionário {nome da série: última data ou None} para várias séries de uma vez.
+        """
+        pass
+
+    @abstractmethod
+    def save_data(self, series_name: str, data: pd.DataFrame, metadata: dict | None = None):
         """
         Salva os dados de uma série no banco de dados.
+        `metadata` pode informar "fonte", "codigo" e "periodicidade" para o catálogo de séries.
+        """
+        pass
+
+    @abstractmethod
+    def upsert_data(self, table_name: str, data: pd.DataFrame, key_columns: list[str], metadata: dict | None = None) -> int:
+        """
+        Grava os dados em lote, em uma única transação, usando a chave natural informada.
+        Registros cuja chave já exista na tabela são substituídos, de modo que regravações
+        do mesmo período são seguras. Retorna a quantidade de registros gravados.
+        `metadata` pode informar "fonte", "codigo" e "periodicidade" para o catálogo de séries.
+        """
+        pass
+
+    @staticmethod
+    def filters_hash(filters: dict) -> str:
+        """
+        Gera um identificador estável para uma combinação de filtros (independente da ordem das chaves).
+        """
+        normalized = json.dumps({str(k): str(v) for k, v in sorted(filters.items())}, ensure_ascii=False)
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _date_column(columns) -> str | None:
+        """
+        Coluna de data de uma tabela de série ('data' no SGS, 'Data' no Focus), ou None.
+        """
+        return next((column for column in DATE_COLUMNS if column in columns), None)
+
+    @staticmethod
+    def _periodicity_from_name(table_name: str) -> str | None:
+        """
+        Periodicidade indicada pelo sufixo do nome da tabela (_diaria, _mensal, _anual), ou None.
+        """
+        for periodicity in ("diaria", "mensal", "anual"):
+            if table_name.endswith(periodicity):
+                return periodicity
+        return None
+
+    @staticmethod
+    def _hash_batch(data: pd.DataFrame) -> str:
+        """
+        Hash do conteúdo de um lote gravado, encadeado ao `hash_conteudo` do catálogo.
+        """
+        return hashlib.sha256(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes()).hexdigest()
+
+    @abstractmethod
+    def get_watermark(self, endpoint: str, filters: dict) -> dict | None:
+        """
+        Retorna a marca d'água da coleta incremental de um endpoint do Focus para a combinação
+        de filtros informada: {"tabela", "primeira_data", "ultima_data", "atualizado_em"}, ou None.
+        """
+        pass
+
+    @abstractmethod
+    def set_watermark(self, endpoint: str, filters: dict, table_name: str, first_date, last_date):
+        """
+        Registra a cobertura contínua (primeira e última Data já gravadas) de um endpoint do Focus
+        para a combinação de filtros informada.
+        """
+        pass
+
+    @abstractmethod
+    def save_profiles(self, profiles: dict):
+        """
+        Grava, em uma única transação, os perfis de séries calculados por `profile_series`
+        ({nome da tabela: perfil}), substituindo os perfis anteriores das mesmas tabelas.
+        """
+        pass
+
+    @abstractmethod
+    def get_profiles(self, table_names: list[str] | None = None) -> dict:
+        """
+        Retorna os perfis gravados ({nome da tabela: perfil}) das tabelas informadas, ou de todas.
+        Cada perfil inclui "hash_conteudo" (o hash do catálogo no momento do cálculo) e "atualizado_em".
+        """
+        pass
+
+    @abstractmethod
+    def get_catalog(self) -> list[dict]:
+        """
+        Retorna o catálogo de séries: uma entrada por tabela de dados, com fonte, código,
+        periodicidade, primeira e última data, total de registros, última coleta e hash do conteúdo.
         """
         pass
 
     @abstractmethod
     def get_table_names(self) -> list[str]:
         """
-        Retorna uma lista com os nomes das tabelas no banco de dados.
+        Retorna uma lista com os nomes das tabelas de dados no banco de dados.
         """
         pass
 
@@ -50,3 +153,20 @@ class DatabaseAdapter(ABC):
         Se a tabela não existir, deve retornar um DataFrame vazio.
         """
         pass
+
+    @abstractmethod
+    def fetch_table_page(self, table_name: str, columns: list[str] | None = None, start_date: str | None = None,
+                         end_date: str | None = None, page_size: int = 1000, cursor: str | None = None) -> tuple[pd.DataFrame, str | None]:
+        """
+        Retorna uma página de dados da tabela e o cursor da próxima página (None na última).
+        O filtro por intervalo de datas e a projeção de colunas devem ser executados no banco.
+        """
+        pass
+
+    @abstractmethod
+    def iter_table_chunks(self, table_name: str, columns: list[str] | None = None, start_date: str | None = None,
+                          end_date: str | None = None, chunk_size: int = 50000):
+        """
+        Gera os dados da tabela em blocos de DataFrames, em ordem cronológica.
+        """
+        pass
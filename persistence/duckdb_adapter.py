@@ -0,0 +1,430 @@
+from persistence.base_adapter import (
+    CATALOG_COLUMNS, CATALOG_TABLE, PROFILE_COLUMNS, PROFILE_TABLE, WATERMARK_COLUMNS, WATERMARK_TABLE, DatabaseAdapter,
+)
+from contextlib import contextmanager
+from datetime import datetime
+import threading
+import hashlib
+import json
+import pandas as pd
+
+DUCKDB_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+DEFAULT_PAGE_SIZE = 1000
+INTERNAL_TABLES = {CATALOG_TABLE, WATERMARK_TABLE, PROFILE_TABLE}
+
+DEFAULT_SETTINGS = {
+    "threads": 4,
+    "preserve_insertion_order": "false",
+}
+
+class DuckDBAdapter(DatabaseAdapter):
+    """
+    Adaptador de banco de dados analítico, baseado no DuckDB (armazenamento colunar embarcado).
+
+    Indicado para leituras completas e agregações sobre muitas séries ou históricos inteiros do
+    Boletim Focus: as tabelas são armazenadas por coluna e compactadas, e as consultas são
+    executadas de forma vetorizada e paralela. As datas são gravadas como TIMESTAMP nativo e
+    as leituras devolvem colunas datetime64.
+
+    O adaptador mantém a mesma tabela `catalogo_series` do SQLiteAdapter, com as mesmas colunas,
+    de modo que coletores e interface funcionam sem alterações com qualquer um dos dois.
+
+    A biblioteca `duckdb` é importada apenas em `connect()`; ela só é necessária quando
+    `database.type` for "duckdb".
+
+    Atributos:
+        db_path (str): Caminho para o arquivo do banco de dados DuckDB.
+        settings (dict): Configurações (SET) aplicadas à conexão, como "threads" e "memory_limit".
+        connection (duckdb.DuckDBPyConnection | None): Conexão principal; cada operação usa um cursor próprio.
+    """
+    def __init__(self, db_path: str, settings: dict | None = None):
+        self.db_path = db_path
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.settings.update(settings or {})
+        self.connection = None
+        self._write_lock = threading.Lock()
+
+    def connect(self):
+        if self.connection:
+            return
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("O pacote 'duckdb' é necessário para database.type: duckdb. Instale-o com 'pip install duckdb'.") from e
+
+        self.connection = duckdb.connect(self.db_path)
+        for name, value in self.settings.items():
+            self.connection.execute(f"SET {name} = '{value}'")
+        self._bootstrap_catalog()
+        print(f"Conectado ao banco de dados DuckDB: {self.db_path}")
+
+    def disconnect(self):
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+            print("Conexão DuckDB desconectada.")
+
+    @contextmanager
+    def _cursor(self):
+        """
+        Abre um cursor (conexão duplicada) para uso na thread atual; a conexão principal
+        não pode ser compartilhada entre threads simultaneamente.
+        """
+        if not self.connection:
+            raise ConnectionError("Conexão com o banco de dados não estabelecida.")
+        cursor = self.connection.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Executa uma gravação em transação única. As gravações são serializadas para evitar
+        conflitos de concorrência otimista do DuckDB entre threads de coleta.
+        """
+        with self._write_lock, self._cursor() as cursor:
+            cursor.execute("BEGIN TRANSACTION")
+            try:
+                yield cursor
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def _bootstrap_catalog(self):
+        """
+        Cria a tabela de catálogo e registra tabelas de dados já existentes que ainda não constam nele.
+        """
+        with self._transaction() as cursor:
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {CATALOG_TABLE} (
+                    nome_tabela VARCHAR PRIMARY KEY,
+                    fonte VARCHAR,
+                    codigo VARCHAR,
+                    periodicidade VARCHAR,
+                    primeira_data VARCHAR,
+                    ultima_data VARCHAR,
+                    total_registros BIGINT NOT NULL DEFAULT 0,
+                    ultima_coleta VARCHAR,
+                    hash_conteudo VARCHAR
+                )
+                """
+            )
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+                    endpoint VARCHAR NOT NULL,
+                    filtros_hash VARCHAR NOT NULL,
+                    filtros VARCHAR,
+                    tabela VARCHAR,
+                    primeira_data VARCHAR,
+                    ultima_data VARCHAR,
+                    atualizado_em VARCHAR,
+                    PRIMARY KEY (endpoint, filtros_hash)
+                )
+                """
+            )
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {PROFILE_TABLE} (
+                    nome_tabela VARCHAR PRIMARY KEY,
+                    periodicidade VARCHAR,
+                    confianca DOUBLE,
+                    dias_uteis BIGINT,
+                    total_registros BIGINT,
+                    duplicados BIGINT,
+                    primeira_data VARCHAR,
+                    ultima_data VARCHAR,
+                    valor_minimo DOUBLE,
+                    valor_maximo DOUBLE,
+                    valores_nulos BIGINT,
+                    lacunas BIGINT,
+                    lacunas_detalhe VARCHAR,
+                    hash_conteudo VARCHAR,
+                    atualizado_em VARCHAR
+                )
+                """
+            )
+            registered = {row[0] for row in cursor.execute(f"SELECT nome_tabela FROM {CATALOG_TABLE}").fetchall()}
+            tables = [
+                row[0] for row in cursor.execute("SELECT table_name FROM duckdb_tables() WHERE database_name = current_database()").fetchall()
+                if row[0] not in registered and row[0] not in INTERNAL_TABLES
+            ]
+            for table_name in tables:
+                fonte = "focus" if table_name.startswith("focus_") else "sgs"
+                self._refresh_catalog(cursor, table_name, self._date_column(self._table_columns(cursor, table_name)), {"fonte": fonte}, None)
+
+    @staticmethod
+    def _table_columns(cursor, table_name: str) -> list[str]:
+        return [row[0] for row in cursor.execute(
+            "SELECT column_name FROM duckdb_columns() WHERE database_name = current_database() AND table_name = ? ORDER BY column_index",
+            [table_name],
+        ).fetchall()]
+
+    @staticmethod
+    def _format_date(value) -> str | None:
+        return pd.Timestamp(value).strftime(DUCKDB_DATETIME_FORMAT) if value is not None and not pd.isna(value) else None
+
+    def _refresh_catalog(self, cursor, table_name: str, date_column: str | None, metadata: dict | None, batch_hash: str | None):
+        """
+        Atualiza a entrada da tabela no catálogo após uma gravação. As datas são registradas no
+        mesmo formato texto usado pelo SQLiteAdapter.
+        """
+        if date_column:
+            first_date, last_date, row_count = cursor.execute(
+                f'SELECT MIN("{date_column}"), MAX("{date_column}"), COUNT(*) FROM "{table_name}"'
+            ).fetchone()
+        else:
+            first_date = last_date = None
+            row_count = cursor.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+
+        previous = cursor.execute(
+            f"SELECT fonte, codigo, periodicidade, hash_conteudo FROM {CATALOG_TABLE} WHERE nome_tabela = ?", [table_name]
+        ).fetchone()
+        metadata = metadata or {}
+        fonte = metadata.get("fonte") or (previous[0] if previous else None)
+        codigo = metadata.get("codigo") or (previous[1] if previous else None)
+        periodicidade = metadata.get("periodicidade") or (previous[2] if previous else None) or self._periodicity_from_name(table_name)
+        content_hash = previous[3] if previous else None
+        if batch_hash:
+            content_hash = hashlib.sha256(f"{content_hash or ''}{batch_hash}".encode("utf-8")).hexdigest()
+
+        cursor.execute(
+            f"INSERT OR REPLACE INTO {CATALOG_TABLE} ({', '.join(CATALOG_COLUMNS)}) VALUES ({', '.join('?' for _ in CATALOG_COLUMNS)})",
+            [table_name, fonte, str(codigo) if codigo is not None else None, periodicidade,
+             self._format_date(first_date), self._format_date(last_date), row_count,
+             datetime.now().strftime(DUCKDB_DATETIME_FORMAT), content_hash],
+        )
+
+    def get_last_date(self, series_name: str) -> pd.Timestamp | None:
+        return self.get_last_dates([series_name]).get(series_name)
+
+    def get_last_dates(self, series_names: list[str]) -> dict:
+        if not series_names:
+            return {}
+        placeholders = ", ".join("?" for _ in series_names)
+        with self._cursor() as cursor:
+            rows = cursor.execute(
+                f"SELECT nome_tabela, ultima_data FROM {CATALOG_TABLE} WHERE nome_tabela IN ({placeholders})", list(series_names)
+            ).fetchall()
+        last_dates = {name: None for name in series_names}
+        for name, last_date in rows:
+            last_dates[name] = pd.to_datetime(last_date) if last_date else None
+        return last_dates
+
+    @staticmethod
+    def _duckdb_type(series: pd.Series) -> str:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return "TIMESTAMP"
+        if pd.api.types.is_bool_dtype(series):
+            return "BOOLEAN"
+        if pd.api.types.is_integer_dtype(series):
+            return "BIGINT"
+        if pd.api.types.is_float_dtype(series):
+            return "DOUBLE"
+        return "VARCHAR"
+
+    def _ensure_table(self, cursor, table_name: str, data: pd.DataFrame):
+        """
+        Cria a tabela com tipos derivados do DataFrame (colunas de texto inteiramente nulas, como
+        IndicadorDetalhe, continuam VARCHAR) ou acrescenta colunas novas a uma tabela existente.
+        """
+        exists = cursor.execute(
+            "SELECT 1 FROM duckdb_tables() WHERE database_name = current_database() AND table_name = ?", [table_name]
+        ).fetchone()
+        if not exists:
+            column_defs = ", ".join(f'"{column}" {self._duckdb_type(data[column])}' for column in data.columns)
+            cursor.execute(f'CREATE TABLE "{table_name}" ({column_defs})')
+            return
+        existing_columns = set(self._table_columns(cursor, table_name))
+        for column in data.columns:
+            if column not in existing_columns:
+                cursor.execute(f'ALTER TABLE "{table_name}" ADD COLUMN "{column}" {self._duckdb_type(data[column])}')
+
+    def save_data(self, series_name: str, data: pd.DataFrame, metadata: dict | None = None):
+        if not self.connection:
+            raise ConnectionError("Conexão com o banco de dados não estabelecida.")
+
+        if data.empty:
+            print(f"Nenhum dado para salvar para a série {series_name}.")
+            return
+
+        try:
+            with self._transaction() as cursor:
+                cursor.register("_lote", data)
+                self._ensure_table(cursor, series_name, data)
+                cursor.execute(f'INSERT INTO "{series_name}" BY NAME SELECT * FROM _lote')
+                cursor.unregister("_lote")
+                self._refresh_catalog(cursor, series_name, self._date_column(data.columns), metadata, self._hash_batch(data))
+            print(f"Dados da série {series_name} salvos com sucesso.")
+        except Exception as e:
+            print(f"Erro ao salvar dados da série {series_name}: {e}")
+
+    def upsert_data(self, table_name: str, data: pd.DataFrame, key_columns: list[str], metadata: dict | None = None) -> int:
+        if not self.connection:
+            raise ConnectionError("Conexão com o banco de dados não estabelecida.")
+
+        if data.empty:
+            print(f"Nenhum dado para salvar para a série {table_name}.")
+            return 0
+
+        missing_keys = [column for column in key_columns if column not in data.columns]
+        if not key_columns or missing_keys:
+            raise ValueError(f"Chave natural inválida para a tabela {table_name}: colunas ausentes {missing_keys or key_columns}.")
+
+        # Dentro do lote prevalece o último registro de cada chave, como no INSERT OR REPLACE do SQLite
+        data = data.drop_duplicates(subset=key_columns, keep="last")
+        # Valores nulos na chave (ex: IndicadorDetalhe) devem colidir entre si
+        key_match = " AND ".join(f'"{table_name}"."{column}" IS NOT DISTINCT FROM _lote."{column}"' for column in key_columns)
+
+        with self._transaction() as cursor:
+            cursor.register("_lote", data)
+            self._ensure_table(cursor, table_name, data)
+            cursor.execute(f'DELETE FROM "{table_name}" WHERE EXISTS (SELECT 1 FROM _lote WHERE {key_match})')
+            cursor.execute(f'INSERT INTO "{table_name}" BY NAME SELECT * FROM _lote')
+            cursor.unregister("_lote")
+            self._refresh_catalog(cursor, table_name, self._date_column(data.columns), metadata, self._hash_batch(data))
+
+        print(f"{len(data)} registros gravados na tabela {table_name}.")
+        return len(data)
+
+    def get_watermark(self, endpoint: str, filters: dict) -> dict | None:
+        with self._cursor() as cursor:
+            row = cursor.execute(
+                f"SELECT tabela, primeira_data, ultima_data, atualizado_em FROM {WATERMARK_TABLE} WHERE endpoint = ? AND filtros_hash = ?",
+                [endpoint, self.filters_hash(filters)],
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "tabela": row[0],
+            "primeira_data": pd.to_datetime(row[1]) if row[1] else None,
+            "ultima_data": pd.to_datetime(row[2]) if row[2] else None,
+            "atualizado_em": row[3],
+        }
+
+    def set_watermark(self, endpoint: str, filters: dict, table_name: str, first_date, last_date):
+        with self._transaction() as cursor:
+            cursor.execute(
+                f"INSERT OR REPLACE INTO {WATERMARK_TABLE} ({', '.join(WATERMARK_COLUMNS)}) VALUES ({', '.join('?' for _ in WATERMARK_COLUMNS)})",
+                [endpoint, self.filters_hash(filters), json.dumps(filters, ensure_ascii=False, sort_keys=True, default=str), table_name,
+                 self._format_date(first_date), self._format_date(last_date), datetime.now().strftime(DUCKDB_DATETIME_FORMAT)],
+            )
+
+    def save_profiles(self, profiles: dict):
+        updated_at = datetime.now().strftime(DUCKDB_DATETIME_FORMAT)
+        rows = [
+            [table_name, profile["periodicidade"], profile["confianca"], int(bool(profile["dias_uteis"])), profile["total_registros"],
+             profile["duplicados"], profile["primeira_data"], profile["ultima_data"], profile["valor_minimo"], profile["valor_maximo"],
+             profile["valores_nulos"], profile["lacunas"], json.dumps(profile["lacunas_detalhe"]), profile.get("hash_conteudo"), updated_at]
+            for table_name, profile in profiles.items()
+        ]
+        with self._transaction() as cursor:
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO {PROFILE_TABLE} ({', '.join(PROFILE_COLUMNS)}) VALUES ({', '.join('?' for _ in PROFILE_COLUMNS)})", rows
+            )
+
+    def get_profiles(self, table_names: list[str] | None = None) -> dict:
+        query = f"SELECT {', '.join(PROFILE_COLUMNS)} FROM {PROFILE_TABLE}"
+        params = []
+        if table_names is not None:
+            if not table_names:
+                return {}
+            query += f" WHERE nome_tabela IN ({', '.join('?' for _ in table_names)})"
+            params = list(table_names)
+        with self._cursor() as cursor:
+            rows = cursor.execute(query, params).fetchall()
+        profiles = {}
+        for row in rows:
+            profile = dict(zip(PROFILE_COLUMNS[1:], row[1:]))
+            profile["dias_uteis"] = bool(profile["dias_uteis"])
+            profile["lacunas_detalhe"] = json.loads(profile["lacunas_detalhe"] or "[]")
+            profiles[row[0]] = profile
+        return profiles
+
+    def get_catalog(self) -> list[dict]:
+        with self._cursor() as cursor:
+            rows = cursor.execute(f"SELECT {', '.join(CATALOG_COLUMNS)} FROM {CATALOG_TABLE} ORDER BY nome_tabela").fetchall()
+        return [dict(zip(CATALOG_COLUMNS, row)) for row in rows]
+
+    def get_table_names(self) -> list[str]:
+        with self._cursor() as cursor:
+            return [row[0] for row in cursor.execute(f"SELECT nome_tabela FROM {CATALOG_TABLE} ORDER BY nome_tabela").fetchall()]
+
+    def _validate_table(self, cursor, table_name: str) -> list[str]:
+        """
+        Garante que a tabela está registrada no catálogo e retorna suas colunas.
+        Evita que nomes arbitrários sejam interpolados nas consultas SQL.
+        """
+        registered = cursor.execute(f"SELECT 1 FROM {CATALOG_TABLE} WHERE nome_tabela = ?", [table_name]).fetchone()
+        if not registered:
+            raise ValueError(f"Tabela '{table_name}' não encontrada no catálogo de séries.")
+        return self._table_columns(cursor, table_name)
+
+    def fetch_full_table_data(self, table_name: str) -> pd.DataFrame:
+        with self._cursor() as cursor:
+            try:
+                table_columns = self._validate_table(cursor, table_name)
+            except ValueError:
+                return pd.DataFrame()
+            date_column = self._date_column(table_columns)
+            order_by = f' ORDER BY "{date_column}"' if date_column else ""
+            return cursor.execute(f'SELECT * FROM "{table_name}"{order_by}').fetchdf()
+
+    def fetch_table_page(self, table_name: str, columns: list[str] | None = None, start_date: str | None = None,
+                         end_date: str | None = None, page_size: int = DEFAULT_PAGE_SIZE, cursor: str | None = None) -> tuple[pd.DataFrame, str | None]:
+        page_size = max(1, int(page_size))
+        with self._cursor() as db_cursor:
+            table_columns = self._validate_table(db_cursor, table_name)
+            selected = list(columns) if columns else table_columns
+            unknown = [column for column in selected if column not in table_columns]
+            if unknown:
+                raise ValueError(f"Colunas inexistentes na tabela '{table_name}': {unknown}")
+
+            date_column = self._date_column(table_columns)
+            conditions = []
+            params = []
+            if date_column and start_date:
+                conditions.append(f'"{date_column}" >= ?')
+                params.append(pd.Timestamp(start_date).to_pydatetime())
+            if date_column and end_date:
+                conditions.append(f'"{date_column}" < ?')
+                params.append((pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)).to_pydatetime())
+            if cursor:
+                last_date, last_rowid = json.loads(cursor)
+                if date_column:
+                    last_date = pd.Timestamp(last_date).to_pydatetime()
+                    conditions.append(f'("{date_column}" > ? OR ("{date_column}" = ? AND rowid > ?))')
+                    params.extend([last_date, last_date, last_rowid])
+                else:
+                    conditions.append("rowid > ?")
+                    params.append(last_rowid)
+
+            order_by = f'"{date_column}", rowid' if date_column else "rowid"
+            key_columns = f'"{date_column}" AS __cursor_data, rowid AS __cursor_rowid' if date_column else "NULL AS __cursor_data, rowid AS __cursor_rowid"
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            column_list = ", ".join(f'"{column}"' for column in selected)
+            query = f'SELECT {column_list}, {key_columns} FROM "{table_name}" {where} ORDER BY {order_by} LIMIT ?'
+            df = db_cursor.execute(query, params + [page_size + 1]).fetchdf()
+
+        has_more = len(df) > page_size
+        df = df.iloc[:page_size]
+        next_cursor = None
+        if has_more and not df.empty:
+            last_row = df.iloc[-1]
+            next_cursor = json.dumps([self._format_date(last_row["__cursor_data"]), int(last_row["__cursor_rowid"])])
+        df = df.drop(columns=["__cursor_data", "__cursor_rowid"]).reset_index(drop=True)
+        return df, next_cursor
+
+    def iter_table_chunks(self, table_name: str, columns: list[str] | None = None, start_date: str | None = None,
+                          end_date: str | None = None, chunk_size: int = 50000):
+        cursor = None
+        while True:
+            chunk, cursor = self.fetch_table_page(table_name, columns, start_date, end_date, chunk_size, cursor)
+            if not chunk.empty:
+                yield chunk
+            if cursor is None:
+                break
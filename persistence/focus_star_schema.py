@@ -0,0 +1,301 @@
+import json
+import numpy as np
+import pandas as pd
+
+FACT_TABLE = "fato_expectativas"
+TABLE_DIMENSION = "dimensao_focus_tabelas"
+ENDPOINT_DIMENSION = "dimensao_focus_endpoints"
+INDICATOR_DIMENSION = "dimensao_focus_indicadores"
+DETAIL_DIMENSION = "dimensao_focus_detalhes"
+REFERENCE_DIMENSION = "dimensao_focus_referencias"
+WIDE_VIEW = "expectativas_focus"
+STAR_TABLES = {FACT_TABLE, TABLE_DIMENSION, ENDPOINT_DIMENSION, INDICATOR_DIMENSION, DETAIL_DIMENSION, REFERENCE_DIMENSION, WIDE_VIEW}
+
+# Coluna da API (tabela larga) -> coluna da tabela fato. Os endpoints usam nomes diferentes para o mesmo papel
+# (ex: DataReferencia e Reuniao são o período de referência; o Top5Selic usa nomes em minúsculas).
+FACT_COLUMN_BY_FIELD = {
+    "Indicador": "indicador_id", "indicador": "indicador_id",
+    "IndicadorDetalhe": "detalhe_id",
+    "DataReferencia": "referencia_id", "Reuniao": "referencia_id", "reuniao": "referencia_id",
+    "Data": "data",
+    "baseCalculo": "base_calculo",
+    "tipoCalculo": "tipo_calculo",
+    "Suavizada": "suavizada",
+    "Media": "media", "media": "media",
+    "Mediana": "mediana", "mediana": "mediana",
+    "DesvioPadrao": "desvio_padrao", "desvioPadrao": "desvio_padrao",
+    "coeficienteVariacao": "coeficiente_variacao",
+    "Minimo": "minimo", "minimo": "minimo",
+    "Maximo": "maximo", "maximo": "maximo",
+    "numeroRespondentes": "respondentes",
+}
+DIMENSION_BY_FACT_COLUMN = {
+    "indicador_id": INDICATOR_DIMENSION,
+    "detalhe_id": DETAIL_DIMENSION,
+    "referencia_id": REFERENCE_DIMENSION,
+}
+# Colunas da chave primária da tabela fato, na ordem do índice agrupado. Valores ausentes são gravados
+# como 0 (dimensões), -1 (baseCalculo) ou '' (textos curtos), pois a chave não aceita NULL.
+KEY_COLUMNS = ["tabela_id", "data", "indicador_id", "detalhe_id", "referencia_id", "base_calculo", "tipo_calculo", "suavizada"]
+STAT_COLUMNS = ["media", "mediana", "desvio_padrao", "coeficiente_variacao", "minimo", "maximo", "respondentes"]
+# Expressão SQL que devolve cada coluna da fato no formato da tabela larga, e o nome usado na view
+SELECT_EXPRESSIONS = {
+    "indicador_id": ("i.valor", "Indicador"),
+    "detalhe_id": ("dt.valor", "IndicadorDetalhe"),
+    "referencia_id": ("r.valor", "DataReferencia"),
+    "data": ("date(f.data * 86400, 'unixepoch')", "Data"),
+    "base_calculo": ("NULLIF(f.base_calculo, -1)", "baseCalculo"),
+    "tipo_calculo": ("NULLIF(f.tipo_calculo, '')", "tipoCalculo"),
+    "suavizada": ("NULLIF(f.suavizada, '')", "Suavizada"),
+    "media": ("f.media", "Media"),
+    "mediana": ("f.mediana", "Mediana"),
+    "desvio_padrao": ("f.desvio_padrao", "DesvioPadrao"),
+    "coeficiente_variacao": ("f.coeficiente_variacao", "coeficienteVariacao"),
+    "minimo": ("f.minimo", "Minimo"),
+    "maximo": ("f.maximo", "Maximo"),
+    "respondentes": ("f.respondentes", "numeroRespondentes"),
+}
+FACT_FROM = f"""
+    {FACT_TABLE} f
+    LEFT JOIN {INDICATOR_DIMENSION} i ON i.id = f.indicador_id
+    LEFT JOIN {DETAIL_DIMENSION} dt ON dt.id = f.detalhe_id
+    LEFT JOIN {REFERENCE_DIMENSION} r ON r.id = f.referencia_id
+"""
+
+def create_star_schema(connection):
+    """
+    Cria as dimensões, a tabela fato (WITHOUT ROWID, agrupada por tabela e Data) e a view larga `expectativas_focus`.
+    """
+    for dimension in (ENDPOINT_DIMENSION, INDICATOR_DIMENSION, DETAIL_DIMENSION, REFERENCE_DIMENSION):
+        connection.exec_driver_sql(f"CREATE TABLE IF NOT EXISTS {dimension} (id INTEGER PRIMARY KEY, valor TEXT NOT NULL UNIQUE)")
+    connection.exec_driver_sql(
+        f"""
+        CREATE TABLE IF NOT EXISTS {TABLE_DIMENSION} (
+            tabela_id INTEGER PRIMARY KEY,
+            nome_tabela TEXT NOT NULL UNIQUE,
+            endpoint_id INTEGER REFERENCES {ENDPOINT_DIMENSION} (id),
+            colunas TEXT NOT NULL
+        )
+        """
+    )
+    connection.exec_driver_sql(
+        f"""
+        CREATE TABLE IF NOT EXISTS {FACT_TABLE} (
+            tabela_id INTEGER NOT NULL,
+            data INTEGER NOT NULL,
+            indicador_id INTEGER NOT NULL,
+            detalhe_id INTEGER NOT NULL,
+            referencia_id INTEGER NOT NULL,
+            base_calculo INTEGER NOT NULL,
+            tipo_calculo TEXT NOT NULL,
+            suavizada TEXT NOT NULL,
+            media REAL,
+            mediana REAL,
+            desvio_padrao REAL,
+            coeficiente_variacao REAL,
+            minimo REAL,
+            maximo REAL,
+            respondentes INTEGER,
+            PRIMARY KEY ({', '.join(KEY_COLUMNS)})
+        ) WITHOUT ROWID
+        """
+    )
+    view_columns = ", ".join(f"{expression} AS {name}" for expression, name in SELECT_EXPRESSIONS.values())
+    connection.exec_driver_sql(
+        f"""
+        CREATE VIEW IF NOT EXISTS {WIDE_VIEW} AS
+        SELECT t.nome_tabela, e.valor AS endpoint, {view_columns}
+        FROM {FACT_FROM}
+        JOIN {TABLE_DIMENSION} t ON t.tabela_id = f.tabela_id
+        LEFT JOIN {ENDPOINT_DIMENSION} e ON e.id = t.endpoint_id
+        """
+    )
+
+def fact_columns(columns) -> dict | None:
+    """
+    Retorna {coluna larga: coluna da fato} se todas as colunas tiverem lugar na tabela fato
+    (cada papel no máximo uma vez, com Data e indicador), ou None se a tabela precisar continuar larga.
+    """
+    mapping = {column: FACT_COLUMN_BY_FIELD.get(column) for column in columns}
+    targets = list(mapping.values())
+    if None in targets or len(set(targets)) != len(targets) or "data" not in targets or "indicador_id" not in targets:
+        return None
+    return mapping
+
+def _column_kind(series: pd.Series) -> str:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "data"
+    if pd.api.types.is_integer_dtype(series):
+        return "inteiro"
+    if pd.api.types.is_float_dtype(series):
+        return "real"
+    return "texto"
+
+def table_id(connection, table_name: str) -> int | None:
+    return connection.exec_driver_sql(f"SELECT tabela_id FROM {TABLE_DIMENSION} WHERE nome_tabela = ?", (table_name,)).scalar()
+
+def has_tables(connection) -> bool:
+    return bool(connection.exec_driver_sql(f"SELECT 1 FROM {TABLE_DIMENSION} LIMIT 1").scalar())
+
+def table_columns(connection, tabela_id: int) -> list[list[str]]:
+    """
+    Colunas da tabela larga original, na ordem original, como pares [nome, tipo].
+    """
+    return json.loads(connection.exec_driver_sql(f"SELECT colunas FROM {TABLE_DIMENSION} WHERE tabela_id = ?", (tabela_id,)).scalar())
+
+def _dimension_ids(connection, dimension: str, values) -> dict:
+    values = sorted({str(value) for value in values if value is not None and not pd.isna(value)})
+    if not values:
+        return {}
+    connection.exec_driver_sql(f"INSERT OR IGNORE INTO {dimension} (valor) VALUES (?)", [(value,) for value in values])
+    ids = {}
+    # Lotes abaixo do limite de parâmetros do SQLite
+    for offset in range(0, len(values), 500):
+        batch = values[offset:offset + 500]
+        rows = connection.exec_driver_sql(
+            f"SELECT valor, id FROM {dimension} WHERE valor IN ({', '.join('?' for _ in batch)})", tuple(batch)
+        ).all()
+        ids.update(dict(rows))
+    return ids
+
+def register_table(connection, table_name: str, endpoint: str | None, data: pd.DataFrame) -> int:
+    """
+    Registra a tabela lógica (ou acrescenta colunas novas a ela) e retorna o seu tabela_id.
+    """
+    current_id = table_id(connection, table_name)
+    if current_id is not None:
+        columns = table_columns(connection, current_id)
+        known = {name for name, _ in columns}
+        added = [[column, _column_kind(data[column])] for column in data.columns if column not in known]
+        if added:
+            connection.exec_driver_sql(f"UPDATE {TABLE_DIMENSION} SET colunas = ? WHERE tabela_id = ?",
+                                       (json.dumps(columns + added, ensure_ascii=False), current_id))
+        return current_id
+
+    endpoint_id = _dimension_ids(connection, ENDPOINT_DIMENSION, [endpoint]).get(endpoint) if endpoint else None
+    columns = [[column, _column_kind(data[column])] for column in data.columns]
+    connection.exec_driver_sql(
+        f"INSERT INTO {TABLE_DIMENSION} (nome_tabela, endpoint_id, colunas) VALUES (?, ?, ?)",
+        (table_name, endpoint_id, json.dumps(columns, ensure_ascii=False)),
+    )
+    return table_id(connection, table_name)
+
+def write_facts(connection, tabela_id: int, data: pd.DataFrame, batch_size: int) -> int:
+    """
+    Converte as colunas largas em chaves inteiras (dimensões e dias desde 1970-01-01) e grava as
+    expectativas com INSERT OR REPLACE sobre a chave da tabela fato.
+    """
+    mapping = fact_columns(data.columns)
+    size = len(data)
+    fact = {"tabela_id": np.full(size, tabela_id, dtype=np.int64)}
+    for column, target in mapping.items():
+        values = data[column]
+        if target in DIMENSION_BY_FACT_COLUMN:
+            ids = _dimension_ids(connection, DIMENSION_BY_FACT_COLUMN[target], values.unique())
+            fact[target] = values.map(lambda value: ids.get(str(value), 0) if value is not None and not pd.isna(value) else 0).to_numpy(dtype=np.int64)
+        elif target == "data":
+            fact[target] = pd.to_datetime(values).to_numpy(dtype="datetime64[D]").astype(np.int64)
+        elif target == "base_calculo":
+            fact[target] = pd.to_numeric(values, errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+        elif target in ("tipo_calculo", "suavizada"):
+            fact[target] = values.map(lambda value: "" if value is None or pd.isna(value) else str(value)).to_numpy(dtype=object)
+        else:
+            fact[target] = pd.to_numeric(values, errors="coerce").to_numpy()
+    for column in ("indicador_id", "detalhe_id", "referencia_id"):
+        fact.setdefault(column, np.zeros(size, dtype=np.int64))
+    fact.setdefault("base_calculo", np.full(size, -1, dtype=np.int64))
+    for column in ("tipo_calculo", "suavizada"):
+        fact.setdefault(column, np.full(size, "", dtype=object))
+
+    columns = KEY_COLUMNS + [column for column in STAT_COLUMNS if column in fact]
+    frame = pd.DataFrame({column: fact[column] for column in columns})
+    rows = list(frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None))
+    insert_sql = f"INSERT OR REPLACE INTO {FACT_TABLE} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+    for offset in range(0, len(rows), batch_size):
+        connection.exec_driver_sql(insert_sql, rows[offset:offset + batch_size])
+    return len(rows)
+
+def date_kind(connection, tabela_id: int) -> str:
+    """
+    Tipo original da coluna Data: "data" (datetime, gravada como texto com hora) ou "texto" ('aaaa-mm-dd').
+    """
+    return next((kind for name, kind in table_columns(connection, tabela_id) if FACT_COLUMN_BY_FIELD.get(name) == "data"), "texto")
+
+def fact_stats(connection, tabela_id: int) -> tuple:
+    """
+    Primeira e última Data (dias desde 1970-01-01) e total de registros da tabela lógica.
+    """
+    return connection.exec_driver_sql(
+        f"SELECT MIN(data), MAX(data), COUNT(*) FROM {FACT_TABLE} WHERE tabela_id = ?", (tabela_id,)
+    ).one()
+
+def _dimension_values(connection, dimension: str, ids) -> dict:
+    ids = sorted({int(value) for value in ids if value})
+    values = {}
+    for offset in range(0, len(ids), 500):
+        batch = ids[offset:offset + 500]
+        rows = connection.exec_driver_sql(
+            f"SELECT id, valor FROM {dimension} WHERE id IN ({', '.join('?' for _ in batch)})", tuple(batch)
+        ).all()
+        values.update(dict(rows))
+    return values
+
+def read_facts(connection, tabela_id: int, selected: list[str] | None = None, start_day: int | None = None, end_day: int | None = None,
+               limit: int | None = None, cursor: str | None = None) -> tuple[pd.DataFrame, str | None]:
+    """
+    Lê as expectativas de uma tabela lógica no formato largo original (mesmas colunas e tipos), em ordem
+    de Data. O filtro de datas e o cursor usam a chave agrupada (tabela_id, data, ...); as dimensões e as
+    datas são decodificadas em lote no pandas, sem joins.
+    """
+    columns = table_columns(connection, tabela_id)
+    kinds = dict((name, kind) for name, kind in columns)
+    selected = list(selected) if selected else [name for name, _ in columns]
+    key_columns = KEY_COLUMNS[1:]
+    stat_columns = [FACT_COLUMN_BY_FIELD[column] for column in selected if FACT_COLUMN_BY_FIELD[column] in STAT_COLUMNS]
+    conditions = ["tabela_id = ?"]
+    params = [tabela_id]
+    if start_day is not None:
+        conditions.append("data >= ?")
+        params.append(start_day)
+    if end_day is not None:
+        conditions.append("data <= ?")
+        params.append(end_day)
+    key_list = ", ".join(key_columns)
+    if cursor:
+        conditions.append(f"({key_list}) > ({', '.join('?' for _ in key_columns)})")
+        params.extend(json.loads(cursor))
+    query = f"SELECT {', '.join(key_columns + stat_columns)} FROM {FACT_TABLE} WHERE {' AND '.join(conditions)} ORDER BY {key_list}"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit + 1)
+    rows = connection.exec_driver_sql(query, tuple(params)).all()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = json.dumps(list(rows[-1][:len(key_columns)]))
+    fact = dict(zip(key_columns + stat_columns, zip(*rows))) if rows else {column: () for column in key_columns + stat_columns}
+
+    decoded = {}
+    for column in selected:
+        target = FACT_COLUMN_BY_FIELD[column]
+        values = fact[target]
+        if target in DIMENSION_BY_FACT_COLUMN:
+            names = _dimension_values(connection, DIMENSION_BY_FACT_COLUMN[target], set(values))
+            decoded[column] = [names.get(value) for value in values]
+        elif target == "data":
+            # Datas únicas decodificadas uma vez; colunas datetime voltam com o texto gravado pelo SQLite nas tabelas largas
+            suffix = " 00:00:00.000000" if kinds.get(column) == "data" else ""
+            texts = {day: f"{np.datetime64(day, 'D')}{suffix}" for day in set(values)}
+            decoded[column] = [texts[day] for day in values]
+        elif target == "base_calculo":
+            decoded[column] = [None if value == -1 else value for value in values]
+        elif target in ("tipo_calculo", "suavizada"):
+            restored = [value or None for value in values]
+            if kinds.get(column) == "inteiro" and target == "tipo_calculo":
+                restored = [int(value) if value is not None else None for value in restored]
+            decoded[column] = restored
+        else:
+            decoded[column] = list(values)
+    df = pd.DataFrame(decoded, columns=selected)
+    return df, next_cursor
@@ -1,7 +1,35 @@
-from persistence.base_adapter import DatabaseAdapter
-from sqlalchemy import create_engine, text, inspect
+from persistence import focus_star_schema as star
+from persistence.base_adapter import (
+    CATALOG_COLUMNS, CATALOG_TABLE, PROFILE_COLUMNS, PROFILE_TABLE, WATERMARK_COLUMNS, WATERMARK_TABLE, DatabaseAdapter,
+)
+from sqlalchemy import create_engine, event, text
+from datetime import datetime, timedelta
+import hashlib
+import json
+import numpy as np
 import pandas as pd
 
+SQLITE_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+UPSERT_BATCH_SIZE = 50000
+DEFAULT_PAGE_SIZE = 1000
+OBSERVATION_TABLE = "observacoes"
+SERIES_DIMENSION_TABLE = "dimensao_series"
+INTERNAL_TABLES = {CATALOG_TABLE, WATERMARK_TABLE, PROFILE_TABLE, OBSERVATION_TABLE, SERIES_DIMENSION_TABLE} | star.STAR_TABLES
+# "tabelas": uma tabela por série; "observacoes": séries SGS na tabela única `observacoes` e Focus no esquema estrela
+STORAGE_LAYOUTS = ("tabelas", "observacoes")
+DEFAULT_LAYOUT = "tabelas"
+OBSERVATION_COLUMNS = ["data", "valor"]
+_EPOCH = datetime(1970, 1, 1)
+
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -65536,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+    "busy_timeout": 30000,
+}
+
 class SQLiteAdapter(DatabaseAdapter):
     """
     Adaptador de banco de dados para interação com bancos SQLite.
@@ -10,58 +38,372 @@ class SQLiteAdapter(DatabaseAdapter):
     recuperar a última data registrada para uma determinada série, salvar DataFrames do pandas
     no banco de dados, listar tabelas disponíveis e buscar todos os dados de uma tabela específica.
 
+    O adaptador mantém a tabela `catalogo_series`, atualizada a cada gravação, com fonte, código,
+    periodicidade, primeira e última data, total de registros, data da última coleta e um hash
+    do conteúdo de cada tabela. Consultas de última data e a listagem de séries leem apenas o catálogo.
+
+    Com o layout "observacoes", as séries SGS (colunas 'data' e 'valor') não ganham uma tabela própria:
+    são gravadas na tabela única `observacoes(serie_id, data, valor)`, com datas inteiras (dias desde
+    1970-01-01) e chave primária agrupada (serie_id, data) em uma tabela WITHOUT ROWID, de modo que a
+    leitura de qualquer intervalo de uma série é uma única busca no índice. A tabela `dimensao_series`
+    associa cada nome de série ao seu serie_id. Para o restante da aplicação nada muda: a série continua
+    sendo consultada pelo nome, no catálogo e nos métodos de leitura. Séries já migradas são sempre lidas
+    de `observacoes`, e um banco com séries migradas grava as novas séries SGS no mesmo layout.
+
+    No mesmo layout, as tabelas do Focus são gravadas em um esquema estrela (ver `focus_star_schema`):
+    indicador, detalhe, período de referência e endpoint viram dimensões, e cada expectativa é uma linha
+    da tabela fato `fato_expectativas`, com chaves e datas inteiras e as estatísticas numéricas. A view
+    `expectativas_focus` reproduz o formato largo para exportações e consultas externas, e as leituras
+    pelo nome da tabela devolvem as mesmas colunas da tabela larga original.
+
     Atributos:
         db_path (str): Caminho para o arquivo do banco de dados SQLite.
+        pragmas (dict): Configurações PRAGMA aplicadas a cada nova conexão do pool.
+        layout (str): Layout de armazenamento das séries SGS, "tabelas" (padrão) ou "observacoes".
         engine (sqlalchemy.engine.Engine | None): Instância do engine SQLAlchemy para conexão com o banco de dados.
     
     Métodos:
-        __init__(db_path: str):
-            Inicializa o adaptador com o caminho para o banco SQLite.
+        __init__(db_path: str, pragmas: dict | None = None, layout: str | None = None):
+            Inicializa o adaptador com o caminho para o banco SQLite, ajustes opcionais de PRAGMA e o layout de armazenamento.
         connect():
-            Estabelece uma conexão com o banco SQLite e inicializa o engine.
+            Inicializa o engine com pool de conexões (chamadas repetidas não recriam o engine).
         disconnect():
             Encerra o engine do banco e fecha a conexão.
         get_last_date(series_name: str) -> pd.Timestamp | None:
-            Retorna a data mais recente (coluna 'data') da tabela especificada (série).
+            Retorna a data mais recente da tabela especificada (série), lida do catálogo.
             Retorna None se a tabela não existir ou estiver vazia.
-        save_data(series_name: str, data: pd.DataFrame):
+        get_last_dates(series_names: list[str]) -> dict:
+            Retorna as últimas datas de várias séries em uma única consulta ao catálogo.
+        save_data(series_name: str, data: pd.DataFrame, metadata: dict | None = None):
             Adiciona o DataFrame fornecido à tabela especificada no banco.
             Cria a tabela se ela não existir.
+        upsert_data(table_name: str, data: pd.DataFrame, key_columns: list[str], metadata: dict | None = None) -> int:
+            Grava o DataFrame em lote (executemany em uma única transação) com semântica INSERT OR REPLACE
+            sobre a chave natural informada, criando a tabela e o índice único quando necessário.
+        get_watermark(endpoint: str, filters: dict) -> dict | None:
+            Retorna a marca d'água (primeira e última Data gravadas) de um endpoint do Focus para uma combinação de filtros.
+        set_watermark(endpoint: str, filters: dict, table_name: str, first_date, last_date):
+            Registra a marca d'água da coleta incremental do Focus na tabela `marcas_focus`.
+        save_profiles(profiles: dict):
+            Grava os perfis das séries (periodicidade, confiança, lacunas, duplicados etc.) na tabela `perfis_series`.
+        get_profiles(table_names: list[str] | None = None) -> dict:
+            Retorna os perfis gravados das séries.
+        get_catalog() -> list[dict]:
+            Retorna as entradas do catálogo de séries.
         get_table_names() -> list[str]:
-            Retorna uma lista com todos os nomes de tabelas presentes no banco.
+            Retorna uma lista com os nomes das tabelas de dados registradas no catálogo.
         fetch_full_table_data(table_name: str) -> pd.DataFrame:
             Recupera todas as linhas da tabela especificada como um DataFrame do pandas.
+        fetch_table_page(table_name, columns, start_date, end_date, page_size, cursor) -> tuple[pd.DataFrame, str | None]:
+            Recupera uma página da tabela, com filtro de datas e projeção de colunas executados no SQL,
+            usando paginação por cursor (data, rowid) sobre o índice de data.
+        iter_table_chunks(table_name, columns, start_date, end_date, chunk_size):
+            Percorre a tabela em blocos de DataFrames, sem carregá-la inteira na memória.
+        migrate_to_normalized_layout(table_names: list[str] | None = None, keep_tables: bool = False, log=print) -> list[dict]:
+            Importa as tabelas existentes de séries SGS para `observacoes` e do Focus para o esquema estrela.
     """
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, pragmas: dict | None = None, layout: str | None = None):
         self.db_path = db_path
+        self.pragmas = dict(DEFAULT_PRAGMAS)
+        self.pragmas.update(pragmas or {})
+        self.layout = layout or DEFAULT_LAYOUT
+        if self.layout not in STORAGE_LAYOUTS:
+            raise ValueError(f"Layout de armazenamento '{self.layout}' não suportado. Utilize {' ou '.join(STORAGE_LAYOUTS)}.")
         self.engine = None
 
     def connect(self):
-        self.engine = create_engine(f'sqlite:///{self.db_path}')
+        if self.engine:
+            return
+        self.engine = create_engine(
+            f'sqlite:///{self.db_path}',
+            connect_args={"check_same_thread": False, "timeout": self.pragmas.get("busy_timeout", 30000) / 1000},
+        )
+        event.listen(self.engine, "connect", self._apply_pragmas)
+        self._bootstrap_catalog()
         print(f"Conectado ao banco de dados SQLite: {self.db_path}")
 
+    def _apply_pragmas(self, dbapi_connection, connection_record):
+        """
+        Aplica as configurações PRAGMA (WAL, synchronous, cache, mmap) em cada conexão nova do pool.
+        """
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in self.pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
     def disconnect(self):
         if self.engine:
             self.engine.dispose()
+            self.engine = None
             print("Conexão SQLite desconectada.")
 
+    def _bootstrap_catalog(self):
+        """
+        Cria a tabela de catálogo e registra tabelas de dados já existentes que ainda não constam nele
+        (por exemplo, bancos criados por versões anteriores), criando também seus índices de data.
+        """
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(
+                f"""
+                CREATE TABLE IF NOT EXISTS {CATALOG_TABLE} (
+                    nome_tabela TEXT PRIMARY KEY,
+                    fonte TEXT,
+                    codigo TEXT,
+                    periodicidade TEXT,
+                    primeira_data TEXT,
+                    ultima_data TEXT,
+                    total_registros INTEGER NOT NULL DEFAULT 0,
+                    ultima_coleta TEXT,
+                    hash_conteudo TEXT
+                )
+                """
+            )
+            connection.exec_driver_sql(
+                f"""
+                CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+                    endpoint TEXT NOT NULL,
+                    filtros_hash TEXT NOT NULL,
+                    filtros TEXT,
+                    tabela TEXT,
+                    primeira_data TEXT,
+                    ultima_data TEXT,
+                    atualizado_em TEXT,
+                    PRIMARY KEY (endpoint, filtros_hash)
+                )
+                """
+            )
+            connection.exec_driver_sql(
+                f"""
+                CREATE TABLE IF NOT EXISTS {PROFILE_TABLE} (
+                    nome_tabela TEXT PRIMARY KEY,
+                    periodicidade TEXT,
+                    confianca REAL,
+                    dias_uteis INTEGER,
+                    total_registros INTEGER,
+                    duplicados INTEGER,
+                    primeira_data TEXT,
+                    ultima_data TEXT,
+                    valor_minimo REAL,
+                    valor_maximo REAL,
+                    valores_nulos INTEGER,
+                    lacunas INTEGER,
+                    lacunas_detalhe TEXT,
+                    hash_conteudo TEXT,
+                    atualizado_em TEXT
+                )
+                """
+            )
+            connection.exec_driver_sql(
+                f"""
+                CREATE TABLE IF NOT EXISTS {SERIES_DIMENSION_TABLE} (
+                    serie_id INTEGER PRIMARY KEY,
+                    nome_tabela TEXT NOT NULL UNIQUE,
+                    fonte TEXT,
+                    codigo TEXT
+                )
+                """
+            )
+            connection.exec_driver_sql(
+                f"""
+                CREATE TABLE IF NOT EXISTS {OBSERVATION_TABLE} (
+                    serie_id INTEGER NOT NULL,
+                    data INTEGER NOT NULL,
+                    valor REAL,
+                    PRIMARY KEY (serie_id, data)
+                ) WITHOUT ROWID
+                """
+            )
+            star.create_star_schema(connection)
+            registered = {row[0] for row in connection.exec_driver_sql(f"SELECT nome_tabela FROM {CATALOG_TABLE}")}
+            tables = [
+                row[0] for row in connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")
+                if row[0] not in registered and row[0] not in INTERNAL_TABLES and not row[0].startswith("sqlite_")
+            ]
+            for table_name in tables:
+                columns = [row[1] for row in connection.exec_driver_sql(f'PRAGMA table_info("{table_name}")')]
+                fonte = "focus" if table_name.startswith("focus_") else "sgs"
+                self._refresh_catalog(connection, table_name, self._date_column(columns), {"fonte": fonte}, None)
+
+    def _refresh_catalog(self, connection, table_name: str, date_column: str | None, metadata: dict | None, batch_hash: str | None,
+                         stats: tuple | None = None):
+        """
+        Atualiza a entrada da tabela no catálogo após uma gravação. A primeira/última data usam o índice
+        de data da tabela (ou `stats`, já calculadas pela chave do layout normalizado), e o hash de conteúdo
+        é encadeado com o hash do lote recém-gravado.
+        """
+        if stats is not None:
+            first_date, last_date, row_count = stats
+        elif date_column:
+            connection.exec_driver_sql(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_{date_column}" ON "{table_name}" ("{date_column}")')
+            first_date, last_date, row_count = connection.exec_driver_sql(
+                f'SELECT MIN("{date_column}"), MAX("{date_column}"), COUNT(*) FROM "{table_name}"'
+            ).one()
+        else:
+            first_date = last_date = None
+            row_count = connection.exec_driver_sql(f'SELECT COUNT(*) FROM "{table_name}"').scalar()
+
+        previous = connection.exec_driver_sql(
+            f"SELECT fonte, codigo, periodicidade, hash_conteudo FROM {CATALOG_TABLE} WHERE nome_tabela = ?", (table_name,)
+        ).first()
+        metadata = metadata or {}
+        fonte = metadata.get("fonte") or (previous[0] if previous else None)
+        codigo = metadata.get("codigo") or (previous[1] if previous else None)
+        periodicidade = metadata.get("periodicidade") or (previous[2] if previous else None) or self._periodicity_from_name(table_name)
+        content_hash = previous[3] if previous else None
+        if batch_hash:
+            content_hash = hashlib.sha256(f"{content_hash or ''}{batch_hash}".encode("utf-8")).hexdigest()
+
+        connection.exec_driver_sql(
+            f"INSERT OR REPLACE INTO {CATALOG_TABLE} ({', '.join(CATALOG_COLUMNS)}) VALUES ({', '.join('?' for _ in CATALOG_COLUMNS)})",
+            (table_name, fonte, str(codigo) if codigo is not None else None, periodicidade, first_date, last_date,
+             row_count, datetime.now().strftime(SQLITE_DATETIME_FORMAT), content_hash),
+        )
+
+    @staticmethod
+    def _day_to_text(day: int | None, date_format: str = SQLITE_DATETIME_FORMAT) -> str | None:
+        return (_EPOCH + timedelta(days=int(day))).strftime(date_format) if day is not None else None
+
+    @staticmethod
+    def _to_days(values) -> np.ndarray:
+        """
+        Converte datas (datetime, Timestamp ou texto) em dias desde 1970-01-01.
+        """
+        return pd.to_datetime(pd.Series(values)).to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+    @staticmethod
+    def _from_days(days) -> np.ndarray:
+        return np.asarray(days, dtype=np.int64).astype("datetime64[D]").astype("datetime64[ns]")
+
+    @staticmethod
+    def _table_exists(connection, table_name: str) -> bool:
+        return bool(connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+        ).scalar())
+
+    def _observation_id(self, connection, table_name: str) -> int | None:
+        """
+        Retorna o serie_id da série, se ela estiver armazenada em `observacoes`.
+        """
+        return connection.exec_driver_sql(
+            f"SELECT serie_id FROM {SERIES_DIMENSION_TABLE} WHERE nome_tabela = ?", (table_name,)
+        ).scalar()
+
+    def _register_series(self, connection, table_name: str, metadata: dict | None) -> int:
+        """
+        Registra a série em `dimensao_series` e retorna o seu serie_id.
+        """
+        metadata = metadata or {}
+        codigo = metadata.get("codigo")
+        connection.exec_driver_sql(
+            f"INSERT OR IGNORE INTO {SERIES_DIMENSION_TABLE} (nome_tabela, fonte, codigo) VALUES (?, ?, ?)",
+            (table_name, metadata.get("fonte") or "sgs", str(codigo) if codigo is not None else None),
+        )
+        return self._observation_id(connection, table_name)
+
+    def _observation_target(self, connection, table_name: str, columns: list[str], metadata: dict | None) -> int | None:
+        """
+        Decide se a gravação vai para `observacoes` e, nesse caso, retorna o serie_id (registrando a série).
+        Apenas séries com as colunas 'data' e 'valor' são elegíveis. Séries novas usam o layout "observacoes"
+        quando configurado ou quando o banco já tem séries migradas; tabelas antigas ainda não migradas
+        continuam recebendo as gravações até a migração (ver `migrate_to_normalized_layout`).
+        """
+        if sorted(columns) != OBSERVATION_COLUMNS:
+            return None
+        series_id = self._observation_id(connection, table_name)
+        if series_id is not None:
+            return series_id
+        if self.layout != "observacoes" and not connection.exec_driver_sql(f"SELECT 1 FROM {SERIES_DIMENSION_TABLE} LIMIT 1").scalar():
+            return None
+        if self._table_exists(connection, table_name):
+            print(f"AVISO: A série {table_name} ainda está em uma tabela própria. Execute 'python coletor.py migrar' para importá-la em {OBSERVATION_TABLE}.")
+            return None
+        return self._register_series(connection, table_name, metadata)
+
+    def _observation_stats(self, connection, series_id: int) -> tuple:
+        first_day, last_day, row_count = connection.exec_driver_sql(
+            f"SELECT MIN(data), MAX(data), COUNT(*) FROM {OBSERVATION_TABLE} WHERE serie_id = ?", (series_id,)
+        ).one()
+        return self._day_to_text(first_day), self._day_to_text(last_day), row_count
+
+    def _focus_stats(self, connection, tabela_id: int) -> tuple:
+        # O catálogo mantém o formato da Data da tabela larga original (datetime ou texto 'aaaa-mm-dd')
+        date_format = SQLITE_DATETIME_FORMAT if star.date_kind(connection, tabela_id) == "data" else "%Y-%m-%d"
+        first_day, last_day, row_count = star.fact_stats(connection, tabela_id)
+        return self._day_to_text(first_day, date_format), self._day_to_text(last_day, date_format), row_count
+
+    def _focus_target(self, connection, table_name: str, data: pd.DataFrame, metadata: dict | None) -> int | None:
+        """
+        Decide se a gravação de uma tabela do Focus vai para o esquema estrela e, nesse caso, retorna o
+        tabela_id (registrando a tabela). Segue as mesmas regras de `_observation_target`.
+        """
+        tabela_id = star.table_id(connection, table_name)
+        if tabela_id is None and (metadata or {}).get("fonte") != "focus":
+            return None
+        if star.fact_columns(data.columns) is None:
+            if tabela_id is not None:
+                raise ValueError(f"A tabela {table_name} está no esquema estrela do Focus, que não comporta as colunas {list(data.columns)}.")
+            return None
+        if tabela_id is None:
+            if self.layout != "observacoes" and not star.has_tables(connection):
+                return None
+            if self._table_exists(connection, table_name):
+                print(f"AVISO: A tabela {table_name} ainda está no formato largo. Execute 'python coletor.py migrar' para importá-la em {star.FACT_TABLE}.")
+                return None
+        return star.register_table(connection, table_name, (metadata or {}).get("codigo"), data)
+
+    def _write_normalized(self, connection, table_name: str, data: pd.DataFrame, metadata: dict | None, key_columns: list[str] | None = None) -> tuple | None:
+        """
+        Grava os dados no layout normalizado (`observacoes` ou esquema estrela do Focus), se a tabela pertencer a ele.
+        Returns:
+            tuple | None: (registros gravados, estatísticas para o catálogo), ou None se a tabela deve ser gravada como tabela própria.
+        """
+        if key_columns is None or key_columns == ["data"]:
+            series_id = self._observation_target(connection, table_name, list(data.columns), metadata)
+            if series_id is not None:
+                return self._write_observations(connection, series_id, data), self._observation_stats(connection, series_id)
+        tabela_id = self._focus_target(connection, table_name, data, metadata)
+        if tabela_id is not None:
+            return star.write_facts(connection, tabela_id, data, UPSERT_BATCH_SIZE), self._focus_stats(connection, tabela_id)
+        return None
+
+    def _write_observations(self, connection, series_id: int, data: pd.DataFrame) -> int:
+        """
+        Grava as observações da série com INSERT OR REPLACE sobre a chave (serie_id, data).
+        """
+        rows = self._to_sql_rows(pd.DataFrame({
+            "serie_id": np.full(len(data), series_id, dtype=np.int64),
+            "data": self._to_days(data["data"]),
+            "valor": pd.to_numeric(data["valor"], errors="coerce").to_numpy(dtype=np.float64),
+        }))
+        insert_sql = f"INSERT OR REPLACE INTO {OBSERVATION_TABLE} (serie_id, data, valor) VALUES (?, ?, ?)"
+        for offset in range(0, len(rows), UPSERT_BATCH_SIZE):
+            connection.exec_driver_sql(insert_sql, rows[offset:offset + UPSERT_BATCH_SIZE])
+        return len(rows)
+
     def get_last_date(self, series_name: str) -> pd.Timestamp | None:
         if not self.engine:
             raise ConnectionError("Conexão com o banco de dados não estabelecida.")
-        
+        return self.get_last_dates([series_name]).get(series_name)
+
+    def get_last_dates(self, series_names: list[str]) -> dict:
+        if not self.engine:
+            raise ConnectionError("Conexão com o banco de dados não estabelecida.")
+        if not series_names:
+            return {}
+
+        placeholders = ", ".join("?" for _ in series_names)
         with self.engine.connect() as connection:
-            inspector = inspect(self.engine)
-            if series_name not in inspector.get_table_names():
-                return None
-            
-            query = text(f"SELECT MAX(data) FROM {series_name}")
-            result = connection.execute(query).scalar_one_or_none()
-            
-            if result:
-                return pd.to_datetime(result)
-            return None
+            rows = connection.exec_driver_sql(
+                f"SELECT nome_tabela, ultima_data FROM {CATALOG_TABLE} WHERE nome_tabela IN ({placeholders})", tuple(series_names)
+            ).all()
+        last_dates = {name: None for name in series_names}
+        for name, last_date in rows:
+            last_dates[name] = pd.to_datetime(last_date) if last_date else None
+        return last_dates
 
-    def save_data(self, series_name: str, data: pd.DataFrame):
+    def save_data(self, series_name: str, data: pd.DataFrame, metadata: dict | None = None):
         if not self.engine:
             raise ConnectionError("Conexão com o banco de dados não estabelecida.")
         
@@ -70,23 +412,445 @@ class SQLiteAdapter(DatabaseAdapter):
             return
 
         try:
-            data.to_sql(series_name, self.engine, if_exists='append', index=False)
+            with self.engine.begin() as connection:
+                normalized = self._write_normalized(connection, series_name, data, metadata)
+                if normalized is None:
+                    data.to_sql(series_name, connection, if_exists='append', index=False)
+                self._refresh_catalog(connection, series_name, self._date_column(data.columns), metadata, self._hash_batch(data),
+                                      normalized[1] if normalized else None)
             print(f"Dados da série {series_name} salvos com sucesso.")
         except Exception as e:
             print(f"Erro ao salvar dados da série {series_name}: {e}")
 
+    def upsert_data(self, table_name: str, data: pd.DataFrame, key_columns: list[str], metadata: dict | None = None) -> int:
+        if not self.engine:
+            raise ConnectionError("Conexão com o banco de dados não estabelecida.")
+
+        if data.empty:
+            print(f"Nenhum dado para salvar para a série {table_name}.")
+            return 0
+
+        missing_keys = [column for column in key_columns if column not in data.columns]
+        if not key_columns or missing_keys:
+            raise ValueError(f"Chave natural inválida para a tabela {table_name}: colunas ausentes {missing_keys or key_columns}.")
+
+        columns = list(data.columns)
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        placeholders = ", ".join("?" for _ in columns)
+        insert_sql = f'INSERT OR REPLACE INTO "{table_name}" ({column_list}) VALUES ({placeholders})'
+
+        with self.engine.begin() as connection:
+            normalized = self._write_normalized(connection, table_name, data, metadata, key_columns)
+            if normalized is not None:
+                row_count = normalized[0]
+            else:
+                rows = self._to_sql_rows(data)
+                row_count = len(rows)
+                self._ensure_upsert_table(connection, table_name, data, key_columns)
+                for offset in range(0, len(rows), UPSERT_BATCH_SIZE):
+                    connection.exec_driver_sql(insert_sql, rows[offset:offset + UPSERT_BATCH_SIZE])
+            self._refresh_catalog(connection, table_name, self._date_column(columns), metadata, self._hash_batch(data),
+                                  normalized[1] if normalized else None)
+
+        print(f"{row_count} registros gravados na tabela {table_name}.")
+        return row_count
+
+    @staticmethod
+    def _sqlite_type(series: pd.Series) -> str:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return "DATETIME"
+        if pd.api.types.is_bool_dtype(series):
+            return "BOOLEAN"
+        if pd.api.types.is_integer_dtype(series):
+            return "BIGINT"
+        if pd.api.types.is_float_dtype(series):
+            return "FLOAT"
+        return "TEXT"
+
+    @staticmethod
+    def _to_sql_rows(data: pd.DataFrame) -> list[tuple]:
+        """
+        Converte o DataFrame em tuplas prontas para o executemany, com datas no mesmo
+        formato texto usado pelo SQLAlchemy/`to_sql` e valores ausentes como NULL.
+        """
+        converted = []
+        for column in data.columns:
+            series = data[column]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                values = series.dt.strftime(SQLITE_DATETIME_FORMAT).to_numpy(dtype=object)
+            else:
+                values = series.to_numpy(dtype=object)
+            mask = pd.isna(series).to_numpy()
+            if mask.any():
+                values = values.copy()
+                values[mask] = None
+            converted.append(values)
+        return list(zip(*converted))
+
+    def _ensure_upsert_table(self, connection, table_name: str, data: pd.DataFrame, key_columns: list[str]):
+        """
+        Cria a tabela e o índice único da chave natural, se necessário. Em tabelas já existentes
+        (criadas por `to_sql`), adiciona colunas novas e remove duplicatas antes de criar o índice.
+        """
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+        ).scalar()
+        if not exists:
+            column_defs = ", ".join(f'"{column}" {self._sqlite_type(data[column])}' for column in data.columns)
+            connection.exec_driver_sql(f'CREATE TABLE "{table_name}" ({column_defs})')
+        else:
+            existing_columns = {row[1] for row in connection.exec_driver_sql(f'PRAGMA table_info("{table_name}")')}
+            for column in data.columns:
+                if column not in existing_columns:
+                    connection.exec_driver_sql(f'ALTER TABLE "{table_name}" ADD COLUMN "{column}" {self._sqlite_type(data[column])}')
+
+        index_name = f"ux_{table_name}_chave"
+        has_index = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (index_name,)
+        ).scalar()
+        if has_index:
+            return
+
+        # Valores nulos na chave (ex: IndicadorDetalhe) devem colidir entre si
+        key_expression = ", ".join(f"""IFNULL("{column}", '')""" for column in key_columns)
+        if exists:
+            connection.exec_driver_sql(
+                f'DELETE FROM "{table_name}" WHERE rowid NOT IN (SELECT MAX(rowid) FROM "{table_name}" GROUP BY {key_expression})'
+            )
+        connection.exec_driver_sql(f'CREATE UNIQUE INDEX "{index_name}" ON "{table_name}" ({key_expression})')
+
+    def get_watermark(self, endpoint: str, filters: dict) -> dict | None:
+        if not self.engine:
+            raise ConnectionError("Conexão com o banco de dados não estabelecida.")
+        with self.engine.connect() as connection:
+            row = connection.exec_driver_sql(
+                f"SELECT tabela, primeira_data, ultima_data, atualizado_em FROM {WATERMARK_TABLE} WHERE endpoint = ? AND filtros_hash = ?",
+                (endpoint, self.filters_hash(filters)),
+            ).first()
+        if row is None:
+            return None
+        return {
+            "tabela": row[0],
+            "primeira_data": pd.to_datetime(row[1]) if row[1] else None,
+            "ultima_data": pd.to_datetime(row[2]) if row[2] else None,
+            "atualizado_em": row[3],
+        }
+
+    def set_watermark(self, endpoint: str, filters: dict, table_name: str, first_date, last_date):
+        if not self.engine:
+            raise ConnectionError("Conexão com o banco de dados não estabelecida.")
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(
+                f"INSERT OR REPLACE INTO {WATERMARK_TABLE} ({', '.join(WATERMARK_COLUMNS)}) VALUES ({', '.join('?' for _ in WATERMARK_COLUMNS)})",
+                (endpoint, self.filters_hash(filters), json.dumps(filters, ensure_ascii=False, sort_keys=True, default=str), table_name,
+                 pd.Timestamp(first_date).strftime(SQLITE_DATETIME_FORMAT) if first_date is not None else None,
+                 pd.Timestamp(last_date).strftime(SQLITE_DATETIME_FORMAT) if last_date is not None else None,
+                 datetime.now().strftime(SQLITE_DATETIME_FORMAT)),
+            )
+
+    def save_profiles(self, profiles: dict):
+        if not self.engine:
+            raise ConnectionError("Conexão com o banco de dados não estabelecida.")
+        updated_at = datetime.now().strftime(SQLITE_DATETIME_FORMAT)
+        rows = [
+            (table_name, profile["periodicidade"], profile["confianca"], int(bool(profile["dias_uteis"])), profile["total_registros"],
+             profile["duplicados"], profile["primeira_data"], profile["ultima_data"], profile["valor_minimo"], profile["valor_maximo"],
+             profile["valores_nulos"], profile["lacunas"], json.dumps(profile["lacunas_detalhe"]), profile.get("hash_conteudo"), updated_at)
+            for table_name, profile in profiles.items()
+        ]
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(
+                f"INSERT OR REPLACE INTO {PROFILE_TABLE} ({', '.join(PROFILE_COLUMNS)}) VALUES ({', '.join('?' for _ in PROFILE_COLUMNS)})", rows
+            )
+
+    def get_profiles(self, table_names: list[str] | None = None) -> dict:
+        if not self.engine:
+            raise ConnectionError("Conexão com o banco de dados não estabelecida.")
+        query = f"SELECT {', '.join(PROFILE_COLUMNS)} FROM {PROFILE_TABLE}"
+        params = ()
+        if table_names is not None:
+            if not table_names:
+                return {}
+            query += f" WHERE nome_tabela IN ({', '.join('?' for _ in table_names)})"
+            params = tuple(table_names)
+        with self.engine.connect() as connection:
+            rows = connection.exec_driver_sql(query, params).all()
+        profiles = {}
+        for row in rows:
+            profile = dict(zip(PROFILE_COLUMNS[1:], row[1:]))
+            profile["dias_uteis"] = bool(profile["dias_uteis"])
+            profile["lacunas_detalhe"] = json.loads(profile["lacunas_detalhe"] or "[]")
+            profiles[row[0]] = profile
+        return profiles
+
+    def get_catalog(self) -> list[dict]:
+        if not self.engine:
+            raise ConnectionError("Conexão com o banco de dados não estabelecida.")
+        with self.engine.connect() as connection:
+            rows = connection.exec_driver_sql(f"SELECT {', '.join(CATALOG_COLUMNS)} FROM {CATALOG_TABLE} ORDER BY nome_tabela").all()
+        return [dict(zip(CATALOG_COLUMNS, row)) for row in rows]
+
     def get_table_names(self) -> list[str]:
         if not self.engine:
             raise ConnectionError("Conexão com o banco de dados não estabelecida.")
-        inspector = inspect(self.engine)
-        return inspector.get_table_names()
+        with self.engine.connect() as connection:
+            return [row[0] for row in connection.exec_driver_sql(f"SELECT nome_tabela FROM {CATALOG_TABLE} ORDER BY nome_tabela")]
+
+    def _validate_table(self, connection, table_name: str) -> list[str]:
+        """
+        Garante que a tabela está registrada no catálogo e retorna suas colunas.
+        Evita que nomes arbitrários sejam interpolados nas consultas SQL.
+        """
+        registered = connection.exec_driver_sql(
+            f"SELECT 1 FROM {CATALOG_TABLE} WHERE nome_tabela = ?", (table_name,)
+        ).scalar()
+        if not registered:
+            raise ValueError(f"Tabela '{table_name}' não encontrada no catálogo de séries.")
+        if self._observation_id(connection, table_name) is not None:
+            return list(OBSERVATION_COLUMNS)
+        tabela_id = star.table_id(connection, table_name)
+        if tabela_id is not None:
+            return [name for name, _ in star.table_columns(connection, tabela_id)]
+        return [row[1] for row in connection.exec_driver_sql(f'PRAGMA table_info("{table_name}")')]
 
     def fetch_full_table_data(self, table_name: str) -> pd.DataFrame:
         if not self.engine:
             raise ConnectionError("Conexão com o banco de dados não estabelecida.")
         
         with self.engine.connect() as connection:
-            query = text(f"SELECT * FROM {table_name}")
+            try:
+                self._validate_table(connection, table_name)
+            except ValueError:
+                return pd.DataFrame()
+            series_id = self._observation_id(connection, table_name)
+            if series_id is not None:
+                rows = connection.exec_driver_sql(
+                    f"SELECT data, valor FROM {OBSERVATION_TABLE} WHERE serie_id = ? ORDER BY data", (series_id,)
+                ).all()
+                return self._observation_frame(rows, OBSERVATION_COLUMNS)
+            tabela_id = star.table_id(connection, table_name)
+            if tabela_id is not None:
+                return star.read_facts(connection, tabela_id)[0]
+            query = text(f'SELECT * FROM "{table_name}"')
             df = pd.read_sql(query, connection)
             return df
+
+    def fetch_table_page(self, table_name: str, columns: list[str] | None = None, start_date: str | None = None,
+                         end_date: str | None = None, page_size: int = DEFAULT_PAGE_SIZE, cursor: str | None = None) -> tuple[pd.DataFrame, str | None]:
+        if not self.engine:
+            raise ConnectionError("Conexão com o banco de dados não estabelecida.")
+
+        page_size = max(1, int(page_size))
+        with self.engine.connect() as connection:
+            table_columns = self._validate_table(connection, table_name)
+            selected = list(columns) if columns else table_columns
+            unknown = [column for column in selected if column not in table_columns]
+            if unknown:
+                raise ValueError(f"Colunas inexistentes na tabela '{table_name}': {unknown}")
+
+            series_id = self._observation_id(connection, table_name)
+            if series_id is not None:
+                return self._fetch_observation_page(connection, series_id, selected, start_date, end_date, page_size, cursor)
+            tabela_id = star.table_id(connection, table_name)
+            if tabela_id is not None:
+                start_day = (pd.Timestamp(start_date).normalize() - pd.Timestamp(_EPOCH)).days if start_date else None
+                end_day = (pd.Timestamp(end_date).normalize() - pd.Timestamp(_EPOCH)).days if end_date else None
+                return star.read_facts(connection, tabela_id, selected, start_day, end_day, page_size, cursor)
+
+            date_column = self._date_column(table_columns)
+            conditions = []
+            params = []
+            if date_column and start_date:
+                conditions.append(f'"{date_column}" >= ?')
+                params.append(pd.Timestamp(start_date).strftime(SQLITE_DATETIME_FORMAT))
+            if date_column and end_date:
+                conditions.append(f'"{date_column}" < ?')
+                params.append((pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)).strftime(SQLITE_DATETIME_FORMAT))
+            if cursor:
+                last_date, last_rowid = json.loads(cursor)
+                if date_column:
+                    conditions.append(f'("{date_column}" > ? OR ("{date_column}" = ? AND rowid > ?))')
+                    params.extend([last_date, last_date, last_rowid])
+                else:
+                    conditions.append("rowid > ?")
+                    params.append(last_rowid)
+
+            order_by = f'"{date_column}", rowid' if date_column else "rowid"
+            key_columns = f'"{date_column}" AS __cursor_data, rowid AS __cursor_rowid' if date_column else "NULL AS __cursor_data, rowid AS __cursor_rowid"
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            column_list = ", ".join(f'"{column}"' for column in selected)
+            query = f'SELECT {column_list}, {key_columns} FROM "{table_name}" {where} ORDER BY {order_by} LIMIT ?'
+            rows = connection.exec_driver_sql(query, tuple(params) + (page_size + 1,)).all()
+
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = json.dumps([rows[-1][-2], rows[-1][-1]]) if has_more and rows else None
+        df = pd.DataFrame([row[:-2] for row in rows], columns=selected)
+        return df, next_cursor
+
+    def _observation_frame(self, rows: list, selected: list[str]) -> pd.DataFrame:
+        """
+        Monta o DataFrame de observações (data, valor) com 'data' em datetime64, como no adaptador DuckDB.
+        """
+        days = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        values = np.fromiter((np.nan if row[1] is None else row[1] for row in rows), dtype=np.float64, count=len(rows))
+        frame = {"data": self._from_days(days), "valor": values}
+        return pd.DataFrame({column: frame[column] for column in selected})
+
+    def _fetch_observation_page(self, connection, series_id: int, selected: list[str], start_date: str | None, end_date: str | None,
+                                page_size: int, cursor: str | None) -> tuple[pd.DataFrame, str | None]:
+        """
+        Página de uma série em `observacoes`: filtro de datas, cursor e ordenação usam a chave (serie_id, data).
+        """
+        conditions = ["serie_id = ?"]
+        params = [series_id]
+        if start_date:
+            conditions.append("data >= ?")
+            params.append(int(self._to_days([pd.Timestamp(start_date).normalize()])[0]))
+        if end_date:
+            conditions.append("data <= ?")
+            params.append(int(self._to_days([pd.Timestamp(end_date).normalize()])[0]))
+        if cursor:
+            conditions.append("data > ?")
+            params.append(int(json.loads(cursor)[0]))
+        rows = connection.exec_driver_sql(
+            f"SELECT data, valor FROM {OBSERVATION_TABLE} WHERE {' AND '.join(conditions)} ORDER BY data LIMIT ?",
+            tuple(params) + (page_size + 1,),
+        ).all()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = json.dumps([rows[-1][0]]) if has_more and rows else None
+        return self._observation_frame(rows, selected), next_cursor
+
+    def _migrate_series_table(self, connection, table_name: str, entry: dict) -> tuple:
+        """
+        Importa uma tabela de série SGS para `observacoes`, convertendo as datas no próprio SQLite.
+        """
+        series_id = self._register_series(connection, table_name, {"fonte": entry["fonte"], "codigo": entry["codigo"]})
+        # julianday('aaaa-mm-dd') - 2440587.5 = dias desde 1970-01-01; rowid crescente preserva a última gravação
+        connection.exec_driver_sql(
+            f"""
+            INSERT OR REPLACE INTO {OBSERVATION_TABLE} (serie_id, data, valor)
+            SELECT ?, CAST(julianday(substr(data, 1, 10)) - 2440587.5 AS INTEGER), valor
+            FROM "{table_name}" WHERE data IS NOT NULL ORDER BY rowid
+            """,
+            (series_id,),
+        )
+        expected = connection.exec_driver_sql(
+            f'SELECT COUNT(DISTINCT substr(data, 1, 10)) FROM "{table_name}" WHERE data IS NOT NULL'
+        ).scalar()
+        stats = self._observation_stats(connection, series_id)
+        if stats[2] != expected:
+            raise ValueError(f"{stats[2]} registros migrados, {expected} esperados")
+        return stats
+
+    def _migrate_focus_table(self, connection, table_name: str, entry: dict, columns: list[str]) -> tuple:
+        """
+        Importa uma tabela larga do Focus para o esquema estrela, em blocos de UPSERT_BATCH_SIZE linhas.
+        """
+        tabela_id = None
+        last_rowid = 0
+        # Colunas datetime (gravadas como texto) voltam a ser datetime, para que as leituras mantenham o formato
+        datetime_columns = [
+            row[1] for row in connection.exec_driver_sql(f'PRAGMA table_info("{table_name}")')
+            if row[1] in columns and str(row[2]).upper() in ("DATETIME", "TIMESTAMP")
+        ]
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        while True:
+            rows = connection.exec_driver_sql(
+                f'SELECT rowid, {column_list} FROM "{table_name}" WHERE rowid > ? AND "Data" IS NOT NULL ORDER BY rowid LIMIT ?',
+                (last_rowid, UPSERT_BATCH_SIZE),
+            ).all()
+            if not rows:
+                break
+            last_rowid = rows[-1][0]
+            chunk = pd.DataFrame.from_records([row[1:] for row in rows], columns=columns)
+            for column in datetime_columns:
+                chunk[column] = pd.to_datetime(chunk[column])
+            if tabela_id is None:
+                tabela_id = star.register_table(connection, table_name, entry["codigo"], chunk)
+            star.write_facts(connection, tabela_id, chunk, UPSERT_BATCH_SIZE)
+        if tabela_id is None:
+            tabela_id = star.register_table(connection, table_name, entry["codigo"], pd.DataFrame(columns=columns))
+
+        # Linhas distintas pelas colunas que compõem a chave da tabela fato
+        mapping = star.fact_columns(columns)
+        key_expressions = [
+            'substr("Data", 1, 10)' if target == "data" else f'"{column}"'
+            for column, target in mapping.items() if target in star.KEY_COLUMNS
+        ]
+        expected = connection.exec_driver_sql(
+            f'SELECT COUNT(*) FROM (SELECT DISTINCT {", ".join(key_expressions)} FROM "{table_name}" WHERE "Data" IS NOT NULL)'
+        ).scalar()
+        stats = self._focus_stats(connection, tabela_id)
+        if stats[2] != expected:
+            raise ValueError(f"{stats[2]} registros migrados, {expected} esperados")
+        return stats
+
+    def migrate_to_normalized_layout(self, table_names: list[str] | None = None, keep_tables: bool = False, log=print) -> list[dict]:
+        """
+        Importa as tabelas existentes para o layout "observacoes": séries SGS (colunas 'data' e 'valor')
+        para a tabela única `observacoes` e tabelas largas do Focus para o esquema estrela (`fato_expectativas`).
+        Cada tabela é migrada em uma transação própria: a contagem é conferida e a tabela antiga é removida
+        (a não ser que `keep_tables` seja verdadeiro); ao final, o banco é compactado (VACUUM). Fonte, código,
+        periodicidade e hash do catálogo são preservados; registros repetidos na chave são unificados
+        (prevalece o último gravado).
+        Args:
+            table_names (list[str], opcional): Tabelas a migrar. Se omitido, todas as tabelas elegíveis do catálogo.
+            keep_tables (bool): Mantém as tabelas antigas no banco após a migração.
+            log (callable): Função usada para informar o progresso.
+        Returns:
+            list[dict]: Um resultado por tabela: {"tabela", "status" ("migrada", "ignorada" ou "erro"), "registros", "mensagem"}.
+        """
+        if not self.engine:
+            raise ConnectionError("Conexão com o banco de dados não estabelecida.")
+        catalog = {entry["nome_tabela"]: entry for entry in self.get_catalog()}
+        results = []
+        for table_name in (table_names if table_names is not None else sorted(catalog)):
+            result = {"tabela": table_name, "status": "ignorada", "registros": 0, "mensagem": ""}
+            results.append(result)
+            try:
+                with self.engine.begin() as connection:
+                    if table_name not in catalog:
+                        result["mensagem"] = "tabela não encontrada no catálogo"
+                        continue
+                    if self._observation_id(connection, table_name) is not None or star.table_id(connection, table_name) is not None:
+                        result["mensagem"] = "já está no layout normalizado"
+                        continue
+                    entry = catalog[table_name]
+                    columns = [row[1] for row in connection.exec_driver_sql(f'PRAGMA table_info("{table_name}")')]
+                    if sorted(columns) == OBSERVATION_COLUMNS:
+                        target = OBSERVATION_TABLE
+                        stats = self._migrate_series_table(connection, table_name, entry)
+                    elif entry["fonte"] == "focus" and star.fact_columns(columns) is not None:
+                        target = star.FACT_TABLE
+                        stats = self._migrate_focus_table(connection, table_name, entry, columns)
+                    else:
+                        result["mensagem"] = "colunas sem correspondência no layout normalizado"
+                        continue
+                    if not keep_tables:
+                        connection.exec_driver_sql(f'DROP TABLE "{table_name}"')
+                    self._refresh_catalog(connection, table_name, None, None, None, stats)
+                result.update(status="migrada", registros=stats[2])
+                log(f"Tabela {table_name} migrada para {target}: {stats[2]} registros.")
+            except Exception as e:
+                result.update(status="erro", mensagem=str(e))
+                log(f"Erro ao migrar a tabela {table_name}: {e}")
+
+        if not keep_tables and any(result["status"] == "migrada" for result in results):
+            # Devolve ao sistema de arquivos as páginas liberadas pelas tabelas removidas
+            with self.engine.connect() as connection:
+                connection.exec_driver_sql("VACUUM")
+            log("Banco de dados compactado.")
+        return results
+
+    def iter_table_chunks(self, table_name: str, columns: list[str] | None = None, start_date: str | None = None,
+                          end_date: str | None = None, chunk_size: int = 50000):
+        cursor = None
+        while True:
+            chunk, cursor = self.fetch_table_page(table_name, columns, start_date, end_date, chunk_size, cursor)
+            if not chunk.empty:
+                yield chunk
+            if cursor is None:
+                break
         
\ No newline at end of file
@@ -0,0 +1,43 @@
+import base64
+import numpy as np
+import pandas as pd
+
+PAYLOAD_FORMAT = "colunar-v1"
+DATE_COLUMNS = ("data", "Data")
+DATE_NULL = np.iinfo(np.int32).min
+
+def _encode_buffer(values: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(values).tobytes()).decode("ascii")
+
+def encode_columnar(df: pd.DataFrame) -> dict:
+    """
+    Converte um DataFrame em um payload orientado a colunas para envio ao frontend.
+
+    Em vez de repetir os nomes das colunas em cada linha (como em `to_dict("records")`),
+    cada coluna é enviada uma única vez:
+        - datas: Int32 little-endian com dias desde 1970-01-01 (valores ausentes = -2147483648);
+        - números: Float64 little-endian (valores ausentes = NaN);
+        - demais colunas: lista JSON de textos.
+    Os buffers binários são codificados em base64 e decodificados pelo app.js em typed arrays.
+
+    Args:
+        df: DataFrame a ser convertido.
+
+    Returns:
+        dict: {"format": "colunar-v1", "length": n, "columns": [{"name", "type", "data"}, ...]}
+    """
+    columns = []
+    for name in df.columns:
+        series = df[name]
+        if pd.api.types.is_datetime64_any_dtype(series) or name in DATE_COLUMNS:
+            dates = pd.to_datetime(series, format="ISO8601", errors="coerce")
+            days = dates.to_numpy(dtype="datetime64[D]").astype(np.int64)
+            days[dates.isna().to_numpy()] = DATE_NULL
+            columns.append({"name": name, "type": "date", "data": _encode_buffer(days.astype("<i4"))})
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            columns.append({"name": name, "type": "float64", "data": _encode_buffer(series.to_numpy(dtype="<f8", na_value=np.nan))})
+        else:
+            values = series.astype(object).where(series.notna(), None)
+            columns.append({"name": name, "type": "string", "data": [None if value is None else str(value) for value in values]})
+
+    return {"format": PAYLOAD_FORMAT, "length": len(df), "columns": columns}
@@ -1,14 +1,20 @@
 import os
 import sys
 
+# Permite apontar a aplicação para outro diretório de configurações e dados (ex: benchmarks)
+BASE_DIR_ENV = "COLETOR_BCB_DIR"
+
 def get_base_path(path):
     """
     Retorna o caminho base para encontrar os arquivos de recurso.
+    A variável de ambiente COLETOR_BCB_DIR, se definida, substitui o diretório base.
     Args:
         path (str): O caminho relativo do arquivo a ser buscado.
     Returns:
         str: O caminho completo para o arquivo.
     """
+    if os.environ.get(BASE_DIR_ENV):
+        return os.path.join(os.environ[BASE_DIR_ENV], path)
     if getattr(sys, "frozen", False):
         # Se o programa estiver "congelado" (rodando como .exe)
         # o caminho base é o diretório temporário _MEIPASS
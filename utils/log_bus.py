@@ -0,0 +1,238 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+import eel
+
+from utils.get_base_path import get_base_path
+
+# Intervalo (em segundos) entre os envios de lotes de eventos para a interface
+FLUSH_INTERVAL = 0.25
+MAX_BATCH_SIZE = 500
+
+# Arquivo de log rotativo (relativo à pasta da aplicação)
+LOG_FILE = os.path.join("logs", "coletor_bcb.log")
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUPS = 3
+
+LOG_LEVELS = {"info": logging.INFO, "warning": logging.WARNING, "error": logging.ERROR}
+
+class LogBus:
+    """
+    Canal de eventos de log e progresso entre as threads de coleta e a interface.
+
+    As threads de trabalho apenas enfileiram eventos estruturados (nível, série, etapa, registros)
+    e nunca esperam pela interface. Uma thread de despacho agrupa os eventos a cada `flush_interval`
+    segundos, grava todos no arquivo de log rotativo e envia um único lote para a interface
+    (`add_logs` no app.js). Eventos de progresso marcados com `coalesce=True` são resumidos ao
+    último evento de cada (série, etapa) dentro do lote enviado à interface; o arquivo recebe todos.
+
+    Exemplo de uso:
+    bus = get_log_bus()
+    bus.publish("Página 3: 5000 registros salvos.", serie="ipca_anual", etapa="pagina", registros=15000, coalesce=True)
+    """
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL, max_batch_size: int = MAX_BATCH_SIZE, log_file: str | None = LOG_FILE,
+                 max_bytes: int = LOG_FILE_MAX_BYTES, backups: int = LOG_FILE_BACKUPS):
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self._file_logger = self._create_file_logger(log_file, max_bytes, backups) if log_file else None
+
+    @staticmethod
+    def _create_file_logger(log_file: str, max_bytes: int, backups: int) -> logging.Logger | None:
+        """
+        Configura o logger do arquivo rotativo. Se o arquivo não puder ser criado, os eventos seguem apenas para a interface e o terminal.
+        """
+        log_path = get_base_path(log_file)
+        try:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        except OSError as e:
+            print(f"AVISO: Não foi possível abrir o arquivo de log {log_path}: {e}")
+            return None
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        logger = logging.getLogger(f"coletor_bcb.{id(handler)}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(handler)
+        return logger
+
+    def publish(self, message: str, level: str = "info", serie: str | None = None, etapa: str | None = None,
+                registros: int | None = None, coalesce: bool = False):
+        """
+        Enfileira um evento de log. Não bloqueia: o envio à interface e a gravação do arquivo ficam com a thread de despacho.
+        """
+        event = {
+            "tipo": "log",
+            "horario": datetime.now().strftime("%H:%M:%S"),
+            "nivel": level if level in LOG_LEVELS else "info",
+            "mensagem": str(message),
+            "serie": serie,
+            "etapa": etapa,
+            "registros": registros,
+            "coalesce": coalesce,
+        }
+        self._put(event)
+
+    def notify_finished(self, collection_type: str | None = None):
+        """
+        Enfileira o aviso de fim de coleta, entregue à interface depois de todos os eventos anteriores.
+        """
+        self._put({"tipo": "fim", "coleta": collection_type})
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Aguarda até que todos os eventos enfileirados até aqui tenham sido despachados.
+        Retorna False se o tempo limite for atingido.
+        """
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put({"tipo": "flush", "evento": done})
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        """
+        Despacha os eventos pendentes e encerra a thread de despacho.
+        """
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _put(self, event: dict):
+        if self._closed:
+            # Após o encerramento (ex: durante o atexit), os eventos são apenas impressos
+            if event["tipo"] == "log":
+                print(event["mensagem"])
+            return
+        self._ensure_started()
+        self._queue.put(event)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-bus", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """
+        Laço da thread de despacho: aguarda o primeiro evento e reúne os demais que chegarem
+        até o fim do intervalo (ou até `max_batch_size` eventos) antes de despachar o lote.
+        """
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            batch = [event]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.max_batch_size and batch[-1]["tipo"] != "flush":
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    event = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if event is None:
+                    stop = True
+                    break
+                batch.append(event)
+            self._dispatch(batch)
+            if stop:
+                return
+
+    def _dispatch(self, batch: list[dict]):
+        """
+        Despacha um lote respeitando a ordem: os logs anteriores a um aviso de fim de coleta são enviados antes dele.
+        """
+        logs = []
+        for event in batch:
+            if event["tipo"] == "log":
+                logs.append(event)
+                continue
+            self._send_logs(logs)
+            logs = []
+            if event["tipo"] == "fim":
+                self._call_frontend("collection_finished", event["coleta"])
+            elif event["tipo"] == "flush":
+                event["evento"].set()
+        self._send_logs(logs)
+
+    def _send_logs(self, events: list[dict]):
+        if not events:
+            return
+        for event in events:
+            print(event["mensagem"]) # Mantém o print no terminal para debug
+            if self._file_logger:
+                self._write_file(event)
+        self._call_frontend("add_logs", [self._frontend_event(event) for event in _coalesce(events)])
+
+    def _write_file(self, event: dict):
+        context = " ".join(f"{key}={event[key]}" for key in ("serie", "etapa", "registros") if event[key] is not None)
+        message = f"{event['mensagem']} [{context}]" if context else event["mensagem"]
+        try:
+            self._file_logger.log(LOG_LEVELS[event["nivel"]], message)
+        except Exception:
+            pass
+
+    @staticmethod
+    def _frontend_event(event: dict) -> dict:
+        return {key: event[key] for key in ("horario", "nivel", "mensagem", "serie", "etapa", "registros")}
+
+    @staticmethod
+    def _call_frontend(function_name: str, *args):
+        """
+        Chama uma função exposta pelo app.js sem aguardar a resposta.
+        Não faz nada quando a aplicação está sendo executada sem interface.
+        """
+        try:
+            getattr(eel, function_name)(*args)
+        except Exception:
+            pass
+
+def _coalesce(events: list[dict]) -> list[dict]:
+    """
+    Mantém apenas o último evento com `coalesce=True` de cada (série, etapa), na posição em que ele ocorreu.
+    """
+    last_index = {}
+    for index, event in enumerate(events):
+        if event["coalesce"]:
+            last_index[(event["serie"], event["etapa"])] = index
+    return [event for index, event in enumerate(events)
+            if not event["coalesce"] or last_index[(event["serie"], event["etapa"])] == index]
+
+def print_log(message: str, level: str = "info", **fields):
+    """
+    Função de log padrão dos coletores fora da aplicação: imprime a mensagem e ignora os campos estruturados.
+    """
+    print(message)
+
+_log_bus = None
+_log_bus_lock = threading.Lock()
+
+def get_log_bus() -> LogBus:
+    """
+    Retorna o canal de log compartilhado pela aplicação, criado no primeiro uso e encerrado ao sair.
+    """
+    global _log_bus
+    with _log_bus_lock:
+        if _log_bus is None:
+            _log_bus = LogBus()
+            atexit.register(_log_bus.close)
+        return _log_bus
@@ -0,0 +1,297 @@
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+from utils.get_base_path import get_base_path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Valores padrão da seção `instrumentacao` do series_config.yaml
+DEFAULT_METRICS_CONFIG = {
+    "habilitada": False,
+    "memoria": False,
+    "relatorios": "relatorios",
+    "prometheus": None,
+}
+# Quantidade de relatórios JSON mantidos na pasta de relatórios (os mais antigos são removidos)
+MAX_REPORTS = 50
+PROMETHEUS_PREFIX = "coletor_bcb"
+REPORT_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+_NULL_TIMER = contextlib.nullcontext()
+
+class _StageTimer:
+    __slots__ = ("_metrics", "_stage", "_series", "_started_at")
+
+    def __init__(self, metrics: "Metrics", stage: str, series: str | None):
+        self._metrics = metrics
+        self._stage = stage
+        self._series = series
+
+    def __enter__(self):
+        self._started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self._metrics.record_stage(self._stage, self._series, time.perf_counter() - self._started_at, exc_type is not None)
+        return False
+
+class Metrics:
+    """
+    Instrumentação leve das coletas: tempo por etapa e por série, contadores (bytes e registros
+    recebidos, registros gravados, retentativas, falhas) e pico de memória de cada execução.
+
+    Desabilitada (padrão), cada ponto de medição custa apenas a verificação de `enabled`. Habilitada
+    pela seção `instrumentacao` do series_config.yaml, cada execução (ver `start_run`/`finish_run`)
+    gera um relatório JSON em `instrumentacao.relatorios` e, opcionalmente, um arquivo no formato
+    texto do Prometheus (`instrumentacao.prometheus`, para o textfile collector do node_exporter).
+    Execuções simultâneas (ex: séries e Focus) são somadas no mesmo relatório.
+
+    Exemplo de uso:
+    metrics = get_metrics()
+    metrics.start_run("series", config.get("instrumentacao"))
+    with stage_timer("busca", "selic_diaria"):
+        ...
+    count("registros_recebidos", 2500, "selic_diaria")
+    report = metrics.finish_run()
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.config = dict(DEFAULT_METRICS_CONFIG)
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._run_names = []
+        self._started_at = None
+        self._started_clock = 0.0
+        self._stages = {}
+        self._counters = {}
+        self._tracing_memory = False
+        self._last_report = None
+
+    def start_run(self, name: str, config: dict | None = None):
+        """
+        Inicia (ou, se já houver uma em andamento, acompanha) uma execução instrumentada.
+        """
+        with self._lock:
+            self._depth += 1
+            if self._depth > 1:
+                if self.enabled:
+                    self._run_names.append(name)
+                return
+            self.config = dict(DEFAULT_METRICS_CONFIG)
+            self.config.update(config or {})
+            self.enabled = bool(self.config.get("habilitada"))
+            if not self.enabled:
+                return
+            self._run_names = [name]
+            self._started_at = datetime.now()
+            self._started_clock = time.perf_counter()
+            self._stages = {}
+            self._counters = {}
+            self._tracing_memory = bool(self.config.get("memoria")) and not tracemalloc.is_tracing()
+            if self._tracing_memory:
+                tracemalloc.start()
+
+    def finish_run(self) -> dict | None:
+        """
+        Encerra a execução. Ao fim da última execução simultânea, monta o relatório, grava os arquivos
+        configurados e o guarda para `last_report`.
+        Returns:
+            dict | None: O relatório, ou None se a instrumentação estiver desabilitada ou outra execução continuar.
+        """
+        with self._lock:
+            self._depth = max(0, self._depth - 1)
+            if self._depth or not self.enabled:
+                return None
+            report = self._build_report(final=True)
+            if self._tracing_memory:
+                tracemalloc.stop()
+                self._tracing_memory = False
+            self.enabled = False
+            self._last_report = report
+        if report["etapas"] or report["contadores"]:
+            self._write_report(report)
+        return report
+
+    def record_stage(self, stage: str, series: str | None, seconds: float, failed: bool = False):
+        with self._lock:
+            entry = self._stages.get((stage, series))
+            if entry is None:
+                entry = self._stages[(stage, series)] = [0, 0.0, 0.0, 0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            entry[3] += failed
+
+    def add(self, name: str, value: float = 1, series: str | None = None):
+        with self._lock:
+            self._counters[(name, series)] = self._counters.get((name, series), 0) + value
+
+    def _memory(self) -> dict:
+        memory = {"pico_tracemalloc_bytes": None, "rss_maximo_bytes": None}
+        if self._tracing_memory:
+            memory["pico_tracemalloc_bytes"] = tracemalloc.get_traced_memory()[1]
+        if resource is not None:
+            # ru_maxrss vem em KB no Linux e em bytes no macOS
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            memory["rss_maximo_bytes"] = max_rss if sys.platform == "darwin" else max_rss * 1024
+        return memory
+
+    def _build_report(self, final: bool = False) -> dict:
+        stages = [
+            {"etapa": stage, "serie": series, "chamadas": calls, "segundos": round(total, 6),
+             "max_segundos": round(longest, 6), "erros": errors}
+            for (stage, series), (calls, total, longest, errors) in sorted(self._stages.items(), key=lambda item: (item[0][0], item[0][1] or ""))
+        ]
+        totals = {}
+        for item in stages:
+            total = totals.setdefault(item["etapa"], {"chamadas": 0, "segundos": 0.0, "erros": 0})
+            total["chamadas"] += item["chamadas"]
+            total["segundos"] = round(total["segundos"] + item["segundos"], 6)
+            total["erros"] += item["erros"]
+        counters = [
+            {"nome": name, "serie": series, "valor": value}
+            for (name, series), value in sorted(self._counters.items(), key=lambda item: (item[0][0], item[0][1] or ""))
+        ]
+        counter_totals = {}
+        for item in counters:
+            counter_totals[item["nome"]] = counter_totals.get(item["nome"], 0) + item["valor"]
+        return {
+            "execucoes": list(self._run_names),
+            "em_andamento": not final,
+            "inicio": self._started_at.strftime(REPORT_DATETIME_FORMAT) if self._started_at else None,
+            "fim": datetime.now().strftime(REPORT_DATETIME_FORMAT) if final else None,
+            "duracao_s": round(time.perf_counter() - self._started_clock, 6),
+            "totais_por_etapa": totals,
+            "totais_por_contador": counter_totals,
+            "etapas": stages,
+            "contadores": counters,
+            "memoria": self._memory(),
+        }
+
+    def snapshot(self) -> dict | None:
+        """
+        Relatório parcial da execução em andamento ou, se não houver, o relatório da última execução.
+        """
+        with self._lock:
+            if self.enabled and self._depth:
+                return self._build_report()
+            return self._last_report
+
+    def _write_report(self, report: dict):
+        """
+        Grava o relatório JSON (mantendo os MAX_REPORTS mais recentes) e o arquivo do Prometheus, se configurado.
+        """
+        try:
+            reports_dir = get_base_path(self.config.get("relatorios") or DEFAULT_METRICS_CONFIG["relatorios"])
+            os.makedirs(reports_dir, exist_ok=True)
+            names = "_".join(sorted(set(report["execucoes"])))
+            report_path = os.path.join(reports_dir, f"execucao_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{names}.json")
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            old_reports = sorted(name for name in os.listdir(reports_dir) if name.startswith("execucao_") and name.endswith(".json"))
+            for name in old_reports[:-MAX_REPORTS]:
+                os.remove(os.path.join(reports_dir, name))
+
+            if self.config.get("prometheus"):
+                prometheus_path = get_base_path(self.config["prometheus"])
+                temp_path = f"{prometheus_path}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    f.write(prometheus_text(report))
+                os.replace(temp_path, prometheus_path)
+        except OSError as e:
+            print(f"AVISO: Não foi possível gravar o relatório de instrumentação: {e}")
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _metric_name(name: str) -> str:
+    return "".join(char if char.isalnum() or char == "_" else "_" for char in name)
+
+def prometheus_text(report: dict | None) -> str:
+    """
+    Converte um relatório de execução para o formato texto de exposição do Prometheus.
+    """
+    if not report:
+        return ""
+    lines = [
+        f"# HELP {PROMETHEUS_PREFIX}_etapa_segundos_total Tempo acumulado em cada etapa, por série.",
+        f"# TYPE {PROMETHEUS_PREFIX}_etapa_segundos_total counter",
+    ]
+    for item in report["etapas"]:
+        lines.append(f'{PROMETHEUS_PREFIX}_etapa_segundos_total{{etapa="{_label(item["etapa"])}",serie="{_label(item["serie"] or "")}"}} {item["segundos"]}')
+    lines += [
+        f"# HELP {PROMETHEUS_PREFIX}_etapa_chamadas_total Execuções de cada etapa, por série.",
+        f"# TYPE {PROMETHEUS_PREFIX}_etapa_chamadas_total counter",
+    ]
+    for item in report["etapas"]:
+        lines.append(f'{PROMETHEUS_PREFIX}_etapa_chamadas_total{{etapa="{_label(item["etapa"])}",serie="{_label(item["serie"] or "")}"}} {item["chamadas"]}')
+    for name in sorted({item["nome"] for item in report["contadores"]}):
+        metric = f"{PROMETHEUS_PREFIX}_{_metric_name(name)}_total"
+        lines += [f"# HELP {metric} Contador '{name}' da última execução, por série.", f"# TYPE {metric} counter"]
+        for item in report["contadores"]:
+            if item["nome"] == name:
+                lines.append(f'{metric}{{serie="{_label(item["serie"] or "")}"}} {item["valor"]}')
+    lines += [
+        f"# HELP {PROMETHEUS_PREFIX}_execucao_duracao_segundos Duração da última execução.",
+        f"# TYPE {PROMETHEUS_PREFIX}_execucao_duracao_segundos gauge",
+        f"{PROMETHEUS_PREFIX}_execucao_duracao_segundos {report['duracao_s']}",
+    ]
+    for key, metric in (("pico_tracemalloc_bytes", "memoria_pico_bytes"), ("rss_maximo_bytes", "memoria_rss_maximo_bytes")):
+        if report["memoria"].get(key) is not None:
+            lines += [f"# TYPE {PROMETHEUS_PREFIX}_{metric} gauge", f"{PROMETHEUS_PREFIX}_{metric} {report['memoria'][key]}"]
+    return "\n".join(lines) + "\n"
+
+_metrics = Metrics()
+
+def get_metrics() -> Metrics:
+    """
+    Retorna a instrumentação compartilhada pela aplicação.
+    """
+    return _metrics
+
+def stage_timer(stage: str, series: str | None = None):
+    """
+    Mede o tempo de um bloco (`with stage_timer("gravacao", "selic_diaria"):`). Sem custo quando desabilitada.
+    """
+    if not _metrics.enabled:
+        return _NULL_TIMER
+    return _StageTimer(_metrics, stage, series)
+
+def count(name: str, value: float = 1, series: str | None = None):
+    """
+    Soma `value` ao contador `name` da série. Sem custo quando a instrumentação está desabilitada.
+    """
+    if _metrics.enabled:
+        _metrics.add(name, value, series)
+
+def timed_iter(iterable, stage: str, series: str | None = None):
+    """
+    Percorre `iterable` medindo, como a etapa `stage`, o tempo de espera por cada item (ex: páginas de uma busca).
+    """
+    if not _metrics.enabled:
+        return iterable
+    return _timed_iter(iter(iterable), stage, series)
+
+def _timed_iter(iterator, stage: str, series: str | None):
+    while True:
+        started_at = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            _metrics.record_stage(stage, series, time.perf_counter() - started_at)
+            return
+        except Exception:
+            _metrics.record_stage(stage, series, time.perf_counter() - started_at, failed=True)
+            raise
+        _metrics.record_stage(stage, series, time.perf_counter() - started_at)
+        yield item
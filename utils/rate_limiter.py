@@ -0,0 +1,39 @@
+import threading
+import time
+
+class RateLimiter:
+    """
+    Limitador de taxa de requisições por host (token bucket).
+
+    Cada host possui seu próprio balde de fichas, reabastecido continuamente à taxa
+    de `requests_per_second`. Threads que chamam `acquire` aguardam até que uma ficha
+    esteja disponível, o que mantém o volume de chamadas à API do BCB dentro do limite
+    configurado mesmo quando várias séries são coletadas em paralelo.
+
+    Exemplo de uso:
+        limiter = RateLimiter(requests_per_second=5)
+        limiter.acquire("api.bcb.gov.br")
+    """
+    def __init__(self, requests_per_second: float, burst: int | None = None):
+        if requests_per_second <= 0:
+            raise ValueError("A taxa de requisições por segundo deve ser maior que zero.")
+        self.rate = float(requests_per_second)
+        self.capacity = float(burst if burst else max(1, int(requests_per_second)))
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str):
+        """
+        Bloqueia até que uma requisição ao host informado seja permitida.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (self.capacity, now))
+                tokens = min(self.capacity, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
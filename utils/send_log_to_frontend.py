@@ -1,8 +1,19 @@
-import eel
+from utils.log_bus import get_log_bus
 
-def send_log_to_frontend(message):
+def send_log_to_frontend(message, level: str = "info", **fields):
     """
-    Envia mensagens de log para a interface web.
+    Envia mensagens de log para a interface web pelo canal de log compartilhado (ver `LogBus`).
+    A chamada não bloqueia: a mensagem é enfileirada e enviada em lote, junto das demais, pela thread de despacho,
+    que também a imprime no terminal e a grava no arquivo de log rotativo.
+    `fields` aceita os campos estruturados do evento: serie, etapa, registros e coalesce.
+    Em execuções sem interface (linha de comando ou agendador), a mensagem é apenas impressa e gravada no arquivo.
     """
-    print(message) # Mantém o print no terminal para debug
-    eel.add_log(message)()
\ No newline at end of file
+    get_log_bus().publish(message, level, **fields)
+
+def notify_collection_finished(collection_type: str | None = None):
+    """
+    Sinaliza à interface web o fim de uma coleta ("focus" ou, se omitido, séries temporais),
+    depois de todas as mensagens de log enviadas antes dela.
+    Não faz nada quando a aplicação está sendo executada sem interface.
+    """
+    get_log_bus().notify_finished(collection_type)